@@ -3,10 +3,12 @@ from pydantic import BaseModel, Field
 from browser_use.agent.service import Agent
 from browser_use.controller.service import Controller
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_openai import ChatOpenAI
+from llm_helper import chat_model
+import ast
 import traceback
 
-from math_helper import eval_expr
+from math_helper import eval_expr, format_number
+from word_math_helper import parse_math_text
 from output_format.answer import AnswerData
 from output_format.question import Question
 
@@ -103,7 +105,7 @@ async def get_question(llm, context):
 def get_llm_model(question_type=None):
     """Get appropriate LLM model based on question type"""
     try:
-        base_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        base_llm = chat_model(temperature=0)
 
         if question_type == "logic":
             # Wrap with a chain-of-thought template
@@ -138,7 +140,7 @@ def get_llm_model(question_type=None):
     except Exception as e:
         print(f"Error getting LLM model: {str(e)}")
         # Fallback to base model
-        return ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        return chat_model(temperature=0)
 
 
 async def get_answer(question: Question):
@@ -156,6 +158,13 @@ async def get_answer(question: Question):
             question.question_text = question.decoded_text.lower()
             print(f"🔐 Using decoded text for AI: {question.decoded_text}")
         
+        # Plain arithmetic is solved locally, the LLM is only needed when parsing fails
+        if question.question_type == "math":
+            expression = parse_math_text(question.question_text)
+            if expression is not None:
+                print("Math equation is: ", ast.unparse(expression))
+                return AnswerData(correct_options=[format_number(eval_expr(expression)).lower()])
+
         llm = get_llm_model(question.question_type)
 
         format_prompt = f"""
@@ -189,7 +198,7 @@ async def get_answer(question: Question):
         if question.question_type == "math":
             try:
                 print("Math equation is: ", output_data.correct_options)
-                output_data.correct_options[0] = eval_expr(output_data.correct_options[0])
+                output_data.correct_options[0] = format_number(eval_expr(output_data.correct_options[0]))
             except Exception as ex:
                 print("Math question is invalid format" + ex.__str__())
         
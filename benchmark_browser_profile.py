@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare browser profiles: time to interactive, CPU time and resident memory of Chrome.
+
+    python benchmark_browser_profile.py --runs 5
+    python benchmark_browser_profile.py --url https://kahoot.it/ --selector "input[data-functional-selector='game-id-input']"
+
+CPU and RSS need psutil (pip install psutil); without it only timings are reported.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser_profile_helper import PROFILES, apply_performance_profile, build_chrome_options
+from driver_startup_helper import DriverPathCache
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_URL = "https://kahoot.it/"
+DEFAULT_SELECTOR = "input[data-functional-selector='game-id-input']"
+
+
+def _browser_processes(service):
+    """chromedriver and every Chrome process it started"""
+    root = psutil.Process(service.process.pid)
+    return [root] + root.children(recursive=True)
+
+
+def _resource_usage(processes):
+    """Summed CPU seconds and RSS in MB of the processes still alive"""
+    cpu, rss = 0.0, 0
+    for process in processes:
+        try:
+            times = process.cpu_times()
+            cpu += times.user + times.system
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return cpu, rss / (1024 * 1024)
+
+
+def run_once(profile: str, url: str, selector: str, driver_path: str, headless=None, settle: float = 5.0) -> dict:
+    """Launch one browser with the profile, load the page and measure until the selector is clickable"""
+    service = Service(driver_path)
+    launch_start = time.perf_counter()
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(profile, headless))
+    try:
+        if profile == "performance":
+            apply_performance_profile(driver)
+        launched = time.perf_counter()
+
+        load_start = time.perf_counter()
+        driver.get(url)
+        loaded = time.perf_counter()
+        WebDriverWait(driver, 30, poll_frequency=0.05).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+        interactive = time.perf_counter()
+
+        # Keep the page open a little to include steady-state work like animations and trackers
+        time.sleep(settle)
+        result = {
+            "launch": launched - launch_start,
+            "load": loaded - load_start,
+            "interactive": interactive - load_start,
+        }
+        if PSUTIL_AVAILABLE:
+            result["cpu"], result["rss"] = _resource_usage(_browser_processes(service))
+        return result
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the default and performance browser profiles")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--selector", default=DEFAULT_SELECTOR, help="Element that marks the page as interactive")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--settle", type=float, default=5.0, help="Seconds to stay on the page before sampling CPU and RSS")
+    parser.add_argument("--headless", choices=["auto", "true", "false"], default="auto",
+                        help="auto keeps each profile's own setting; true/false forces it for a like-for-like run")
+    args = parser.parse_args()
+
+    headless = {"auto": None, "true": True, "false": False}[args.headless]
+    driver_path, _ = DriverPathCache().resolve()
+    if not PSUTIL_AVAILABLE:
+        print("psutil is not installed, reporting timings only")
+
+    results = {profile: [] for profile in PROFILES}
+    for run in range(args.runs):
+        # Alternate the profiles so network and cache effects hit both alike
+        for profile in PROFILES:
+            try:
+                result = run_once(profile, args.url, args.selector, driver_path, headless, args.settle)
+                results[profile].append(result)
+                print(f"Run {run + 1} {profile}: " + ", ".join(f"{k} {v:.2f}" for k, v in result.items()))
+            except Exception as e:
+                print(f"Run {run + 1} {profile} failed: {e}")
+
+    print("\nMedians (seconds, CPU seconds, RSS MB):")
+    metrics = ["launch", "load", "interactive"] + (["cpu", "rss"] if PSUTIL_AVAILABLE else [])
+    print(f"{'profile':<12}" + "".join(f"{metric:>13}" for metric in metrics))
+    medians = {}
+    for profile, runs in results.items():
+        if not runs:
+            continue
+        medians[profile] = {metric: float(np.median([r[metric] for r in runs])) for metric in metrics}
+        print(f"{profile:<12}" + "".join(f"{medians[profile][metric]:>13.2f}" for metric in metrics))
+
+    if len(medians) == 2:
+        base, fast = medians["default"], medians["performance"]
+        changes = [f"{metric} {(fast[metric] - base[metric]) / base[metric]:+.0%}"
+                   for metric in metrics if base[metric]]
+        print("performance vs default: " + ", ".join(changes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+
+from selenium.webdriver.chrome.options import Options
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Resources the game never needs: web fonts, analytics and trackers, audio and video
+DEFAULT_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*segment.io*", "*optimizely.com*", "*onetrust.com*",
+    "*.mp3", "*.ogg", "*.mp4", "*.webm",
+]
+
+# Collapses animations and transitions so answer buttons are clickable as soon as they render
+REDUCED_MOTION_CSS = """
+*, *::before, *::after {
+    animation-duration: 0s !important; animation-delay: 0s !important;
+    transition-duration: 0s !important; transition-delay: 0s !important;
+    scroll-behavior: auto !important;
+}
+"""
+
+INJECT_CSS_JS = """
+(function () {
+    const css = %s;
+    const add = () => {
+        if (document.getElementById('__kahoot_reduced_motion')) return;
+        const style = document.createElement('style');
+        style.id = '__kahoot_reduced_motion';
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) add();
+    document.addEventListener('DOMContentLoaded', add);
+})();
+"""
+
+PROFILES = ("default", "performance")
+
+
+def parse_patterns(value: str):
+    """Comma separated URL patterns, the default list when empty"""
+    patterns = [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+    return patterns or list(DEFAULT_BLOCKED_URLS)
+
+
+def build_chrome_options(profile: str = "default", headless: bool = None, user_data_dir: str = None) -> Options:
+    """Chrome options for a profile; "performance" runs headless with eager page loads and no audio"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile: {profile}")
+    chrome_options = Options()
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # Additional anti-detection measures
+    chrome_options.add_argument("--disable-web-security")
+    chrome_options.add_argument("--allow-running-insecure-content")
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+
+    if user_data_dir:
+        # A persistent profile keeps Chrome's HTTP cache, so Kahoot's scripts load from disk
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+        chrome_options.add_argument("--no-first-run")
+        chrome_options.add_argument("--no-default-browser-check")
+
+    if headless is None:
+        headless = profile == "performance"
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,900")
+
+    if profile == "performance":
+        # Hand the page over at DOMContentLoaded instead of waiting for every subresource
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument("--force-prefers-reduced-motion")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-timer-throttling")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+    return chrome_options
+
+
+def apply_performance_profile(driver, blocked_urls=None):
+    """Block non-essential resources and disable motion for every page of this driver"""
+    blocked_urls = list(blocked_urls if blocked_urls is not None else DEFAULT_BLOCKED_URLS)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        if blocked_urls:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {
+            "features": [{"name": "prefers-reduced-motion", "value": "reduce"}]})
+        # Sites ignoring prefers-reduced-motion still get their animations disabled
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                               {"source": INJECT_CSS_JS % json.dumps(REDUCED_MOTION_CSS)})
+        print(f"⚡ Performance profile: {len(blocked_urls)} URL patterns blocked, reduced motion")
+    except Exception as e:
+        print(f"Error applying performance profile: {e}")
@@ -0,0 +1,192 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import httpx
+
+# Response headers kept in the cassette; everything else, including auth, is dropped.
+# Chunks are recorded as sent, so a compressed body needs its content-encoding to be decoded on replay
+KEPT_HEADERS = ("content-type", "content-encoding")
+
+# Request fields that do not change the answer and would break matching between runs
+VOLATILE_FIELDS = ("user", "stream_options")
+
+
+def request_key(request: httpx.Request) -> str:
+    """Hash of the method, path and canonical JSON body, independent of host, auth and key order"""
+    body = request.content or b""
+    try:
+        payload = json.loads(body)
+        if isinstance(payload, dict):
+            payload = {k: v for k, v in payload.items() if k not in VOLATILE_FIELDS}
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    digest = hashlib.sha256(request.method.encode() + b" " + request.url.path.encode() + b"\n" + body)
+    return digest.hexdigest()[:24]
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Passes response chunks through to the client while recording them with their timing"""
+
+    def __init__(self, stream, on_complete, start_time):
+        self.stream = stream
+        self.on_complete = on_complete
+        self.start_time = start_time
+        self.chunks = []
+        self.completed = False
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.chunks.append((time.perf_counter() - self.start_time, chunk))
+            yield chunk
+
+    def close(self):
+        # Recorded on close as well, so streams the client stops early are kept too
+        if not self.completed:
+            self.completed = True
+            self.on_complete(self.chunks)
+        self.stream.close()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    """Yields recorded chunks, optionally at the recorded pace"""
+
+    def __init__(self, chunks, start_time, timing):
+        self.chunks = chunks
+        self.start_time = start_time
+        self.timing = timing
+
+    def __iter__(self):
+        for offset, chunk in self.chunks:
+            if self.timing:
+                delay = offset - (time.perf_counter() - self.start_time)
+                if delay > 0:
+                    time.sleep(delay)
+            yield chunk
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """
+    httpx transport that records model API traffic to a gzipped JSON cassette, or replays it.
+    In replay mode unknown requests get a 404 so the client fails fast instead of retrying.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", timing: bool = True, transport: httpx.BaseTransport = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.transport = transport or (httpx.HTTPTransport() if mode == "record" else None)
+        self.entries = {}
+        self.replay_positions = {}
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                print(f"⚠️ Cassette {self.path} not found, every request will miss")
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+            print(f"📼 Loaded {sum(len(v) for v in self.entries.values())} recorded responses from {self.path}")
+        except Exception as e:
+            print(f"Error loading cassette {self.path}: {e}")
+
+    def save(self):
+        with self.lock:
+            data = {"version": 1, "entries": self.entries}
+            temp_path = f"{self.path}.tmp"
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = request_key(request)
+        if self.mode == "record":
+            return self._record(request, key)
+        return self._replay(request, key)
+
+    def _record(self, request, key):
+        start_time = time.perf_counter()
+        response = self.transport.handle_request(request)
+        headers_time = time.perf_counter() - start_time
+
+        def on_complete(chunks):
+            entry = {
+                "path": request.url.path,
+                "status": response.status_code,
+                "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+                "headers_time": round(headers_time, 4),
+                "chunks": [[round(offset, 4), base64.b64encode(chunk).decode("ascii")] for offset, chunk in chunks],
+            }
+            with self.lock:
+                self.entries.setdefault(key, []).append(entry)
+            self.save()
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, on_complete, start_time),
+            extensions=response.extensions,
+        )
+
+    def _replay(self, request, key):
+        start_time = time.perf_counter()
+        with self.lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                self.misses += 1
+                entry = None
+            else:
+                # Repeated identical requests replay their responses in order, the last one repeats
+                position = self.replay_positions.get(key, 0)
+                entry = recorded[min(position, len(recorded) - 1)]
+                self.replay_positions[key] = position + 1
+
+        if entry is None:
+            print(f"📼 No recorded response for {request.method} {request.url.path} ({key})")
+            return httpx.Response(404, json={"error": {
+                "message": f"No recorded response in cassette for request {key}",
+                "type": "cassette_miss", "code": "cassette_miss"}})
+
+        if self.timing and entry["headers_time"] > 0:
+            time.sleep(entry["headers_time"])
+        chunks = [(offset, base64.b64decode(data)) for offset, data in entry["chunks"]]
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=entry["headers"],
+            stream=_ReplayStream(chunks, start_time, self.timing),
+        )
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_cassette_transport():
+    """Shared transport for LLM_CASSETTE_MODE / LLM_CASSETTE_PATH / LLM_CASSETTE_TIMING, or None when off"""
+    mode = (os.getenv("LLM_CASSETTE_MODE") or "off").lower()
+    if mode == "off":
+        return None
+    path = os.getenv("LLM_CASSETTE_PATH") or "llm_cassette.json.gz"
+    timing = (os.getenv("LLM_CASSETTE_TIMING") or "recorded").lower() != "none"
+    with _transports_lock:
+        transport = _transports.get((mode, path, timing))
+        if transport is None:
+            transport = _transports[(mode, path, timing)] = CassetteTransport(path, mode, timing)
+            print(f"📼 Cassette {mode} mode: {path}" + ("" if timing else " (no latency)"))
+        return transport
@@ -0,0 +1,220 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List, Set
+
+from prompt_helper import count_tokens
+
+OMITTED_MARKER = "..."  # Stands in for dropped blocks, also valid Python so snippets still run
+
+# Whole lines of page chrome that scraping picks up from GitHub, Pastebin and Google Drive
+UI_LINES = {
+    "raw", "blame", "copy", "copied!", "copy raw file", "download", "download raw file", "history", "edit",
+    "preview", "code", "sign in", "sign up", "share", "file", "view", "insert", "format", "tools", "help",
+    "add-ons", "open with google docs", "open in app", "report abuse", "clone", "embed",
+}
+UI_PATTERNS = [
+    re.compile(r"^\d+\s+lines?\s*(\(\d+\s+loc\))?\s*(·\s*[\d.]+\s*(bytes|kb|mb))?$", re.IGNORECASE),
+    re.compile(r"^[\d.]+\s*(bytes|kb|mb)$", re.IGNORECASE),
+]
+LINE_NUMBER_PATTERN = re.compile(r"^\s*(\d+)(?:[ \t]?[|:][ \t]?|\t| (?=\S| )|$)")
+COMMENT_PATTERN = re.compile(r"^\s*(#|//|/\*|\*|--|\"\"\"|''')")
+DEFINITION_PATTERN = re.compile(r"\b(?:def|class|function|func|fn|struct|interface)\s+([A-Za-z_]\w*)"
+                                r"|^\s*(?:const|let|var)?\s*([A-Za-z_]\w*)\s*=(?!=)", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Lines that continue the previous top-level block instead of starting a new one
+CONTINUATION_PATTERN = re.compile(r"^(?:[}\])]|else\b|elif\b|except\b|finally\b|catch\b)")
+STOP_WORDS = {
+    "the", "a", "an", "of", "to", "in", "is", "it", "what", "which", "does", "do", "will", "be", "this",
+    "that", "code", "following", "output", "result", "value", "print", "prints", "printed", "return",
+    "returns", "and", "or", "for", "if", "at", "on", "by", "from", "with", "after", "when", "run", "running",
+}
+
+
+@dataclass
+class CondensedCode:
+    text: str
+    original_tokens: int
+    tokens: int
+    stripped_lines: int = 0  # Line numbers, UI text and licence headers removed
+    kept_blocks: int = 0
+    dropped: List[str] = field(default_factory=list)  # First line of every dropped block
+
+    def describe(self) -> str:
+        summary = f"{self.original_tokens} -> {self.tokens} tokens"
+        if self.stripped_lines:
+            summary += f", {self.stripped_lines} boilerplate lines stripped"
+        if self.dropped:
+            names = "; ".join(line[:40] for line in self.dropped[:5])
+            more = f" and {len(self.dropped) - 5} more" if len(self.dropped) > 5 else ""
+            summary += f", kept {self.kept_blocks} blocks, dropped {len(self.dropped)}: {names}{more}"
+        return summary
+
+
+def strip_line_numbers(lines: List[str]) -> List[str]:
+    """Remove line-number gutters copied along with the code, only when most lines count upwards"""
+    numbered = [(i, LINE_NUMBER_PATTERN.match(line)) for i, line in enumerate(lines) if line.strip()]
+    matches = [(i, match) for i, match in numbered if match]
+    if len(matches) < 3 or len(matches) < 0.8 * len(numbered):
+        return lines
+    numbers = [int(match.group(1)) for _, match in matches]
+    if sum(1 for a, b in zip(numbers, numbers[1:]) if b > a) < 0.8 * (len(numbers) - 1):
+        return lines
+    stripped = list(lines)
+    for i, match in matches:
+        stripped[i] = lines[i][match.end():]
+    return stripped
+
+
+def strip_boilerplate(code: str):
+    """Code without UI text lines, a leading licence header, line numbers and runs of blank lines"""
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+    original = sum(1 for line in lines if line.strip())
+
+    lines = [line for line in lines
+             if line.strip().lower() not in UI_LINES and not any(p.match(line.strip()) for p in UI_PATTERNS)]
+    lines = strip_line_numbers(lines)
+
+    # A leading comment block that is a licence or copyright notice
+    header_end = 0
+    while header_end < len(lines) and (not lines[header_end].strip() or COMMENT_PATTERN.match(lines[header_end])):
+        header_end += 1
+    header = "\n".join(lines[:header_end]).lower()
+    if header_end and ("license" in header or "copyright" in header):
+        lines = lines[header_end:]
+
+    cleaned = []
+    for line in lines:
+        if line.strip() or (cleaned and cleaned[-1].strip()):
+            cleaned.append(line)
+    while cleaned and not cleaned[-1].strip():
+        cleaned.pop()
+    return "\n".join(cleaned), original - sum(1 for line in cleaned if line.strip())
+
+
+def split_blocks(code: str) -> List[str]:
+    """Top-level blocks: a function, class or statement with its indented body and decorators"""
+    blocks, current = [], []
+    for line in code.split("\n"):
+        top_level = line.strip() and not line[0].isspace()
+        starts_block = top_level and not CONTINUATION_PATTERN.match(line) \
+            and not (current and current[-1].lstrip().startswith("@"))
+        if starts_block and any(l.strip() for l in current):
+            blocks.append("\n".join(current).strip("\n"))
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        blocks.append("\n".join(current).strip("\n"))
+    return blocks
+
+
+def _terms(text: str):
+    words = set()
+    for word in WORD_PATTERN.findall(text):
+        if len(word) < 2 or word.lower() in STOP_WORDS:
+            continue
+        words.add(word.lower())
+        # snake_case and camelCase parts match the question's plain words
+        words.update(part.lower() for part in re.split(r"_|(?<=[a-z])(?=[A-Z])", word)
+                     if len(part) > 2 and part.lower() not in STOP_WORDS)
+    return words
+
+
+def _score_blocks(blocks: List[str], question: str) -> List[float]:
+    """Lexical overlap with the question, plus a share of the score of blocks that use a block's names"""
+    question_terms = _terms(question)
+    block_terms = [_terms(block) for block in blocks]
+    scores = [len(terms & question_terms) / math.sqrt(len(terms) + 1) for terms in block_terms]
+    # The last block usually runs everything, which is what "what is the output" asks about
+    if scores:
+        scores[-1] += 0.01
+    definitions = [{name.lower() for groups in DEFINITION_PATTERN.findall(block) for name in groups if name}
+                   for block in blocks]
+    boosted = list(scores)
+    for i, names in enumerate(definitions):
+        for j, terms in enumerate(block_terms):
+            if i != j and scores[j] > 0 and names & terms:
+                boosted[i] = max(boosted[i], scores[i] + scores[j] / 2)
+    return boosted
+
+
+def _top_level_names(block: str) -> Set[str]:
+    """Names a block defines for the rest of the file: its function or class, top-level assignments"""
+    names = set()
+    for line in block.split("\n"):
+        if line.strip() and not line[0].isspace():
+            names.update(name for groups in DEFINITION_PATTERN.findall(line) for name in groups if name)
+    return names
+
+
+def _dependencies(blocks: List[str]) -> List[Set[int]]:
+    """For each block, the other blocks defining a name it uses"""
+    defined_in = {}
+    for i, block in enumerate(blocks):
+        for name in _top_level_names(block):
+            defined_in.setdefault(name, set()).add(i)
+    return [{j for name in set(WORD_PATTERN.findall(block)) for j in defined_in.get(name, ()) if j != i}
+            for i, block in enumerate(blocks)]
+
+
+def _closure(start: int, dependencies: List[Set[int]]) -> Set[int]:
+    """A block and everything it needs, transitively"""
+    needed, pending = set(), [start]
+    while pending:
+        i = pending.pop()
+        if i not in needed:
+            needed.add(i)
+            pending.extend(dependencies[i])
+    return needed
+
+
+def _truncate_to_budget(text: str, budget: int, model: str) -> str:
+    """Leading lines of the text that fit the budget"""
+    kept = []
+    for line in text.split("\n"):
+        if count_tokens("\n".join(kept + [line, OMITTED_MARKER]), model) > budget:
+            break
+        kept.append(line)
+    return "\n".join(kept + [OMITTED_MARKER])
+
+
+def condense_code(code: str, question: str, budget: int = 1500, model: str = "gpt-4o-mini") -> CondensedCode:
+    """Strip boilerplate, then keep the blocks most relevant to the question that fit the token budget"""
+    original_tokens = count_tokens(code, model)
+    cleaned, stripped = strip_boilerplate(code)
+    tokens = count_tokens(cleaned, model)
+    blocks = split_blocks(cleaned)
+    if tokens <= budget or not blocks:
+        return CondensedCode(cleaned, original_tokens, tokens, stripped, len(blocks))
+
+    scores = _score_blocks(blocks, question)
+    costs = [count_tokens(block, model) for block in blocks]
+    marker_cost = count_tokens(OMITTED_MARKER, model) + 1
+    dependencies = _dependencies(blocks)
+    kept, used = set(), 0
+    # The last block first, then by relevance; a block only comes with the definitions it uses
+    for i in [len(blocks) - 1] + sorted(range(len(blocks)), key=lambda i: (-scores[i], i)):
+        group = _closure(i, dependencies) - kept
+        # Each gap left by dropped blocks costs one marker line
+        cost = sum(costs[j] + marker_cost for j in group)
+        if group and used + cost <= budget:
+            kept |= group
+            used += cost
+
+    if not kept:
+        # Not even the best block fits, keep its beginning
+        best = max(range(len(blocks)), key=lambda i: (scores[i], -i))
+        text = _truncate_to_budget(blocks[best], budget, model)
+        dropped = [blocks[i].split("\n")[0] for i in range(len(blocks)) if i != best]
+        return CondensedCode(text, original_tokens, count_tokens(text, model), stripped, 1, dropped)
+
+    parts, dropped = [], []
+    for i, block in enumerate(blocks):
+        if i in kept:
+            parts.append(block)
+        else:
+            dropped.append(block.split("\n")[0])
+            if not parts or parts[-1] != OMITTED_MARKER:
+                parts.append(OMITTED_MARKER)
+    text = "\n\n".join(parts)
+    return CondensedCode(text, original_tokens, count_tokens(text, model), stripped, len(kept), dropped)
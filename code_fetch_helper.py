@@ -0,0 +1,230 @@
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from browser_profile_helper import USER_AGENT
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+MAX_BYTES = 512 * 1024  # Code questions link to single files, anything larger is not code
+PRE_BLOCK_PATTERN = re.compile(r'<(pre|code)\b[^>]*>(.*?)</\1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def find_urls(text: str):
+    """URLs in the text, in order, without trailing punctuation and duplicates"""
+    urls = [url.rstrip('.,;:!?)\'') for url in URL_PATTERN.findall(text or "")]
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def rewrite_url(url: str):
+    """Raw or export endpoint for known code hosts, returns (fetch_url, is_raw)"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    segments = [segment for segment in parts.path.split("/") if segment]
+
+    if host in ("github.com", "www.github.com") and len(segments) >= 5 and segments[2] in ("blob", "raw"):
+        owner, repo, _, ref = segments[:4]
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{'/'.join(segments[4:])}", True
+    if host == "raw.githubusercontent.com" or host == "gist.githubusercontent.com":
+        return url.split("#")[0], True
+    if host == "gist.github.com" and segments:
+        if "raw" in segments:
+            return f"https://gist.github.com/{'/'.join(segments)}", True
+        return f"https://gist.github.com/{'/'.join(segments[:2])}/raw", True
+    if host in ("pastebin.com", "www.pastebin.com") and segments:
+        return f"https://pastebin.com/raw/{segments[-1]}", True
+    if host == "drive.google.com":
+        file_id = None
+        if len(segments) >= 3 and segments[:2] == ["file", "d"]:
+            file_id = segments[2]
+        else:
+            file_id = (parse_qs(parts.query).get("id") or [None])[0]
+        if file_id:
+            return f"https://drive.google.com/uc?export=download&id={file_id}", True
+    if host == "docs.google.com" and len(segments) >= 3 and segments[1] == "d":
+        kind, doc_id = segments[0], segments[2]
+        if kind == "document":
+            return f"https://docs.google.com/document/d/{doc_id}/export?format=txt", True
+        if kind == "spreadsheets":
+            return f"https://docs.google.com/spreadsheets/d/{doc_id}/export?format=csv", True
+    return url, False
+
+
+def extract_code_from_html(text: str) -> str:
+    """Text of the <pre> and <code> blocks of an HTML page"""
+    blocks = []
+    for _, inner in PRE_BLOCK_PATTERN.findall(text):
+        block = html.unescape(TAG_PATTERN.sub("", inner)).strip()
+        # <code> nested in <pre> is found twice
+        if len(block) > 10 and not any(block in existing for existing in blocks):
+            blocks.append(block)
+    return "\n\n".join(blocks)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    fetch_url: str
+    text: str
+    source: str  # "network", "cache", "revalidated", "stale" or "failed"
+    elapsed: float
+    error: str = ""
+
+
+class CodeFetcher:
+    """Downloads linked code over one pooled HTTP client, with an on-disk cache revalidated by ETag"""
+
+    def __init__(self, cache_dir="code_cache", timeout=5.0, max_age=300, max_workers=4, transport=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age  # Seconds a cached body is used without asking the server
+        self.client = httpx.Client(
+            timeout=timeout, follow_redirects=True, transport=transport,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/plain, */*"},
+            limits=httpx.Limits(max_connections=max_workers * 2, max_keepalive_connections=max_workers))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="code-fetch")
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.index = self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, "index.json")
+
+    def _load_index(self):
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".txt")
+
+    def _cached(self, url):
+        """Cache entry and body of a URL, None when missing or unreadable"""
+        with self.lock:
+            entry = self.index.get(url)
+        if not entry:
+            return None, None
+        try:
+            with open(self._body_path(url), "r", encoding="utf-8") as f:
+                return entry, f.read()
+        except OSError:
+            return None, None
+
+    def _store(self, url, text, response):
+        if not self.cache_dir:
+            return
+        entry = {"etag": response.headers.get("etag"), "last_modified": response.headers.get("last-modified"),
+                 "fetched_at": time.time()}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._body_path(url), "w", encoding="utf-8") as f:
+                f.write(text)
+            with self.lock:
+                self.index[url] = entry
+                self._save_index()
+        except OSError as e:
+            print(f"Error writing code cache: {e}")
+
+    def _touch(self, url):
+        with self.lock:
+            if url in self.index:
+                self.index[url]["fetched_at"] = time.time()
+                self._save_index()
+
+    def _save_index(self):
+        """Written atomically so a crash never leaves a truncated index (caller holds the lock)"""
+        temp_path = self._index_path() + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(temp_path, self._index_path())
+
+    @staticmethod
+    def _read_limited(response):
+        """Body of a streamed response, None as soon as it grows past MAX_BYTES"""
+        if int(response.headers.get("content-length") or 0) > MAX_BYTES:
+            return None
+        body = bytearray()
+        for chunk in response.iter_bytes():
+            body += chunk
+            if len(body) > MAX_BYTES:
+                return None
+        return bytes(body)
+
+    def _decode(self, response, body, is_raw):
+        """Code text of a response body, empty when it is not what we asked for"""
+        text = body.decode(response.encoding or "utf-8", errors="replace")
+        is_html = "html" in response.headers.get("content-type", "").lower()
+        if is_html:
+            # A raw endpoint answering with HTML is a login, consent or virus-scan page
+            return "" if is_raw else extract_code_from_html(text)
+        return text.strip()
+
+    def fetch(self, url: str) -> FetchResult:
+        """Code behind one URL, from the cache, a conditional request or a full download"""
+        start = time.perf_counter()
+        fetch_url, is_raw = rewrite_url(url)
+        entry, cached_text = self._cached(fetch_url)
+
+        def result(text, source, error=""):
+            with self.lock:
+                self.stats[source] += 1
+            return FetchResult(url, fetch_url, text, source, time.perf_counter() - start, error)
+
+        if entry and time.time() - entry.get("fetched_at", 0) < self.max_age:
+            return result(cached_text, "cache")
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            # Streamed so an oversized body is dropped at MAX_BYTES instead of downloaded in full
+            with self.client.stream("GET", fetch_url, headers=headers) as response:
+                if response.status_code == 304 and entry:
+                    self._touch(fetch_url)
+                    return result(cached_text, "revalidated")
+                response.raise_for_status()
+                body = self._read_limited(response)
+            if body is None:
+                return result("", "failed", f"larger than {MAX_BYTES} bytes")
+            text = self._decode(response, body, is_raw)
+            if not text:
+                return result("", "failed", f"no code in {response.headers.get('content-type', 'response')}")
+            self._store(fetch_url, text, response)
+            return result(text, "network")
+        except httpx.HTTPError as e:
+            if entry:
+                # Serving an old copy beats opening a browser tab
+                return result(cached_text, "stale", str(e))
+            return result("", "failed", str(e))
+
+    def fetch_all(self, urls):
+        """FetchResults for all URLs, downloaded concurrently and returned in order"""
+        return list(self.executor.map(self.fetch, urls))
+
+    def prefetch(self, urls):
+        """Start downloading the URLs in the background, returns a Future of each URL's FetchResult"""
+        return {url: self.executor.submit(self.fetch, url) for url in urls}
+
+    def summary(self) -> str:
+        with self.lock:
+            stats = sorted(self.stats.items())
+        return ", ".join(f"{source} {count}" for source, count in stats)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
@@ -0,0 +1,247 @@
+import ast
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows, only the wall-clock timeout applies
+    resource = None
+
+# Limits for one snippet run
+CPU_SECONDS = 2
+MEMORY_MB = 256
+WALL_TIMEOUT = 3.0
+MAX_OUTPUT_BYTES = 64 * 1024
+SANDBOX_PATH = "/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"
+
+# Runs inside the child interpreter before the snippet: once the interpreter is up, no more processes
+BOOTSTRAP = r"""
+import resource, sys
+resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+code = sys.stdin.read()
+exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+"""
+
+# Runs in new network and mount namespaces: an empty root with read-only system and Python
+# directories and the scratch directory, then the interpreter without privileges
+SANDBOX_SCRIPT = r"""
+set -e
+root="$1"; work="$2"; dirs="/usr:/bin:/sbin:/lib:/lib32:/lib64:/libx32:$3"; shift 3
+mount -t tmpfs -o size=16m,mode=755 tmpfs "$root"
+IFS=:
+for dir in $dirs; do
+    if [ -L "$dir" ]; then
+        ln -s "$(readlink "$dir")" "$root$dir"
+    elif [ -d "$dir" ] && [ ! -e "$root$dir" ]; then
+        mkdir -p "$root$dir"
+        mount --rbind "$dir" "$root$dir"
+        mount -o remount,bind,ro "$root$dir"
+    fi
+done
+unset IFS
+mkdir -p "$root/dev" "$root/work"
+for dev in null zero urandom random; do
+    touch "$root/dev/$dev"
+    mount --bind "/dev/$dev" "$root/dev/$dev"
+done
+mount --bind "$work" "$root/work"
+mount -o remount,ro "$root"
+exec chroot "$root" /bin/sh -c 'cd /work && exec "$@"' sh "$@"
+"""
+
+# Markers of code that is clearly not Python
+NON_PYTHON_MARKERS = [
+    r"#include\s*<", r"\bpublic\s+static\s+void\b", r"\bconsole\.log\(", r"\bSystem\.out\.print",
+    r"\bfunc\s+main\(", r"\bfn\s+main\(", r"\bstd::", r"^\s*(?:let|const|var)\s+\w+\s*=", r";\s*$",
+]
+
+
+@dataclass
+class RunResult:
+    stdout: str
+    stderr: str
+    exception: Optional[str]
+    timed_out: bool
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.exception is None
+
+
+def extract_python_snippet(text: str) -> Optional[str]:
+    """Return the Python code in a question, or None if there is no runnable Python"""
+    if not text:
+        return None
+
+    # Prefer fenced code blocks, then code appended after "Code from <url>:"
+    fenced = re.findall(r"```(?:python|py)?\s*\n(.*?)```", text, re.DOTALL)
+    candidates = fenced or []
+    appended = re.split(r"\n\s*Code from \S+:\n", text, maxsplit=1)
+    if len(appended) == 2:
+        candidates.append(appended[1])
+    candidates.append(text)
+
+    for candidate in candidates:
+        code = _strip_line_numbers(candidate).strip("\n")
+        if not code.strip():
+            continue
+        if any(re.search(marker, code, re.MULTILINE) for marker in NON_PYTHON_MARKERS):
+            continue
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            continue
+        # Plain prose can parse as an expression; require statements or calls
+        if any(isinstance(node, (ast.Call, ast.FunctionDef, ast.ClassDef, ast.Assign, ast.For, ast.While, ast.Import))
+               for node in ast.walk(tree)):
+            return code
+
+    return None
+
+
+def _strip_line_numbers(code: str) -> str:
+    """Remove leading line numbers copied from code viewers ('1 ', '2 |')"""
+    lines = code.split("\n")
+    numbered = [re.match(r"^\s*\d+\s*[|:]?\s?", line) for line in lines if line.strip()]
+    if numbered and all(numbered) and len(numbered) > 1:
+        return "\n".join(re.sub(r"^\s*\d+\s*[|:]?\s?", "", line, count=1) for line in lines)
+    return code
+
+
+def _limit_resources():
+    """Applied in the child before exec: CPU time, memory and file size limits"""
+    resource.setrlimit(resource.RLIMIT_CPU, (CPU_SECONDS, CPU_SECONDS))
+    memory = MEMORY_MB * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+
+
+def _sandbox_command(root: str, workdir: str) -> List[str]:
+    """unshare + chroot command line that runs the bootstrap without network, files or privileges"""
+    executable = os.path.realpath(sys.executable)
+    python_dirs = {os.path.realpath(path) for path in (sys.prefix, sys.base_prefix, os.path.dirname(executable))}
+    if os.geteuid() == 0:
+        # Real root: a plain namespace, then nobody without capabilities so RLIMIT_NPROC applies
+        unshare = ["unshare", "--net", "--mount"]
+        drop = ["setpriv", "--reuid=65534", "--regid=65534", "--clear-groups"]
+    else:
+        unshare = ["unshare", "--map-root-user", "--net", "--mount"]
+        drop = ["setpriv"]
+    drop += ["--bounding-set=-all", "--inh-caps=-all", "--no-new-privs"]
+    return unshare + ["--", "sh", "-c", SANDBOX_SCRIPT, "sh", root, workdir, ":".join(sorted(python_dirs)),
+                      *drop, executable, "-I", "-c", BOOTSTRAP]
+
+
+def _run_sandboxed(code: str, timeout: float):
+    """Run the bootstrap in the sandbox with a fresh scratch directory, returns the CompletedProcess"""
+    with tempfile.TemporaryDirectory(prefix="snippet_") as tempdir:
+        root, workdir = os.path.join(tempdir, "root"), os.path.join(tempdir, "work")
+        os.mkdir(root)
+        os.mkdir(workdir)
+        os.chmod(workdir, 0o777)
+        return subprocess.run(
+            _sandbox_command(root, workdir),
+            input=code.encode("utf-8"),
+            capture_output=True,
+            timeout=timeout,
+            # Nothing from the agent's environment, API keys included
+            env={"PATH": SANDBOX_PATH, "PYTHONIOENCODING": "utf-8", "LANG": "C.UTF-8"},
+            preexec_fn=_limit_resources,
+        )
+
+
+_sandbox_status = None
+
+
+def sandbox_available() -> bool:
+    """Whether snippets can run isolated here: Linux with unshare, setpriv and namespace support"""
+    global _sandbox_status
+    if _sandbox_status is None:
+        if resource is None or not sys.platform.startswith("linux") or not shutil.which("unshare", path=SANDBOX_PATH):
+            _sandbox_status = False
+        else:
+            try:
+                probe = _run_sandboxed("print('ok')", timeout=10)
+                _sandbox_status = probe.returncode == 0 and probe.stdout.strip() == b"ok"
+                if not _sandbox_status:
+                    print(f"Code sandbox unavailable: {probe.stderr.decode('utf-8', 'replace').strip()[-200:]}")
+            except Exception as e:
+                print(f"Code sandbox unavailable: {e}")
+                _sandbox_status = False
+    return _sandbox_status
+
+
+def run_python_snippet(code: str, timeout: float = WALL_TIMEOUT) -> RunResult:
+    """Run a snippet in an isolated interpreter subprocess and capture its output.
+
+    Refuses to run, with a SandboxUnavailable exception, where the isolation cannot be set up."""
+    start_time = time.time()
+    if not sandbox_available():
+        return RunResult("", "", "SandboxUnavailable: snippets are only run inside a Linux namespace sandbox",
+                         False, 0.0)
+    try:
+        completed = _run_sandboxed(code, timeout)
+    except subprocess.TimeoutExpired as e:
+        return RunResult((e.stdout or b"").decode("utf-8", "replace"), "", None, True, time.time() - start_time)
+
+    stdout = completed.stdout[:MAX_OUTPUT_BYTES].decode("utf-8", "replace")
+    stderr = completed.stderr[:MAX_OUTPUT_BYTES].decode("utf-8", "replace")
+
+    exception = None
+    if completed.returncode != 0:
+        # Last traceback line, e.g. "ZeroDivisionError: division by zero"
+        lines = [line for line in stderr.strip().split("\n") if line.strip()]
+        exception = lines[-1].strip() if lines else f"exit code {completed.returncode}"
+        if completed.returncode < 0:
+            # Killed by a signal, most likely the CPU limit
+            return RunResult(stdout, stderr, exception, True, time.time() - start_time)
+
+    return RunResult(stdout, stderr, exception, False, time.time() - start_time)
+
+
+def _normalize(text: str) -> str:
+    text = text.strip().lower()
+    text = re.sub(r"^option\s*\d+\s*:\s*", "", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def match_result_to_choices(result: RunResult, choices: List[str]) -> Optional[int]:
+    """Find the choice matching the snippet's output or error, or None"""
+    if result.timed_out:
+        return None
+
+    normalized_choices = [_normalize(choice) for choice in choices]
+
+    if result.exception:
+        exception_name = result.exception.split(":", 1)[0].strip().lower()
+        for i, choice in enumerate(normalized_choices):
+            if exception_name and exception_name in choice:
+                return i
+        # Any other error is left to the LLM, guessing "the error choice" is wrong more often than not
+        return None
+
+    output = result.stdout.strip()
+    candidates = [output, " ".join(output.split()), output.split("\n")[-1] if output else ""]
+    for candidate in candidates:
+        candidate = _normalize(candidate)
+        if not candidate:
+            continue
+        for i, choice in enumerate(normalized_choices):
+            if choice == candidate:
+                return i
+
+    # Output printed line by line vs choices written on one line
+    joined = _normalize(" ".join(output.split("\n")))
+    for i, choice in enumerate(normalized_choices):
+        if joined and re.sub(r"[,\s]+", " ", choice) == re.sub(r"[,\s]+", " ", joined):
+            return i
+
+    return None
@@ -0,0 +1,81 @@
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Kahoot's default question time limit, used when the countdown cannot be read
+DEFAULT_QUESTION_TIME = 20.0
+# Seconds kept in reserve for matching and clicking the answer
+CLICK_RESERVE = 1.5
+
+
+def parse_timer_text(text: str) -> Optional[float]:
+    """Parse a countdown value like '17', '0:17' or '17s' into seconds"""
+    if not text:
+        return None
+
+    text = text.strip().lower()
+
+    minutes_match = re.fullmatch(r'(\d+):(\d{1,2})', text)
+    if minutes_match:
+        return int(minutes_match.group(1)) * 60 + int(minutes_match.group(2))
+
+    seconds_match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*(?:s|sec|secs|seconds)?', text)
+    if seconds_match:
+        seconds = float(seconds_match.group(1))
+        # Anything above a few minutes is not a question countdown
+        return seconds if 0 < seconds <= 240 else None
+
+    return None
+
+
+class QuestionBudget:
+    """Time budget for answering one question, derived from the on-screen countdown"""
+
+    def __init__(self, time_left: Optional[float], reserve: float = CLICK_RESERVE):
+        self.started_at = time.time()
+        self.from_timer = time_left is not None
+        self.time_limit = time_left if time_left is not None else DEFAULT_QUESTION_TIME
+        self.reserve = reserve
+        self.deadline = self.started_at + self.time_limit
+
+    def elapsed(self) -> float:
+        return time.time() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.time())
+
+    def llm_timeout(self) -> float:
+        """Time left for model calls once the click reserve is set aside"""
+        return max(0.0, self.remaining() - self.reserve)
+
+    def expired(self) -> bool:
+        return self.llm_timeout() <= 0
+
+    def __repr__(self):
+        source = "timer" if self.from_timer else "default"
+        return f"QuestionBudget({self.time_limit:.0f}s from {source}, {self.remaining():.1f}s left)"
+
+
+def heuristic_answer(choices: List[str]) -> List[str]:
+    """Best guess without a model: 'all of the above' if offered, otherwise the longest choice"""
+    if not choices:
+        return []
+
+    texts = [choice.split(":", 1)[1].strip() if ":" in choice else choice for choice in choices]
+    for text in texts:
+        if "all of the above" in text.lower():
+            return [text.lower()]
+
+    return [max(texts, key=len).lower()]
+
+
+def fallback_answer(cached_answer: Optional[List[str]], early_answer: Callable[[], Optional[List[str]]],
+                    choices: List[str]) -> Tuple[str, List[str]]:
+    """(source, options) of the best answer without the model: cached, then early, then heuristic"""
+    if cached_answer:
+        return "cached", cached_answer
+    # Only looked at when there is no cached answer
+    early_options = early_answer()
+    if early_options:
+        return "early", early_options
+    return "heuristic", heuristic_answer(choices)
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Defines window.__kahootSnapshot(), which reads everything the agent needs from the page
+# in one pass. Shared with the phase observer so both classify the page the same way.
+SNAPSHOT_FUNCTION_JS = r"""
+if (!window.__kahootSnapshot) {
+    const visible = el => !!el && el.getClientRects().length > 0
+        && getComputedStyle(el).visibility !== 'hidden';
+    const firstText = (selectors, minLength, requireVisible) => {
+        for (const selector of selectors) {
+            for (const el of document.querySelectorAll(selector)) {
+                const text = (el.innerText || el.textContent || '').trim();
+                if (text.length > minLength && (!requireVisible || visible(el))) return text;
+            }
+        }
+        return '';
+    };
+    const pageRect = el => {
+        const r = el.getBoundingClientRect();
+        return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+    };
+    const readChoices = () => {
+        const choices = [];
+        for (let i = 0; i < 4; i++) {
+            const textEl = document.querySelector(`[data-functional-selector='question-choice-text-${i}']`);
+            if (!textEl) continue;
+            const selector = `[data-functional-selector='answer-${i}']`;
+            const button = document.querySelector(selector);
+            choices.push({text: (textEl.innerText || textEl.textContent || '').trim(),
+                          selector: button ? selector : null, visible: visible(button || textEl)});
+        }
+        if (choices.length) return choices;
+        const seen = new Set();
+        for (const selector of ["button[data-functional-selector^='answer-']", "button[class*='answer']",
+                                ".answer-button", ".choice-container", "[class*='choice']",
+                                "button[aria-label*='Answer']"]) {
+            for (const el of document.querySelectorAll(selector)) {
+                if (seen.has(el) || choices.length >= 4) continue;
+                seen.add(el);
+                const functional = el.getAttribute('data-functional-selector');
+                choices.push({text: (el.innerText || el.textContent || '').trim(),
+                              selector: functional ? `[data-functional-selector='${functional}']`
+                                                   : `//button[position()=${choices.length + 1}]`,
+                              visible: visible(el)});
+            }
+            if (choices.length >= 4) break;
+        }
+        return choices;
+    };
+    const readImage = mediaSelectors => {
+        for (const selector of mediaSelectors) {
+            let best = null;
+            for (const el of document.querySelectorAll(selector)) {
+                const rect = pageRect(el);
+                if (!best || rect.width * rect.height > best.rect.width * best.rect.height) best = {selector, rect};
+            }
+            if (best) return best;
+        }
+        return null;
+    };
+    const readTimer = () => {
+        for (const selector of ["[data-functional-selector*='countdown']", "[data-functional-selector*='timer']",
+                                "[class*='countdown']", "[class*='timer']"]) {
+            for (const el of document.querySelectorAll(selector)) {
+                const text = (el.innerText || el.textContent || '').trim();
+                if (/^\d+(:\d{1,2})?(\.\d+)?\s*s?$/i.test(text)) return text;
+            }
+        }
+        return '';
+    };
+    window.__kahootSnapshot = (mediaSelectors, full) => {
+        const url = location.href;
+        const buttons = document.querySelectorAll(
+            "[data-functional-selector^='answer-'], button[class*='answer'], .answer-button");
+        const buttonsVisible = Array.from(buttons).some(visible);
+        const text = document.body ? document.body.innerText.toLowerCase() : '';
+        let phase = 'other';
+        if (url.includes('/ranking') || url.includes('podium')) phase = 'finished';
+        else if (url.includes('/result')) phase = 'result';
+        else if (buttonsVisible) phase = 'question';
+        else if (url.includes('getready')
+                 || visible(document.querySelector("[data-functional-selector*='countdown'], [data-functional-selector*='timer']"))
+                 || ['get ready', 'question countdown', 'loading question', 'up next'].some(i => text.includes(i)))
+            phase = 'get_ready';
+        else if (url.includes('lobby')
+                 || ["you're in", 'see your nickname', 'waiting for', 'starting soon'].some(i => text.includes(i)))
+            phase = 'lobby';
+
+        const title = phase === 'get_ready'
+            ? firstText(["h1", "h2", ".title", "[class*='title']", "[class*='question']",
+                         "[data-functional-selector*='title']"], 5, true)
+            : firstText(["[data-functional-selector='block-title']", "[data-functional-selector='question-title']",
+                         "h1", ".question-title", ".block-title", "[class*='question']", "[class*='title']"], 0, false);
+        const snapshot = {url, phase, title, buttons_visible: buttonsVisible, t: Date.now()};
+        if (full) {
+            snapshot.choices = readChoices();
+            snapshot.image = readImage(mediaSelectors || []);
+            snapshot.timer_text = readTimer();
+        }
+        return snapshot;
+    };
+}
+"""
+
+TAKE_SNAPSHOT_JS = SNAPSHOT_FUNCTION_JS + "\nreturn window.__kahootSnapshot(arguments[0], true);"
+
+
+@dataclass
+class PageSnapshot:
+    """Everything the agent reads from the game page, captured in one script call"""
+    url: str = ""
+    phase: str = "other"
+    title: str = ""
+    choices: List[str] = field(default_factory=list)
+    answer_selectors: List[Optional[str]] = field(default_factory=list)
+    choices_visible: List[bool] = field(default_factory=list)
+    buttons_visible: bool = False
+    image_selector: Optional[str] = None
+    image_rect: Optional[dict] = None
+    timer_text: str = ""
+    taken_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageSnapshot":
+        choices = data.get("choices") or []
+        image = data.get("image") or {}
+        return cls(
+            url=data.get("url", ""),
+            phase=data.get("phase", "other"),
+            title=data.get("title", ""),
+            choices=[choice.get("text", "") for choice in choices],
+            answer_selectors=[choice.get("selector") for choice in choices],
+            choices_visible=[bool(choice.get("visible")) for choice in choices],
+            buttons_visible=bool(data.get("buttons_visible")),
+            image_selector=image.get("selector"),
+            image_rect=image.get("rect"),
+            timer_text=data.get("timer_text", ""),
+        )
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.taken_at
+
+
+def take_snapshot(driver, media_selectors=()) -> Optional[PageSnapshot]:
+    """Read the page in a single round trip, None if the script fails"""
+    try:
+        return PageSnapshot.from_dict(driver.execute_script(TAKE_SNAPSHOT_JS, list(media_selectors)) or {})
+    except Exception as e:
+        print(f"Error taking page snapshot: {e}")
+        return None
+
+
+class RoundTripCounter:
+    """Counts WebDriver commands, each one an HTTP round trip to chromedriver, by wrapping driver.execute"""
+
+    def __init__(self, driver):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        original_execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            with self.lock:
+                self.counts[driver_command] += 1
+            return original_execute(driver_command, params)
+
+        driver.execute = counted_execute
+
+    @property
+    def total(self) -> int:
+        with self.lock:
+            return sum(self.counts.values())
+
+    def reset(self) -> Counter:
+        """Return the counts so far and start again from zero"""
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    @staticmethod
+    def describe(counts: Counter, top: int = 4) -> str:
+        breakdown = ", ".join(f"{command} {count}" for command, count in counts.most_common(top))
+        return f"{sum(counts.values())} round trips" + (f" ({breakdown})" if breakdown else "")
@@ -0,0 +1,189 @@
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+# What chromedriver says when it does not match the installed Chrome, e.g. "This version of ChromeDriver
+# only supports Chrome version 114. Current browser version is 120.0.6099.109"
+VERSION_MISMATCH_PATTERN = re.compile(r"only supports chrome version|current browser version is", re.IGNORECASE)
+
+
+def is_version_mismatch(message) -> bool:
+    """Whether a SessionNotCreatedException message blames the driver version, not e.g. a locked profile"""
+    return bool(VERSION_MISMATCH_PATTERN.search(message or ""))
+
+
+def _default_installer():
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+class DriverPathCache:
+    """Remembers the chromedriver that webdriver-manager resolved, so later starts need no network"""
+
+    def __init__(self, path=".chromedriver.json", max_age_days=7.0, installer=None):
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+        self.installer = installer or _default_installer
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if os.path.isfile(entry.get("driver_path", "")) and os.access(entry["driver_path"], os.X_OK):
+                return entry
+        except (OSError, ValueError, AttributeError):
+            pass
+        return None
+
+    def _save(self, driver_path):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"driver_path": driver_path, "resolved_at": time.time()}, f)
+        except OSError as e:
+            print(f"Error saving driver path cache: {e}")
+
+    def resolve(self, refresh=False):
+        """(driver path, source) from the cache, webdriver-manager, an old cache entry or PATH.
+
+        The path is None when nothing was found, Selenium Manager then resolves the driver itself."""
+        entry = self._load()
+        if entry and not refresh and time.time() - entry.get("resolved_at", 0) < self.max_age:
+            return entry["driver_path"], "cache"
+        try:
+            driver_path = self.installer()
+            self._save(driver_path)
+            return driver_path, "download"
+        except Exception as e:
+            print(f"Could not resolve chromedriver online: {e}")
+        # Offline: an outdated driver usually still matches the installed Chrome
+        if entry and not refresh:
+            return entry["driver_path"], "offline cache"
+        driver_path = shutil.which("chromedriver")
+        if driver_path:
+            return driver_path, "PATH"
+        return None, "selenium manager"
+
+
+class StartupTimer:
+    """Wall-clock duration of each startup phase"""
+
+    def __init__(self):
+        self.phases = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.phases.append((name, seconds))
+
+    def total(self):
+        with self.lock:
+            return sum(seconds for _, seconds in self.phases)
+
+    def report(self):
+        with self.lock:
+            phases = list(self.phases)
+        if not phases:
+            return "no startup phases recorded"
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases) + \
+            f" (total {sum(seconds for _, seconds in phases):.2f}s)"
+
+
+class BrowserPool:
+    """Launches and warms browsers in the background so one is ready the moment it is needed"""
+
+    def __init__(self, factory, size=1, refill=False):
+        self.factory = factory  # factory(slot) -> a ready driver, slot numbers are unique per pool
+        self.size = size
+        self.refill = refill  # Start a replacement whenever a browser is taken
+        self.ready = queue.Queue()
+        self.lock = threading.Lock()
+        self.next_slot = 0
+        self.pending = 0  # Launches not finished yet
+        self.closed = False
+        self.launch_times = []
+        self.failures = 0
+        for _ in range(size):
+            self._launch()
+
+    def _launch(self):
+        with self.lock:
+            if self.closed:
+                return
+            slot = self.next_slot
+            self.next_slot += 1
+            self.pending += 1
+        threading.Thread(target=self._warm, args=(slot,), daemon=True, name=f"browser-pool-{slot}").start()
+
+    def _warm(self, slot):
+        start = time.perf_counter()
+        try:
+            driver = self.factory(slot)
+        except Exception as e:
+            print(f"Error warming browser {slot}: {e}")
+            with self.lock:
+                self.failures += 1
+                self.pending -= 1
+            self.ready.put(None)  # Wakes up a waiting acquire instead of leaving it to time out
+            return
+        self.launch_times.append(time.perf_counter() - start)
+        with self.lock:
+            # Queued before pending drops, so acquire never sees neither
+            self.pending -= 1
+            if not self.closed:
+                self.ready.put(driver)
+                return
+        self._quit(driver)
+
+    def acquire(self, timeout=30.0):
+        """A warm driver, waiting up to `timeout` seconds for one still launching, None if none came up"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                driver = self.ready.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if driver is None:
+                # A launch failed, only keep waiting if another one may still succeed
+                with self.lock:
+                    hopeless = self.pending == 0 and self.ready.empty()
+                if hopeless:
+                    return None
+                continue
+            if self.refill:
+                self._launch()
+            return driver
+
+    def close(self):
+        """Quit the browsers nobody took, and those still launching once they are up"""
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                driver = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing pooled browser: {e}")
@@ -0,0 +1,69 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError, wait
+from typing import Dict, List, Optional, Tuple
+
+from match_helper import normalize_answer, similarity
+
+TITLE_MATCH = 0.8  # Least similarity between the get-ready title and the real question text
+
+
+class EarlyAnswer:
+    """Answer computed in the background from the get-ready title, validated against the real question later"""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.started_at = time.time()
+        self.cancel_event = threading.Event()
+        self.classified = threading.Event()
+        self.question_type = None
+        self.candidate_types = []
+        self.future = None
+        self.code_futures = {}  # URL -> Future of the linked code's FetchResult, started with the title
+
+    def set_classification(self, question_type: str, candidate_types: List[str]):
+        self.question_type = question_type
+        self.candidate_types = list(candidate_types)
+        self.classified.set()
+
+    def classification(self, timeout: float = 0.0) -> Optional[Tuple[str, List[str]]]:
+        """(question type, candidate types) once the early classification finished, else None"""
+        if self.classified.wait(timeout) and self.question_type:
+            return self.question_type, self.candidate_types
+        return None
+
+    def matches(self, question_text: str) -> bool:
+        """Whether the real question is the one announced on the get-ready screen"""
+        return similarity(normalize_answer(self.title), normalize_answer(question_text)) >= TITLE_MATCH
+
+    def options(self, timeout: float = 0.0) -> Optional[List[str]]:
+        """The early answer's options, waiting up to `timeout` seconds, None if unavailable"""
+        if self.future is None:
+            return None
+        try:
+            answer = self.future.result(timeout=max(0.0, timeout))
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            print(f"Early answer failed: {e}")
+            return None
+        return list(answer.correct_options) if answer and answer.correct_options else None
+
+    def prefetched_code(self, timeout: float = 0.0) -> Dict[str, object]:
+        """FetchResults of the linked code that finished within `timeout` seconds, by URL"""
+        if not self.code_futures:
+            return {}
+        wait(self.code_futures.values(), timeout=max(0.0, timeout))
+        results = {}
+        for url, future in self.code_futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results[url] = future.result()
+        return results
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+        # Downloads already running still finish into the code cache
+        for future in self.code_futures.values():
+            future.cancel()
@@ -6,6 +6,7 @@ Updated for OpenAI API v1.0+ and latest best practices.
 """
 
 import os
+import sys
 import json
 import pickle
 import numpy as np
@@ -13,13 +14,16 @@ import faiss
 from docx import Document
 import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI
 from typing import List, Dict, Any
 import time
 from pathlib import Path
 
 load_dotenv()
 
+# Shared client setup of the agent: LLM_BASE_URL and the LLM_CASSETTE_* record/replay transport
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_helper import openai_client
+
 # -------- CONFIGURATION --------
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # Ensure this env var is set
 EMBEDDING_MODEL = "text-embedding-3-large"
@@ -32,8 +36,11 @@ MAX_TOKENS = 500  # max tokens per chunk
 TOP_K = 5  # number of chunks to retrieve per query
 BATCH_SIZE = 100  # Increased batch size for better efficiency
 
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # Optional OpenAI-compatible server, e.g. fake_openai_server.py
+LLM_CASSETTE_MODE = (os.getenv("LLM_CASSETTE_MODE") or "off").lower()  # "replay" needs no API key
+
 # -------- INITIALIZE OPENAI CLIENT --------
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = openai_client()
 
 # -------- UTILITIES --------
 encoding = tiktoken.get_encoding("cl100k_base")
@@ -349,7 +356,7 @@ def interactive_mode(index: faiss.IndexFlatL2, chunks: List[str]) -> None:
 # -------- MAIN SCRIPT --------
 def main():
     """Main function - builds index and runs interactive mode."""
-    if not OPENAI_API_KEY:
+    if not OPENAI_API_KEY and not LLM_BASE_URL and LLM_CASSETTE_MODE != "replay":
         print("ERROR: OPENAI_API_KEY environment variable not set!")
         print("Please set your OpenAI API key in a .env file or environment variable.")
         return
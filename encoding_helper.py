@@ -1,72 +1,310 @@
 import base64
 import binascii
+import codecs
+import heapq
 import urllib.parse
 import html
 import re
 
+import numpy as np
+
+# Search limits for chained decodings such as base64 -> rot13
+MAX_DEPTH = 4
+MAX_STATES = 300
+
+# English-likeness a decoding needs before the search stops
+CONFIDENT_SCORE = 0.6
+# Below this a decoding is reported as "none" even if it beats the input
+MIN_SCORE = 0.35
+# Share of non-ASCII characters above which a decoding is treated as binary noise, not text
+MAX_NON_ASCII = 0.1
+# Decodings with fewer letters than this are too short to tell apart from noise and score lower
+MIN_LETTERS = 4
+# Characters that rarely appear in text: unusual symbols, capitals inside a word, digits stuck to letters
+ODD_CHARS_PATTERN = re.compile(r"[^\w\s.,?!'\"\-:;()+*/=%]|(?<=[a-z])[A-Z]|(?<=[A-Za-z])\d|\d(?=[A-Za-z])")
+# Score cost of each extra layer, so "Paris" beats a Caesar shift of it
+LAYER_PENALTY = 0.05
+# Chains of two or more decodings find English-looking noise more easily, so they need a better score.
+# A Caesar shift counts as two, picking the best of 24 shifts is a search of its own
+CHAIN_MIN_SCORE = 0.5
+
+# Relative letter frequencies of English text, a-z
+ENGLISH_FREQ = np.array([
+    8.17, 1.49, 2.78, 4.25, 12.70, 2.23, 2.02, 6.09, 6.97, 0.15, 0.77, 4.03, 2.41,
+    6.75, 7.51, 1.93, 0.10, 5.99, 6.33, 9.06, 2.76, 0.98, 2.36, 0.15, 1.97, 0.07,
+])
+ENGLISH_FREQ = ENGLISH_FREQ / ENGLISH_FREQ.sum()
+ENGLISH_NORM = np.linalg.norm(ENGLISH_FREQ)
+LOG_FREQ = np.log(ENGLISH_FREQ)
+
+VOWELS = np.array([0, 4, 8, 14, 20])  # a, e, i, o, u
+
+# Row k scores Caesar shift k: cipher letter c decodes to (c - k) % 26
+SHIFT_LOG_FREQ = np.array([np.roll(LOG_FREQ, k) for k in range(26)])
+
+COMMON_WORDS = {
+    "a", "about", "all", "an", "and", "answer", "are", "as", "at", "be", "by", "can", "capital", "city",
+    "color", "colour", "country", "day", "did", "do", "does", "first", "for", "from", "has", "have",
+    "how", "i", "in", "is", "it", "largest", "many", "most", "much", "name", "not", "number", "of",
+    "on", "one", "or", "planet", "result", "the", "this", "to", "two", "was", "what", "when", "where",
+    "which", "who", "why", "will", "with", "world", "year", "you", "your", "hello", "question",
+    "select", "right", "correct", "true", "false", "yes", "no", "plus", "minus", "times", "equal",
+}
+
+
+def english_score(text: str) -> float:
+    """Score how much text looks like English, from 0 (noise) to about 1"""
+    if not text:
+        return 0.0
+
+    printable = sum(1 for ch in text if ch.isprintable() or ch in "\n\t")
+    if printable < 0.95 * len(text):
+        return 0.0
+    if sum(1 for ch in text if ord(ch) > 127) > MAX_NON_ASCII * len(text):
+        return 0.0
+
+    data = np.frombuffer(text.lower().encode("ascii", "ignore"), dtype=np.uint8)
+    letters = data[(data >= 97) & (data <= 122)] - 97
+    if len(letters) == 0:
+        return 0.0
+
+    counts = np.bincount(letters, minlength=26)
+    letter_similarity = float(counts @ ENGLISH_FREQ) / (np.linalg.norm(counts) * ENGLISH_NORM)
+
+    words = re.findall(r"[a-z']+", text.lower())
+    word_ratio = sum(1 for word in words if word in COMMON_WORDS) / len(words) if words else 0.0
+
+    # Shape of natural text: mostly letters, word-sized tokens, a normal share of vowels
+    non_space = len(text) - text.count(" ")
+    letter_ratio = len(letters) / non_space if non_space else 0.0
+    tokens = text.split()
+    word_sized = sum(1 for token in tokens if len(token) <= 12) / len(tokens) if tokens else 0.0
+    vowel_ratio = float(np.isin(letters, VOWELS).mean())
+    vowel_fit = max(0.0, 1 - abs(vowel_ratio - 0.38) * 3)
+    shape = letter_ratio * word_sized * vowel_fit
+
+    score = 0.4 * letter_similarity + 0.4 * min(1.0, word_ratio * 2) + 0.2 * shape
+    odd_share = len(ODD_CHARS_PATTERN.findall(text)) / non_space if non_space else 1.0
+    return score * min(1.0, len(letters) / MIN_LETTERS) * max(0.0, 1 - 3 * odd_share)
+
+
+def _printable(data: bytes):
+    """Decode bytes as UTF-8 text, or None if it is not readable text"""
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if not text or any(not (ch.isprintable() or ch in "\n\t") for ch in text):
+        return None
+    # Random bytes often form valid UTF-8 with a few letters from other scripts
+    if sum(1 for ch in text if ord(ch) > 127) > MAX_NON_ASCII * len(text):
+        return None
+    return text
+
+
+def _decode_base64(text: str):
+    clean = re.sub(r"\s+", "", text)
+    if len(clean) < 4 or not re.fullmatch(r"[A-Za-z0-9+/\-_]+={0,2}", clean):
+        return None
+    clean = clean.rstrip("=")
+    try:
+        return _printable(base64.urlsafe_b64decode(clean.replace("+", "-").replace("/", "_") + "=" * (-len(clean) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _decode_base32(text: str):
+    clean = re.sub(r"\s+", "", text).upper()
+    if len(clean) < 8 or not re.fullmatch(r"[A-Z2-7]+=*", clean):
+        return None
+    clean = clean.rstrip("=")
+    try:
+        return _printable(base64.b32decode(clean + "=" * (-len(clean) % 8)))
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _decode_hex(text: str):
+    if not is_hex(text):
+        return None
+    return _printable(bytes.fromhex(text.replace(" ", "").replace("-", "")))
+
+
+def _decode_binary(text: str):
+    groups = text.split()
+    if len(groups) == 1 and len(groups[0]) % 8 == 0:
+        groups = re.findall(r"[01]{8}", groups[0])
+    if len(groups) < 2 or not all(re.fullmatch(r"[01]{7,8}", group) for group in groups):
+        return None
+    return _printable(bytes(int(group, 2) for group in groups))
+
+
+def _decode_ascii_codes(text: str):
+    groups = re.split(r"[\s,]+", text.strip())
+    if len(groups) < 3 or not all(group.isdigit() and 32 <= int(group) <= 126 for group in groups):
+        return None
+    return "".join(chr(int(group)) for group in groups)
+
+
+def _decode_url(text: str):
+    if not is_url_encoded(text):
+        return None
+    decoded = urllib.parse.unquote_plus(text)
+    return decoded if decoded != text else None
+
+
+def _decode_html(text: str):
+    if "&" not in text or ";" not in text:
+        return None
+    decoded = html.unescape(text)
+    return decoded if decoded != text else None
+
+
+def _decode_rot13(text: str):
+    if not re.search(r"[A-Za-z]{2}", text):
+        return None
+    return codecs.decode(text, "rot13")
+
+
+def _best_caesar_shift(text: str) -> int:
+    """Most English-like Caesar shift, scored for all 26 shifts at once"""
+    data = np.frombuffer(text.lower().encode("ascii", "ignore"), dtype=np.uint8)
+    letters = data[(data >= 97) & (data <= 122)] - 97
+    scores = SHIFT_LOG_FREQ @ np.bincount(letters, minlength=26)
+    scores[[0, 13]] = -np.inf  # Identity and ROT13 are covered elsewhere
+    return int(np.argmax(scores))
+
+
+def _shift_letters(text: str, shift: int) -> str:
+    lower = "abcdefghijklmnopqrstuvwxyz"
+    upper = lower.upper()
+    table = str.maketrans(lower + upper, lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift])
+    return text.translate(table)
+
+
+def _decode_caesar(text: str):
+    if not re.search(r"[A-Za-z]{3}", text):
+        return None
+    return _shift_letters(text, 26 - _best_caesar_shift(text))
+
+
+ATBASH = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "zyxwvutsrqponmlkjihgfedcbaZYXWVUTSRQPONMLKJIHGFEDCBA",
+)
+
+
+def _decode_atbash(text: str):
+    if not re.search(r"[A-Za-z]{3}", text):
+        return None
+    return text.translate(ATBASH)
+
+
+def _decode_reverse(text: str):
+    return text[::-1] if len(text) > 3 else None
+
+
+# Decoders tried at each step, byte encodings before letter ciphers
+TRANSFORMS = [
+    ("url", _decode_url),
+    ("html", _decode_html),
+    ("base64", _decode_base64),
+    ("base32", _decode_base32),
+    ("hex", _decode_hex),
+    ("binary", _decode_binary),
+    ("ascii", _decode_ascii_codes),
+    ("rot13", _decode_rot13),
+    ("caesar", _decode_caesar),
+    ("atbash", _decode_atbash),
+    ("reverse", _decode_reverse),
+]
+
+# Only these can wrap themselves (base64 of base64); any other transform twice in a row is
+# pointless or undoes itself
+NESTABLE = {"base64", "base32", "hex", "binary", "ascii", "url", "html"}
+# Letter substitutions combine into one substitution and commute with reversing, so between two
+# decoding layers at most one of each is useful; more only fit noise better
+LETTER_CIPHERS = {"rot13", "caesar", "atbash"}
+
+
+def _redundant(chain: list, name: str) -> bool:
+    """Whether applying `name` after `chain` only repeats what a shorter chain already tried"""
+    if chain and chain[-1] == name:
+        return name not in NESTABLE
+    tail = []
+    for previous in reversed(chain):
+        if previous not in LETTER_CIPHERS and previous != "reverse":
+            break
+        tail.append(previous)
+    if name in LETTER_CIPHERS:
+        return any(previous in LETTER_CIPHERS for previous in tail)
+    return name == "reverse" and "reverse" in tail
+
+
+def search_decodings(text: str, max_depth: int = MAX_DEPTH) -> tuple[str, list, float]:
+    """
+    Search chains of decodings for the most English-like plaintext.
+    Returns (decoded_text, chain of encoding names, score); the chain is empty if nothing beat the input.
+    """
+    text = text.strip()
+    original_score = english_score(text)
+    best = (text, [], original_score)
+    best_adjusted = original_score
+
+    # Best-first search: expand the most English-like states first
+    counter = 0
+    frontier = [(-original_score, counter, text, [])]
+    seen = {text}
+
+    while frontier and len(seen) < MAX_STATES:
+        _, _, current, chain = heapq.heappop(frontier)
+        if len(chain) >= max_depth:
+            continue
+
+        for name, decode in TRANSFORMS:
+            if _redundant(chain, name):
+                continue
+            try:
+                decoded = decode(current)
+            except Exception:
+                continue
+            if not decoded or decoded in seen:
+                continue
+            seen.add(decoded)
+
+            score = english_score(decoded)
+            new_chain = chain + [name]
+            counter += 1
+            heapq.heappush(frontier, (-score, counter, decoded, new_chain))
+            if len(new_chain) + new_chain.count("caesar") >= 2 and score < CHAIN_MIN_SCORE:
+                continue
+            if score - LAYER_PENALTY * len(new_chain) > best_adjusted:
+                best = (decoded, new_chain, score)
+                best_adjusted = score - LAYER_PENALTY * len(new_chain)
+            if score >= CONFIDENT_SCORE and score >= original_score:
+                return decoded, new_chain, score
+
+    # No confident plaintext; only report a decoding that reads better than the input
+    if best[1] and best[2] > original_score and best[2] >= MIN_SCORE:
+        return best
+    return text, [], original_score
+
 
 def detect_and_decode(text: str) -> tuple[str, str]:
     """
     Detect encoding type and decode the text.
-    Returns (decoded_text, encoding_type)
+    Returns (decoded_text, encoding_type), where chained encodings are joined with '+'
     """
     text = text.strip()
-    
-    # Base64 detection and decoding
-    if is_base64(text):
-        try:
-            decoded = base64.b64decode(text).decode('utf-8')
-            print(f"🔐 Detected Base64 encoding: {text}")
-            print(f"🔓 Decoded: {decoded}")
-            return decoded, "base64"
-        except Exception as e:
-            print(f"Failed to decode Base64: {e}")
-    
-    # URL encoding detection and decoding
-    if '%' in text and is_url_encoded(text):
-        try:
-            decoded = urllib.parse.unquote(text)
-            if decoded != text:  # Only if actually decoded something
-                print(f"🔐 Detected URL encoding: {text}")
-                print(f"🔓 Decoded: {decoded}")
-                return decoded, "url"
-        except Exception as e:
-            print(f"Failed to decode URL encoding: {e}")
-    
-    # HTML entity decoding
-    if '&' in text and (';' in text):
-        try:
-            decoded = html.unescape(text)
-            if decoded != text:  # Only if actually decoded something
-                print(f"🔐 Detected HTML entities: {text}")
-                print(f"🔓 Decoded: {decoded}")
-                return decoded, "html"
-        except Exception as e:
-            print(f"Failed to decode HTML entities: {e}")
-    
-    # Hex decoding
-    if is_hex(text):
-        try:
-            decoded = bytes.fromhex(text).decode('utf-8')
-            print(f"🔐 Detected Hex encoding: {text}")
-            print(f"🔓 Decoded: {decoded}")
-            return decoded, "hex"
-        except Exception as e:
-            print(f"Failed to decode Hex: {e}")
-    
-    # ROT13 decoding
-    if text.isalpha():
-        try:
-            decoded = text.encode('rot13')
-            if decoded != text:
-                print(f"🔐 Detected ROT13 encoding: {text}")
-                print(f"🔓 Decoded: {decoded}")
-                return decoded, "rot13"
-        except Exception as e:
-            print(f"Failed to decode ROT13: {e}")
-    
-    # No encoding detected
-    return text, "none"
+
+    decoded, chain, score = search_decodings(text)
+    if not chain:
+        return text, "none"
+
+    encoding_type = "+".join(chain)
+    print(f"🔐 Detected {encoding_type} encoding: {text}")
+    print(f"🔓 Decoded: {decoded} (score {score:.2f})")
+    return decoded, encoding_type
 
 
 def is_base64(text: str) -> bool:
@@ -75,11 +313,11 @@ def is_base64(text: str) -> bool:
         # Base64 strings should only contain A-Z, a-z, 0-9, +, /, and = for padding
         if not re.match(r'^[A-Za-z0-9+/]*={0,2}$', text):
             return False
-        
+
         # Length should be multiple of 4
         if len(text) % 4 != 0:
             return False
-        
+
         # Try to decode
         base64.b64decode(text, validate=True)
         return True
@@ -106,57 +344,80 @@ def is_hex(text: str) -> bool:
         return False
 
 
+def find_encoded_candidates(question_text: str) -> list:
+    """
+    Find every substring of a question that may be encoded, most specific first.
+    Covers tokens, quoted text, runs of binary/hex/ASCII codes and the text after a colon.
+    """
+    candidates = []
+
+    def add(candidate):
+        candidate = candidate.strip().strip('"\'`')
+        if len(candidate) >= 4 and candidate not in candidates:
+            candidates.append(candidate)
+
+    # Runs of binary, hex or decimal codes separated by spaces
+    for match in re.finditer(r'(?:\b[01]{7,8}\b\s*){2,}', question_text):
+        add(match.group(0))
+    for match in re.finditer(r'(?:\b[0-9A-Fa-f]{2}\b[\s-]*){3,}', question_text):
+        add(match.group(0))
+    for match in re.finditer(r'(?:\b\d{2,3}\b[\s,]*){3,}', question_text):
+        add(match.group(0))
+
+    # Quoted strings and the text after the last colon
+    for match in re.finditer(r'"([^"]+)"|\'([^\']+)\'|`([^`]+)`', question_text):
+        add(next(group for group in match.groups() if group))
+    if ':' in question_text:
+        add(question_text.rsplit(':', 1)[1])
+
+    # Single tokens that look like encoded data, longest first
+    tokens = re.findall(r'[A-Za-z0-9+/=%&#;_\-.]{8,}', question_text)
+    for token in sorted(tokens, key=len, reverse=True):
+        add(token.rstrip('.'))
+
+    return candidates
+
+
 def extract_encoded_string(question_text: str) -> str:
     """
     Extract the encoded string from a question.
-    Looks for common patterns like "encoded in Base64: <string>"
+    Returns the most likely candidate from find_encoded_candidates
     """
-    # Common patterns for encoded questions
-    patterns = [
-        r'encoded in base64[:\s]+([A-Za-z0-9+/=]+)',
-        r'base64[:\s]+([A-Za-z0-9+/=]+)',
-        r'encoded[:\s]+([A-Za-z0-9+/=]+)',
-        r'decode[:\s]+([A-Za-z0-9+/=]+)',
-        r'[:\s]([A-Za-z0-9+/=]{20,})',  # Long base64-like strings
-    ]
-    
-    question_lower = question_text.lower()
-    
-    for pattern in patterns:
-        match = re.search(pattern, question_lower, re.IGNORECASE)
-        if match:
-            encoded_string = match.group(1).strip()
-            print(f"🔍 Found encoded string: {encoded_string}")
-            return encoded_string
-    
-    # If no pattern matches, look for the longest base64-like string
-    words = question_text.split()
-    for word in words:
-        if len(word) > 10 and is_base64(word):
-            print(f"🔍 Found potential Base64 string: {word}")
-            return word
-    
+    candidates = find_encoded_candidates(question_text)
+    if candidates:
+        print(f"🔍 Found encoded string: {candidates[0]}")
+        return candidates[0]
     return ""
 
 
 def handle_encoded_question(question_text: str) -> tuple[str, str]:
     """
     Handle encoded questions by extracting and decoding the encoded part.
+    Every candidate substring is tried; the first confident decoding wins.
     Returns (decoded_text, encoding_type)
     """
-    # First, extract the encoded string from the question
-    encoded_string = extract_encoded_string(question_text)
-    
-    if not encoded_string:
+    candidates = find_encoded_candidates(question_text)
+    if not candidates:
         print("❌ No encoded string found in question")
         return question_text, "none"
-    
-    # Try to decode the extracted string
-    decoded_text, encoding_type = detect_and_decode(encoded_string)
-    
-    if encoding_type != "none":
-        print(f"✅ Successfully decoded {encoding_type} string")
-        return decoded_text, encoding_type
-    else:
+
+    best = None
+    for candidate in candidates:
+        decoded, chain, score = search_decodings(candidate)
+        if not chain:
+            continue
+        if score >= CONFIDENT_SCORE:
+            best = (decoded, chain, score, candidate)
+            break
+        if best is None or score > best[2]:
+            best = (decoded, chain, score, candidate)
+
+    if best is None:
         print("❌ Could not decode the extracted string")
-        return question_text, "none" 
\ No newline at end of file
+        return question_text, "none"
+
+    decoded, chain, score, candidate = best
+    encoding_type = "+".join(chain)
+    print(f"🔍 Found encoded string: {candidate}")
+    print(f"✅ Successfully decoded {encoding_type} string (score {score:.2f}): {decoded}")
+    return decoded, encoding_type
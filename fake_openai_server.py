@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in server for offline, reproducible load tests.
+
+Serves /v1/chat/completions (plain and streamed) and /v1/embeddings with configurable
+latency, error injection and scripted answers. Point the agent at it with
+LLM_BASE_URL=http://127.0.0.1:<port>/v1
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_EMBEDDING_DIMENSIONS = 3072  # text-embedding-3-large, matches faiss.index
+
+
+def parse_latency(spec: str):
+    """
+    Build a latency sampler from a spec such as "fixed:0.5", "uniform:0.2,1.0",
+    "normal:0.8,0.2", "lognormal:-0.5,0.4" (log-space mean and sigma) or "exponential:0.7".
+    """
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v] or [0.0]
+    samplers = {
+        "fixed": lambda rng: values[0],
+        "uniform": lambda rng: rng.uniform(values[0], values[1]),
+        "normal": lambda rng: rng.gauss(values[0], values[1]),
+        "lognormal": lambda rng: rng.lognormvariate(values[0], values[1]),
+        "exponential": lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0,
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+    sampler = samplers[kind]
+    return lambda rng: max(0.0, sampler(rng))
+
+
+def _message_text(messages) -> str:
+    """Concatenate the text parts of chat messages, skipping images"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+def _extract_choices(prompt: str):
+    """Choices from a compact ("- choice") or legacy ("option 1: choice") prompt"""
+    if "Choices:" in prompt:
+        block = prompt.split("Choices:", 1)[1]
+        choices = re.findall(r"^\s*-\s*(.+?)\s*$", block, re.MULTILINE)
+        if choices:
+            return choices
+    return re.findall(r"option\s*\d+\s*:\s*(.+?)\s*$", prompt, re.IGNORECASE | re.MULTILINE)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAIServer:
+    """Threaded local server answering like the OpenAI API"""
+
+    def __init__(self, port: int = 0, latency: str = "fixed:0", token_delay: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, script=None, seed: int = 0):
+        self.latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.script = [(re.compile(entry["match"], re.IGNORECASE), entry) for entry in (script or [])]
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats = {"chat": 0, "stream": 0, "embeddings": 0, "errors": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="fake-openai")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _random(self, sampler):
+        with self.rng_lock:
+            return sampler(self.rng)
+
+    def answer_for(self, prompt: str) -> str:
+        """Scripted answer for a prompt, or a plausible default"""
+        for pattern, entry in self.script:
+            if pattern.search(prompt):
+                if "choice" in entry:
+                    choices = _extract_choices(prompt)
+                    if choices:
+                        return json.dumps({"correct_options": [choices[min(entry["choice"], len(choices) - 1)]]})
+                return entry["response"]
+
+        if "Classify the following question" in prompt:
+            return "logic"
+        choices = _extract_choices(prompt)
+        return json.dumps({"correct_options": [choices[0] if choices else "unknown"]})
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.split("?", 1)[0].rstrip("/")
+
+                time.sleep(server._random(server.latency))
+                if server.error_rate and server._random(lambda rng: rng.random()) < server.error_rate:
+                    server.stats["errors"] += 1
+                    self._send_json(server.error_status, {"error": {
+                        "message": "Injected error", "type": "server_error", "code": None}})
+                    return
+
+                if path.endswith("/chat/completions"):
+                    self._chat(request)
+                elif path.endswith("/embeddings"):
+                    self._embeddings(request)
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+            def _chat(self, request):
+                model = request.get("model", "gpt-4o-mini")
+                prompt = _message_text(request.get("messages", []))
+                content = server.answer_for(prompt)
+                completion_id = f"chatcmpl-fake-{hashlib.md5(prompt.encode()).hexdigest()[:12]}"
+                usage = {"prompt_tokens": _count_tokens(prompt), "completion_tokens": _count_tokens(content)}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+                if not request.get("stream"):
+                    server.stats["chat"] += 1
+                    self._send_json(200, {
+                        "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                     "finish_reason": "stop", "logprobs": None}],
+                        "usage": usage,
+                    })
+                    return
+
+                server.stats["stream"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send_chunk(delta, finish_reason=None, chunk_usage=None):
+                    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                    if chunk_usage is not None:
+                        chunk["choices"], chunk["usage"] = [], chunk_usage
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                try:
+                    send_chunk({"role": "assistant", "content": ""})
+                    # Small pieces like real tokens, so clients can stop reading early
+                    for piece in re.findall(r"\S+\s*|\s+", content):
+                        if server.token_delay:
+                            time.sleep(server.token_delay)
+                        send_chunk({"content": piece})
+                    send_chunk({}, "stop")
+                    if (request.get("stream_options") or {}).get("include_usage"):
+                        send_chunk({}, chunk_usage=usage)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early
+                    pass
+                self.close_connection = True
+
+            def _embeddings(self, request):
+                server.stats["embeddings"] += 1
+                inputs = request.get("input", [])
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                dimensions = request.get("dimensions") or DEFAULT_EMBEDDING_DIMENSIONS
+
+                data = []
+                for i, text in enumerate(inputs):
+                    # Deterministic unit vector per input text
+                    seed = int.from_bytes(hashlib.sha256(str(text).encode()).digest()[:8], "little")
+                    vector = np.random.default_rng(seed).standard_normal(dimensions).astype("float32")
+                    vector /= np.linalg.norm(vector)
+                    if request.get("encoding_format") == "base64":
+                        embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+                    else:
+                        embedding = vector.tolist()
+                    data.append({"object": "embedding", "index": i, "embedding": embedding})
+
+                tokens = sum(_count_tokens(str(text)) for text in inputs)
+                self._send_json(200, {"object": "list", "data": data, "model": request.get("model"),
+                                      "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0", help='e.g. "lognormal:-0.5,0.4" or "uniform:0.2,1.0"')
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--script", help='JSON list of {"match": regex, "response": text} or {"match": regex, "choice": n}')
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    server = FakeOpenAIServer(args.port, args.latency, args.token_delay, args.error_rate,
+                              args.error_status, script, args.seed)
+    print(f"🤖 Fake OpenAI server on {server.base_url}")
+    print(f"   export LLM_BASE_URL={server.base_url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Requests served: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
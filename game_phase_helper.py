@@ -0,0 +1,126 @@
+import hashlib
+import re
+import time
+from enum import Enum
+from typing import List, Optional
+
+import numpy as np
+
+
+class GamePhase(Enum):
+    LOBBY = "lobby"
+    GET_READY = "get_ready"
+    QUESTION = "question"
+    ANSWERED = "answered"
+    RESULT = "result"
+    PODIUM = "podium"
+    UNKNOWN = "unknown"
+
+    @classmethod
+    def from_signal(cls, signal: str) -> "GamePhase":
+        """Map a page snapshot phase ("finished", "other", ...) onto a game phase"""
+        aliases = {"finished": cls.PODIUM, "other": cls.UNKNOWN}
+        if signal in aliases:
+            return aliases[signal]
+        try:
+            return cls(signal)
+        except ValueError:
+            return cls.UNKNOWN
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def question_hash(title: str, choices=()) -> str:
+    """Short content hash of a question's title and choices"""
+    content = _normalize(title) + "\n" + "\n".join(_normalize(choice) for choice in choices)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+class GameStateMachine:
+    """
+    Current game phase fed by page signals. A question is identified by its title within one
+    question phase, so it is claimed for processing exactly once however often it is observed.
+    """
+
+    def __init__(self):
+        self.phase = GamePhase.UNKNOWN
+        self.question_title = ""
+        self.question_choices = []
+        self.question_hash = None
+        self.claimed = False
+        self.transitions = []  # {"t", "from", "to", "question"} in time order
+
+    def observe(self, phase: GamePhase, title: str = "", choices=(), at: Optional[float] = None) -> bool:
+        """Feed one signal, returns True if it moved the machine to another phase or question"""
+        at = at if at is not None else time.time()
+        if phase == GamePhase.UNKNOWN or phase == GamePhase.ANSWERED:
+            # Unknown pages carry no information and only mark_answered() may answer
+            return False
+
+        if phase == GamePhase.QUESTION:
+            title = _normalize(title)
+            if self.phase in (GamePhase.QUESTION, GamePhase.ANSWERED) and title == self.question_title:
+                # Same question still on screen; choices may have rendered after the title
+                if choices and not self.question_choices:
+                    self.question_choices = list(choices)
+                    self.question_hash = question_hash(title, choices)
+                return False
+            self.question_title = title
+            self.question_choices = list(choices)
+            self.question_hash = question_hash(title, choices)
+            self.claimed = False
+            self._transition(GamePhase.QUESTION, at)
+            return True
+
+        if phase == self.phase:
+            return False
+        self._transition(phase, at)
+        return True
+
+    def claim_question(self) -> bool:
+        """True exactly once per question, while it is on screen and not yet answered"""
+        if self.phase != GamePhase.QUESTION or self.claimed:
+            return False
+        self.claimed = True
+        return True
+
+    def mark_answered(self, at: Optional[float] = None):
+        if self.phase == GamePhase.QUESTION:
+            self.claimed = True
+            self._transition(GamePhase.ANSWERED, at if at is not None else time.time())
+
+    @property
+    def finished(self) -> bool:
+        return self.phase == GamePhase.PODIUM
+
+    def _transition(self, phase: GamePhase, at: float):
+        self.transitions.append({"t": at, "from": self.phase.value, "to": phase.value,
+                                 "question": self.question_hash})
+        self.phase = phase
+
+    def latencies(self) -> dict:
+        """Seconds from get-ready to question and from question to answered, per question"""
+        ready_to_question, question_to_answer = [], []
+        ready_at = question_at = None
+        for transition in self.transitions:
+            if transition["to"] == GamePhase.GET_READY.value:
+                ready_at = transition["t"]
+            elif transition["to"] == GamePhase.QUESTION.value:
+                question_at = transition["t"]
+                if ready_at is not None:
+                    ready_to_question.append(question_at - ready_at)
+                ready_at = None
+            elif transition["to"] == GamePhase.ANSWERED.value and question_at is not None:
+                question_to_answer.append(transition["t"] - question_at)
+                question_at = None
+        return {"ready_to_question": ready_to_question, "question_to_answer": question_to_answer}
+
+    def summary(self) -> str:
+        questions = sum(1 for t in self.transitions if t["to"] == GamePhase.QUESTION.value)
+        parts = [f"{questions} questions, {len(self.transitions)} transitions"]
+        for name, values in self.latencies().items():
+            if values:
+                parts.append(f"{name.replace('_', ' ')} p50 {np.percentile(values, 50):.2f}s")
+        return ", ".join(parts)
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable
+
+import numpy as np
+
+
+class AnyEvent:
+    """Read-only view that is set when any of the wrapped events is set"""
+
+    def __init__(self, *events):
+        self.events = [event for event in events if event is not None]
+
+    def is_set(self) -> bool:
+        return any(event.is_set() for event in self.events)
+
+
+class HedgedCaller:
+    """
+    Issue a duplicate request when the first one is slower than a percentile
+    of recently observed latencies, and return whichever finishes first.
+
+    Hedges are capped at max_extra_ratio of all calls (plus one to get started)
+    so tail-latency protection cannot double the spend.
+    """
+
+    def __init__(self, percentile: float = 95, max_extra_ratio: float = 0.1,
+                 min_samples: int = 5, default_delay: float = 3.0, window: int = 100):
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.latencies = deque(maxlen=window)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.capped = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary request before hedging"""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.default_delay
+            return float(np.percentile(np.array(self.latencies), self.percentile))
+
+    def _can_hedge(self) -> bool:
+        with self._lock:
+            return self.hedges < self.max_extra_ratio * self.calls + 1
+
+    def _record(self, latency: float, hedge_won: bool = None):
+        with self._lock:
+            self.latencies.append(latency)
+            if hedge_won is True:
+                self.hedge_wins += 1
+            elif hedge_won is False:
+                self.primary_wins += 1
+
+    def call(self, request: Callable[[threading.Event], Any], cancel_event=None) -> Any:
+        """
+        Run request(cancel_event), hedging it if it is slow.
+        The loser's cancel event is set once a result is available.
+        """
+        with self._lock:
+            self.calls += 1
+
+        start_time = time.time()
+        delay = self.hedge_delay()
+        primary_cancel = threading.Event()
+        primary = self.executor.submit(request, AnyEvent(primary_cancel, cancel_event))
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            result = primary.result()
+            self._record(time.time() - start_time)
+            return result
+
+        if (cancel_event is not None and cancel_event.is_set()) or not self._can_hedge():
+            if not (cancel_event is not None and cancel_event.is_set()):
+                with self._lock:
+                    self.capped += 1
+            result = primary.result()
+            self._record(time.time() - start_time)
+            return result
+
+        with self._lock:
+            self.hedges += 1
+        print(f"🔁 No response after {delay:.2f}s (p{self.percentile:.0f}), sending hedged request")
+        hedge_cancel = threading.Event()
+        hedge = self.executor.submit(request, AnyEvent(hedge_cancel, cancel_event))
+
+        pending = {primary, hedge}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+
+                hedge_won = future is hedge
+                # Stop the slower request
+                (primary_cancel if hedge_won else hedge_cancel).set()
+                self._record(time.time() - start_time, hedge_won)
+                print(f"🔁 {'Hedged' if hedge_won else 'Primary'} request won after {time.time() - start_time:.2f}s")
+                return result
+
+        raise last_error
+
+    def summary(self) -> str:
+        return (f"{self.calls} calls, {self.hedges} hedged ({self.capped} capped), "
+                f"hedge won {self.hedge_wins}, primary won {self.primary_wins}, "
+                f"current trigger {self.hedge_delay():.2f}s at p{self.percentile:.0f}")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from image_helper import load_grayscale
+
+HASH_SIZE = 8  # Each hash is HASH_SIZE * HASH_SIZE = 64 bits
+HASH_DECODE_SIDE = 256  # Images are decoded at most this large before hashing
+DEFAULT_THRESHOLD = 24  # Largest summed Hamming distance over the three hashes (192 bits) for a hit
+
+
+def _resize(gray: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Shrink a grayscale image by averaging the pixels in each cell"""
+    if gray.shape[0] < height or gray.shape[1] < width:
+        # Tiny images are stretched by repeating pixels first
+        gray = np.repeat(np.repeat(gray, -(-height // gray.shape[0]), axis=0), -(-width // gray.shape[1]), axis=1)
+    row_edges = np.linspace(0, gray.shape[0], height + 1).astype(int)
+    col_edges = np.linspace(0, gray.shape[1], width + 1).astype(int)
+    rows = np.add.reduceat(gray, row_edges[:-1], axis=0) / np.diff(row_edges)[:, None]
+    return np.add.reduceat(rows, col_edges[:-1], axis=1) / np.diff(col_edges)[None, :]
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int("".join("1" if bit else "0" for bit in bits.flatten()), 2)
+
+
+def average_hash(gray: np.ndarray) -> int:
+    """aHash: which cells of an 8x8 thumbnail are brighter than the mean"""
+    small = _resize(gray, HASH_SIZE, HASH_SIZE)
+    return _bits_to_int(small > small.mean())
+
+
+def difference_hash(gray: np.ndarray) -> int:
+    """dHash: whether each cell of a 9x8 thumbnail is brighter than its right neighbour"""
+    small = _resize(gray, HASH_SIZE + 1, HASH_SIZE)
+    return _bits_to_int(small[:, :-1] > small[:, 1:])
+
+
+# DCT-II basis for a 32x32 thumbnail
+_DCT_SIZE = 32
+_DCT = np.cos(np.pi * (2 * np.arange(_DCT_SIZE)[None, :] + 1) * np.arange(_DCT_SIZE)[:, None] / (2 * _DCT_SIZE))
+
+
+def perceptual_hash(gray: np.ndarray) -> int:
+    """pHash: low-frequency DCT coefficients of a 32x32 thumbnail compared to their median"""
+    small = _resize(gray, _DCT_SIZE, _DCT_SIZE)
+    coefficients = (_DCT @ small @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # The DC term only reflects overall brightness
+    return _bits_to_int(coefficients > np.median(coefficients[1:]))
+
+
+def image_hashes(image_data: bytes) -> Tuple[int, int, int]:
+    """(aHash, dHash, pHash) of an encoded image"""
+    gray = load_grayscale(image_data, max_side=HASH_DECODE_SIDE)
+    return average_hash(gray), difference_hash(gray), perceptual_hash(gray)
+
+
+def hash_distance(first: Tuple[int, ...], second: Tuple[int, ...]) -> int:
+    """Summed Hamming distance between two hash tuples"""
+    return sum((a ^ b).bit_count() for a, b in zip(first, second))
+
+
+def normalize_question(text: str) -> str:
+    """Question text as a cache key: lowercase, single spaces, without selector metadata"""
+    text = text.split("\n\nAnswer selectors:", 1)[0]
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+class ImageAnswerCache:
+    """Answers to image questions keyed by question text and perceptual hashes, saved as JSON"""
+
+    def __init__(self, path: str = "image_answer_cache.json", threshold: int = DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.entries = []
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+            print(f"🗂️ Loaded {len(self.entries)} cached image answers from {self.path}")
+        except Exception as e:
+            print(f"Error loading image answer cache: {e}")
+            self.entries = []
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            # Write to a temporary file first so a crash cannot leave half a cache
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving image answer cache: {e}")
+
+    def lookup(self, hashes: Tuple[int, int, int], question_text: str) -> Optional[List[str]]:
+        """Cached answer for a known image and question, or None"""
+        key = normalize_question(question_text)
+        with self.lock:
+            best, best_distance = None, self.threshold + 1
+            for entry in self.entries:
+                if entry["question"] != key:
+                    continue
+                distance = hash_distance(hashes, tuple(int(h, 16) for h in entry["hashes"]))
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            best["hits"] = best.get("hits", 0) + 1
+            print(f"🗂️ Image cache hit (distance {best_distance}/{HASH_SIZE * HASH_SIZE * 3}): {best['answer']}")
+            return list(best["answer"])
+
+    def store(self, hashes: Tuple[int, int, int], question_text: str, answer: List[str]):
+        """Remember the answer to an image question"""
+        key = normalize_question(question_text)
+        hex_hashes = [f"{h:016x}" for h in hashes]
+        with self.lock:
+            for entry in self.entries:
+                if entry["question"] == key and entry["hashes"] == hex_hashes:
+                    entry["answer"] = list(answer)
+                    break
+            else:
+                self.entries.append({"question": key, "hashes": hex_hashes, "answer": list(answer),
+                                     "hits": 0, "created": time.time()})
+            self._save()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"{len(self.entries)} cached images, {self.hits} hits / {total} lookups ({rate:.0f}%)"
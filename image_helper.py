@@ -0,0 +1,77 @@
+import base64
+import io
+import time
+
+import numpy as np
+
+# Pillow is optional; without it images are sent as captured
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+IMAGE_MIME_TYPES = {"jpeg": "image/jpeg", "jpg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+def compress_image(image_data: bytes, max_side: int = 1024, image_format: str = "jpeg", quality: int = 80) -> tuple[bytes, str]:
+    """
+    Downscale an image so its longest side is at most max_side and re-encode it.
+    Returns (image_bytes, mime_type); the PNG is returned unchanged if Pillow is missing or encoding fails.
+    """
+    if not PIL_AVAILABLE:
+        return image_data, "image/png"
+
+    image_format = image_format.lower()
+    if image_format not in IMAGE_MIME_TYPES:
+        print(f"Unknown image format '{image_format}', using jpeg")
+        image_format = "jpeg"
+
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        if max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        # JPEG has no alpha channel
+        if image_format in ("jpeg", "jpg") and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        pil_format = "JPEG" if image_format in ("jpeg", "jpg") else image_format.upper()
+        image.save(output, format=pil_format, quality=quality, optimize=True)
+        compressed = output.getvalue()
+    except Exception as e:
+        print(f"Error compressing image: {e}")
+        return image_data, "image/png"
+
+    # Re-encoding a tiny PNG can make it bigger
+    if len(compressed) >= len(image_data):
+        return image_data, "image/png"
+    return compressed, IMAGE_MIME_TYPES[image_format]
+
+
+def to_data_url(image_data: bytes, mime_type: str = "image/png") -> str:
+    """Encode image bytes as a data URL for a vision request"""
+    return f"data:{mime_type};base64,{base64.b64encode(image_data).decode('utf-8')}"
+
+
+def prepare_image(image_data: bytes, max_side: int = 1024, image_format: str = "jpeg", quality: int = 80) -> tuple[bytes, str]:
+    """Compress a captured image and log the size reduction and time taken"""
+    start_time = time.time()
+    compressed, mime_type = compress_image(image_data, max_side, image_format, quality)
+    elapsed_ms = (time.time() - start_time) * 1000
+    print(f"🖼️ Image {len(image_data) / 1024:.1f}KB -> {len(compressed) / 1024:.1f}KB ({mime_type}) in {elapsed_ms:.1f}ms")
+    return compressed, mime_type
+
+
+def load_grayscale(image_data: bytes, max_side: int = None) -> np.ndarray:
+    """Decode image bytes to a 2D float array of gray levels, optionally shrunk to max_side (needs Pillow)"""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow is required to decode images")
+    image = Image.open(io.BytesIO(image_data))
+    if max_side:
+        # JPEG can decode straight to a reduced size
+        image.draft("L", (max_side, max_side))
+        image = image.convert("L")
+        image.thumbnail((max_side, max_side))
+    return np.asarray(image.convert("L"), dtype=np.float64)
@@ -0,0 +1,53 @@
+import os
+import threading
+
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+
+from cassette_helper import get_cassette_transport
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# One HTTP client per cassette transport, shared by every model client instead of one per call
+_cassette_clients = {}
+_cassette_clients_lock = threading.Lock()
+
+
+def _cassette_client(cassette) -> httpx.Client:
+    with _cassette_clients_lock:
+        client = _cassette_clients.get(cassette)
+        # A model client's close() closes the shared client too, start a new one then
+        if client is None or client.is_closed:
+            client = _cassette_clients[cassette] = httpx.Client(
+                transport=cassette, timeout=httpx.Timeout(600.0, connect=5.0))
+        return client
+
+
+def client_options() -> dict:
+    """Connection options shared by every model client, read from the environment on each call"""
+    options = {}
+    # LLM_BASE_URL points all calls at another OpenAI-compatible server, e.g. fake_openai_server.py
+    base_url = os.getenv("LLM_BASE_URL")
+    if base_url:
+        options["base_url"] = base_url
+        if not os.getenv("OPENAI_API_KEY"):
+            # Local servers ignore the key, but the clients refuse to start without one
+            options["api_key"] = "local"
+    # LLM_CASSETTE_MODE=record|replay routes the HTTP traffic through a cassette
+    cassette = get_cassette_transport()
+    if cassette is not None:
+        if cassette.mode == "replay" and not os.getenv("OPENAI_API_KEY"):
+            options["api_key"] = "replay"
+        options["http_client"] = _cassette_client(cassette)
+    return options
+
+
+def chat_model(model: str = DEFAULT_MODEL, temperature: float = 0.0, **kwargs) -> ChatOpenAI:
+    """LangChain chat model configured for the current endpoint"""
+    return ChatOpenAI(model=model, temperature=temperature, **{**client_options(), **kwargs})
+
+
+def openai_client(**kwargs) -> OpenAI:
+    """OpenAI client configured for the current endpoint"""
+    return OpenAI(**{**client_options(), **kwargs})
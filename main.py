@@ -16,13 +16,14 @@ def main():
     pin = os.getenv("KAHOOT_PIN")
     nickname = os.getenv("KAHOOT_NICKNAME", "AI_Player")
     
-    if not pin:
-        pin = input("Enter Kahoot Game PIN: ")
-    
-    # Initialize Selenium agent
+    # Initialize Selenium agent, warming browsers while the PIN is typed in
     agent = SeleniumKahootAgent()
+    agent.warm_up()
     
     try:
+        if not pin:
+            pin = input("Enter Kahoot Game PIN: ")
+        
         # Setup driver and login to Kahoot
         agent.setup_driver()
         agent.login_to_kahoot(pin, nickname)
@@ -43,7 +44,12 @@ def main():
                     print("Still in lobby, waiting for game to start...")
                     time.sleep(3)
                     continue
-                
+
+                # Process each question exactly once, even if it is still on screen
+                if not agent.claim_question():
+                    time.sleep(0.5)
+                    continue
+
                 # Extract question
                 try:
                     question = agent.get_question_data()
@@ -57,11 +63,11 @@ def main():
                     time.sleep(5)
                     continue
                 
-                # Use early-prepared answer if available
-                if agent.early_answer and len(agent.early_answer) > 0:
-                    print(f"Using early-prepared answer: {agent.early_answer}")
-                    question.answer = agent.early_answer
-                    agent.early_answer = None  # Reset for next question
+                # Use the early-prepared answer if it matches one of the real choices
+                early_answer = agent.take_early_answer(question)
+                if early_answer:
+                    print(f"Using early-prepared answer: {early_answer}")
+                    question.answer = early_answer
                 else:
                     # Get answer from AI
                     try:
@@ -0,0 +1,142 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from word_math_helper import UNITS, TENS
+
+# A match needs this score, and this lead over the runner-up unless it is exact
+MIN_SCORE = 0.6
+MIN_MARGIN = 0.1
+
+# Unit spellings after a number rewritten to one form so "10 km" matches "10 kilometers"
+UNIT_ALIASES = {
+    "%": "percent", "pct": "percent",
+    "km": "kilometers", "kilometre": "kilometers", "kilometres": "kilometers", "kilometer": "kilometers",
+    "m": "meters", "metre": "meters", "metres": "meters", "meter": "meters",
+    "cm": "centimeters", "centimetre": "centimeters", "centimetres": "centimeters", "centimeter": "centimeters",
+    "mm": "millimeters", "millimeter": "millimeters",
+    "kg": "kilograms", "kilogram": "kilograms", "g": "grams", "gram": "grams",
+    "mi": "miles", "mile": "miles", "ft": "feet", "foot": "feet", "in": "inches", "inch": "inches",
+    "s": "seconds", "sec": "seconds", "second": "seconds", "min": "minutes", "minute": "minutes",
+    "h": "hours", "hr": "hours", "hrs": "hours", "hour": "hours",
+    "°c": "celsius", "°f": "fahrenheit", "$": "dollars", "usd": "dollars", "dollar": "dollars",
+}
+
+# Words that carry no meaning when comparing answers
+STOP_WORDS = {"the", "a", "an", "of", "is", "it", "answer", "correct"}
+
+# Words that flip an answer's meaning; "not true" must never match "true"
+NEGATORS = {"not", "no", "never", "false", "none", "neither", "nor", "nothing", "cannot"}
+
+OPTION_PREFIX = re.compile(r"^\s*option\s*\d+\s*[:.)]\s*")
+NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+
+def _normalize_number(match) -> str:
+    text = match.group(0).replace(",", "")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text if text not in ("-0", "") else "0"
+
+
+@lru_cache(maxsize=512)
+def normalize_answer(text: str) -> str:
+    """Normalize case, accents, punctuation, numbers and units of an answer or choice"""
+    # Drop accents ("café" -> "cafe") but keep symbols such as ° and $
+    text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    text = OPTION_PREFIX.sub("", text.lower()).strip()
+
+    # Split units glued to numbers ("10km", "5%", "$3") before stripping punctuation
+    text = re.sub(r"(\d)\s*(%|°[cf])", r"\1 \2", text)
+    text = re.sub(r"\$\s*(\d[\d,.]*)", r"\1 $", text)
+    text = re.sub(r"(\d)([a-z]+)\b", r"\1 \2", text)
+    text = NUMBER.sub(_normalize_number, text)
+
+    tokens = []
+    for token in re.findall(r"-?\d+(?:\.\d+)?|°[cf]|[%$]|[a-z0-9']+", text):
+        token = token.strip("'")
+        if not token:
+            continue
+        # Number words become digits, "twenty-one" arrives as "twenty", "one"
+        if token in UNITS:
+            token = str(UNITS[token])
+        elif token in TENS:
+            token = str(TENS[token])
+        if tokens and token.isdigit() and tokens[-1].isdigit() and int(tokens[-1]) in TENS.values() and int(token) < 10:
+            tokens[-1] = str(int(tokens[-1]) + int(token))
+            continue
+        # Units only after a number, so "in 1990" keeps its "in"
+        if tokens and NUMBER.fullmatch(tokens[-1]) and token in UNIT_ALIASES:
+            token = UNIT_ALIASES[token]
+        tokens.append(token)
+
+    meaningful = [token for token in tokens if token not in STOP_WORDS]
+    text = " ".join(meaningful or tokens)
+    # A negated boolean is the other boolean
+    return {"not true": "false", "not false": "true"}.get(text, text)
+
+
+def _negated(tokens) -> bool:
+    return any(token in NEGATORS or token.endswith("n't") for token in tokens)
+
+
+def similarity(answer: str, choice: str) -> float:
+    """Similarity of two normalized strings: exact, number, token overlap and edit distance"""
+    if not answer or not choice:
+        return 0.0
+    if answer == choice:
+        return 1.0
+
+    answer_tokens, choice_tokens = answer.split(), choice.split()
+    # "paris" and "not paris" share every word but mean opposite things
+    if _negated(answer_tokens) != _negated(choice_tokens):
+        return 0.0
+    answer_numbers = [t for t in answer_tokens if NUMBER.fullmatch(t)]
+    choice_numbers = [t for t in choice_tokens if NUMBER.fullmatch(t)]
+
+    # Numbers must agree; "12" is never a fuzzy match for "13"
+    if answer_numbers and choice_numbers and answer_numbers != choice_numbers:
+        if not set(answer_numbers) & set(choice_numbers):
+            return 0.0
+
+    answer_set, choice_set = set(answer_tokens), set(choice_tokens)
+    overlap = len(answer_set & choice_set)
+    jaccard = overlap / len(answer_set | choice_set)
+    # The whole answer appearing in a longer choice ("paris" in "paris, france")
+    containment = overlap / min(len(answer_set), len(choice_set))
+
+    edit = SequenceMatcher(None, " ".join(sorted(answer_tokens)), " ".join(sorted(choice_tokens))).ratio()
+
+    return max(edit, 0.5 * jaccard + 0.5 * edit, 0.9 * containment if containment == 1 else 0.0)
+
+
+class ChoiceMatcher:
+    """Matches free-text answers to a question's choices, normalizing the choices once"""
+
+    def __init__(self, choices: List[str]):
+        self.choices = list(choices)
+        self.normalized = [normalize_answer(choice) for choice in self.choices]
+
+    def rank(self, answer: str) -> List[Tuple[int, float]]:
+        """All choice positions with their similarity to the answer, best first"""
+        normalized_answer = normalize_answer(answer)
+        scores = [(i, similarity(normalized_answer, choice)) for i, choice in enumerate(self.normalized)]
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def match(self, answer: str) -> Tuple[Optional[int], float]:
+        """Best choice position and a confidence, or (None, confidence) when no choice is close enough"""
+        ranked = self.rank(answer)
+        if not ranked:
+            return None, 0.0
+
+        position, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        margin = score - runner_up
+
+        # An unclear lead lowers the confidence
+        confidence = score if score == 1.0 or margin >= MIN_MARGIN else score * margin / MIN_MARGIN
+        if confidence < MIN_SCORE:
+            return None, confidence
+        return position, confidence
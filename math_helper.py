@@ -1,5 +1,26 @@
 import ast
+import math
 import operator
+import time
+from decimal import Decimal, localcontext, ROUND_HALF_EVEN
+from fractions import Fraction
+from functools import lru_cache
+
+# Resource limits so a hostile or garbled expression cannot stall the game loop
+MAX_BITS = 4096          # Largest numerator/denominator allowed, about 1200 digits
+MAX_EXPONENT = 10000     # Largest exponent allowed in **
+MAX_FACTORIAL = 300      # Largest factorial argument
+MAX_EVAL_SECONDS = 0.05  # Wall-clock budget for one evaluation
+MAX_NODES = 500          # Largest expression accepted
+
+# Decimal places kept in non-integer results
+RESULT_PRECISION = 10
+
+
+class MathLimitError(ValueError):
+    """Raised when an expression exceeds the evaluator's resource limits"""
+    pass
+
 
 # Supported operators
 ops = {
@@ -7,25 +28,170 @@ ops = {
     ast.Sub: operator.sub,
     ast.Mult: operator.mul,
     ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
     ast.Pow: operator.pow,
     ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
     ast.Mod: operator.mod,
 }
 
-def eval_expr(expr: str) -> float:
+CONSTANTS = {
+    "pi": Fraction(Decimal("3.14159265358979323846264338327950288")),
+    "e": Fraction(Decimal("2.71828182845904523536028747135266250")),
+}
+
+
+def _bits(value: Fraction) -> int:
+    return max(value.numerator.bit_length(), value.denominator.bit_length())
+
+
+def _check_size(value: Fraction) -> Fraction:
+    if _bits(value) > MAX_BITS:
+        raise MathLimitError(f"Result exceeds {MAX_BITS} bits")
+    return value
+
+
+def _integer_root(value: int, n: int):
+    """Exact integer n-th root of a non-negative int, or None if it is not a perfect power"""
+    if value < 2:
+        return value
+    root = round(value ** (1.0 / n)) if value.bit_length() < 1000 else int(Decimal(value) ** (Decimal(1) / n))
+    for candidate in (root - 1, root, root + 1):
+        if candidate >= 0 and candidate ** n == value:
+            return candidate
+    return None
+
+
+def _power(base: Fraction, exponent: Fraction) -> Fraction:
+    if abs(exponent) > MAX_EXPONENT:
+        raise MathLimitError(f"Exponent {exponent} exceeds {MAX_EXPONENT}")
+
+    if exponent.denominator == 1:
+        # Lower bound of the result size, checked before computing it: b-bit ** e has at least (b-1)*e+1 bits
+        if base not in (0, 1, -1) and (_bits(base) - 1) * abs(exponent.numerator) + 1 > MAX_BITS:
+            raise MathLimitError(f"Result of power exceeds {MAX_BITS} bits")
+        return _check_size(base ** exponent.numerator)
+
+    if base < 0:
+        raise ValueError("Fractional power of a negative number")
+
+    # Exact roots like 144 ** 0.5 or 27 ** (1/3)
+    if exponent.denominator <= 16:
+        numerator_root = _integer_root(base.numerator, exponent.denominator)
+        denominator_root = _integer_root(base.denominator, exponent.denominator)
+        if numerator_root is not None and denominator_root is not None:
+            return _power(Fraction(numerator_root, denominator_root), Fraction(exponent.numerator))
+
+    with localcontext() as ctx:
+        ctx.prec = 40
+        result = (Decimal(base.numerator) / Decimal(base.denominator)) ** (
+            Decimal(exponent.numerator) / Decimal(exponent.denominator))
+    return Fraction(result)
+
+
+def _to_int(value: Fraction, name: str) -> int:
+    if value.denominator != 1:
+        raise ValueError(f"{name}() needs an integer argument")
+    return value.numerator
+
+
+def _factorial(value: Fraction) -> Fraction:
+    n = _to_int(value, "factorial")
+    if n < 0 or n > MAX_FACTORIAL:
+        raise MathLimitError(f"factorial argument must be between 0 and {MAX_FACTORIAL}")
+    return Fraction(math.factorial(n))
+
+
+def _round(value: Fraction, digits: Fraction = Fraction(0)) -> Fraction:
+    return Fraction(round(value, _to_int(digits, "round")))
+
+
+# Functions that may be called from an expression
+functions = {
+    "sqrt": lambda x: _power(x, Fraction(1, 2)),
+    "cbrt": lambda x: _power(x, Fraction(1, 3)) if x >= 0 else -_power(-x, Fraction(1, 3)),
+    "factorial": _factorial,
+    "gcd": lambda *args: Fraction(math.gcd(*(_to_int(a, "gcd") for a in args))),
+    "lcm": lambda *args: Fraction(math.lcm(*(_to_int(a, "lcm") for a in args))),
+    "abs": abs,
+    "round": _round,
+    "floor": lambda x: Fraction(math.floor(x)),
+    "ceil": lambda x: Fraction(math.ceil(x)),
+    "min": min,
+    "max": max,
+}
+
+
+@lru_cache(maxsize=256)
+def _parse(expr: str) -> ast.Expression:
+    """Parse and validate an expression once, repeated expressions reuse the tree"""
+    node = ast.parse(expr.strip(), mode='eval')
+    if sum(1 for _ in ast.walk(node)) > MAX_NODES:
+        raise MathLimitError(f"Expression has more than {MAX_NODES} nodes")
+    return node
+
+
+def eval_exact(expr) -> Fraction:
+    """Evaluate an arithmetic expression exactly, within the resource limits"""
+    deadline = time.monotonic() + MAX_EVAL_SECONDS
+
     def _eval(node):
+        if time.monotonic() > deadline:
+            raise MathLimitError(f"Evaluation took longer than {MAX_EVAL_SECONDS}s")
+
         if isinstance(node, ast.Expression):
             return _eval(node.body)
         elif isinstance(node, ast.BinOp):
-            return ops[type(node.op)](_eval(node.left), _eval(node.right))
+            left, right = _eval(node.left), _eval(node.right)
+            if isinstance(node.op, ast.Pow):
+                return _check_size(_power(left, right))
+            if isinstance(node.op, ast.Mult) and _bits(left) + _bits(right) > MAX_BITS:
+                raise MathLimitError(f"Product exceeds {MAX_BITS} bits")
+            return _check_size(Fraction(ops[type(node.op)](left, right)))
         elif isinstance(node, ast.UnaryOp):
             return ops[type(node.op)](_eval(node.operand))
-        elif isinstance(node, ast.Num):
-            return node.n
-        elif isinstance(node, ast.Constant):  # Python 3.8+
-            return node.value
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise TypeError(f"Unsupported constant: {node.value!r}")
+            # str() keeps 0.1 as the decimal the user wrote rather than its binary approximation
+            return _check_size(Fraction(str(node.value)) if isinstance(node.value, float) else Fraction(node.value))
+        elif isinstance(node, ast.Name) and node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in functions:
+            if node.keywords:
+                raise TypeError("Keyword arguments are not supported")
+            return _check_size(Fraction(functions[node.func.id](*(_eval(arg) for arg in node.args))))
         else:
             raise TypeError(f"Unsupported type: {type(node)}")
 
-    node = ast.parse(expr, mode='eval')
-    return _eval(node.body)
+    # Accept an already parsed expression, e.g. from word_math_helper.parse_math_text
+    node = expr if isinstance(expr, ast.AST) else _parse(expr)
+    return _eval(node)
+
+
+def to_number(value: Fraction):
+    """Convert an exact result to an int, or a Decimal rounded to RESULT_PRECISION places"""
+    if value.denominator == 1:
+        return value.numerator
+
+    with localcontext() as ctx:
+        ctx.prec = max(50, len(str(abs(value.numerator) // value.denominator)) + RESULT_PRECISION + 5)
+        decimal_value = Decimal(value.numerator) / Decimal(value.denominator)
+        rounded = decimal_value.quantize(Decimal(1).scaleb(-RESULT_PRECISION), rounding=ROUND_HALF_EVEN)
+    if rounded == rounded.to_integral_value():
+        return int(rounded)
+    return rounded.normalize()
+
+
+def format_number(value) -> str:
+    """Format a result the way it is written in answer choices, e.g. 0.3 rather than 0.30000000000000004"""
+    if isinstance(value, Fraction):
+        value = to_number(value)
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return str(value)
+
+
+def eval_expr(expr):
+    """Evaluate an arithmetic expression, returning an int or a rounded Decimal"""
+    return to_number(eval_exact(expr))
@@ -0,0 +1,307 @@
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# USD per million tokens (input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+}
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+TEXTFILE_INTERVAL = 1.0  # Shortest time between two writes of the metrics file
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call, 0 for unknown models"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class _NoopCall:
+    """Stand-in returned by a disabled LLMMetrics, every method does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def first_token(self):
+        pass
+
+    def add_usage(self, prompt_tokens=0, completion_tokens=0):
+        pass
+
+    def record_response(self, response):
+        pass
+
+    def retry(self, count=1):
+        pass
+
+
+NOOP_CALL = _NoopCall()
+
+
+class LLMCall:
+    """Timing and usage of one model call, recorded when the with-block exits"""
+
+    __slots__ = ("metrics", "site", "model", "start", "ttft", "prompt_tokens", "completion_tokens", "retries")
+
+    def __init__(self, metrics, site: str, model: str):
+        self.metrics = metrics
+        self.site = site
+        self.model = model
+        self.start = time.perf_counter()
+        self.ttft = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._record(self, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+    def first_token(self):
+        """Mark the arrival of the first streamed token"""
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.start
+
+    def add_usage(self, prompt_tokens=0, completion_tokens=0):
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    def record_response(self, response):
+        """Read token usage from a LangChain message or an OpenAI response"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            self.add_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+            return
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.add_usage(getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0))
+
+    def retry(self, count=1):
+        self.retries += count
+
+
+def tracked(site: str, model: str = "gpt-4o-mini"):
+    """Method decorator timing every call through the instance's `metrics` attribute"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.track(site, model):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _SiteStats:
+    """Cumulative counters and a rolling window of latencies for one call site and model"""
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.ttft_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.ttft_sum = 0.0
+        self.ttft_count = 0
+        self.recent_latencies = deque(maxlen=window)
+        self.recent_ttfts = deque(maxlen=window)
+
+
+def _bucket_index(value: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if value <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+
+class LLMMetrics:
+    """Per call site latency, time to first token, tokens, retries and cost of model calls"""
+
+    def __init__(self, enabled: bool = True, window: int = 500, textfile: str = None, port: int = None):
+        self.enabled = enabled
+        self.window = window
+        self.textfile = textfile
+        self.sites = {}
+        self.lock = threading.Lock()
+        self.last_write = 0.0
+        self.server = None
+        if enabled and port:
+            self.start_http_server(port)
+
+    def track(self, site: str, model: str = "gpt-4o-mini"):
+        """Context manager timing one call: `with metrics.track("classify") as call: ...`"""
+        if not self.enabled:
+            return NOOP_CALL
+        return LLMCall(self, site, model)
+
+    def _stats(self, site: str, model: str) -> _SiteStats:
+        stats = self.sites.get((site, model))
+        if stats is None:
+            stats = self.sites[(site, model)] = _SiteStats(self.window)
+        return stats
+
+    def add_retries(self, site: str, count: int, model: str = "gpt-4o-mini"):
+        """Count extra attempts made outside a tracked call, e.g. hedged duplicates"""
+        if not self.enabled or count <= 0:
+            return
+        with self.lock:
+            self._stats(site, model).retries += count
+
+    def _record(self, call: LLMCall, wall_time: float, error: bool = False):
+        with self.lock:
+            stats = self._stats(call.site, call.model)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += call.retries
+            stats.prompt_tokens += call.prompt_tokens
+            stats.completion_tokens += call.completion_tokens
+            stats.cost += estimate_cost(call.model, call.prompt_tokens, call.completion_tokens)
+            stats.latency_buckets[_bucket_index(wall_time)] += 1
+            stats.latency_sum += wall_time
+            stats.recent_latencies.append(wall_time)
+            if call.ttft is not None:
+                stats.ttft_buckets[_bucket_index(call.ttft)] += 1
+                stats.ttft_sum += call.ttft
+                stats.ttft_count += 1
+                stats.recent_ttfts.append(call.ttft)
+
+        if self.textfile and time.time() - self.last_write >= TEXTFILE_INTERVAL:
+            self.write_textfile()
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            sites = sorted(self.sites.items())
+
+            counters = [
+                ("kahoot_llm_calls_total", "Model calls", lambda s: s.calls),
+                ("kahoot_llm_errors_total", "Model calls that raised", lambda s: s.errors),
+                ("kahoot_llm_retries_total", "Extra attempts such as hedged duplicates", lambda s: s.retries),
+                ("kahoot_llm_cost_usd_total", "Estimated cost in USD", lambda s: round(s.cost, 8)),
+            ]
+            for name, description, value in counters:
+                header(name, "counter", description)
+                for (site, model), stats in sites:
+                    lines.append(f'{name}{{site="{site}",model="{model}"}} {value(stats)}')
+
+            header("kahoot_llm_tokens_total", "counter", "Prompt and completion tokens")
+            for (site, model), stats in sites:
+                lines.append(f'kahoot_llm_tokens_total{{site="{site}",model="{model}",kind="prompt"}} {stats.prompt_tokens}')
+                lines.append(f'kahoot_llm_tokens_total{{site="{site}",model="{model}",kind="completion"}} {stats.completion_tokens}')
+
+            histograms = [
+                ("kahoot_llm_latency_seconds", "Wall time of model calls",
+                 lambda s: (s.latency_buckets, s.latency_sum, s.calls)),
+                ("kahoot_llm_ttft_seconds", "Time to first streamed token",
+                 lambda s: (s.ttft_buckets, s.ttft_sum, s.ttft_count)),
+            ]
+            for name, description, value in histograms:
+                header(name, "histogram", description)
+                for (site, model), stats in sites:
+                    buckets, total, count = value(stats)
+                    labels = f'site="{site}",model="{model}"'
+                    cumulative = 0
+                    for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """Write the metrics file for a node_exporter textfile collector"""
+        if not self.textfile:
+            return
+        try:
+            temp_path = f"{self.textfile}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(temp_path, self.textfile)
+            self.last_write = time.time()
+        except Exception as e:
+            print(f"Error writing metrics file: {e}")
+
+    def start_http_server(self, port: int):
+        """Serve /metrics on localhost from a daemon thread"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("/metrics", ""):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+            threading.Thread(target=self.server.serve_forever, daemon=True, name="metrics").start()
+            print(f"📊 Serving LLM metrics on http://127.0.0.1:{self.server.server_address[1]}/metrics")
+        except Exception as e:
+            print(f"Error starting metrics server: {e}")
+            self.server = None
+
+    def summary(self) -> str:
+        """Per call site latency percentiles over the rolling window, tokens and cost"""
+        with self.lock:
+            sites = sorted(self.sites.items())
+        if not sites:
+            return "No model calls recorded"
+
+        lines = []
+        total_cost = 0.0
+        for (site, model), stats in sites:
+            line = f"  {site} ({model}): {stats.calls} calls"
+            if stats.recent_latencies:
+                latencies = np.array(stats.recent_latencies)
+                line += f", p50 {np.percentile(latencies, 50):.2f}s, p95 {np.percentile(latencies, 95):.2f}s"
+            if stats.recent_ttfts:
+                line += f", ttft p50 {np.percentile(np.array(stats.recent_ttfts), 50):.2f}s"
+            line += (f", {stats.prompt_tokens}+{stats.completion_tokens} tokens, ${stats.cost:.4f}"
+                     f", {stats.retries} retries, {stats.errors} errors")
+            lines.append(line)
+            total_cost += stats.cost
+        lines.append(f"  total estimated cost: ${total_cost:.4f}")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        if self.textfile:
+            self.write_textfile()
+        if self.server:
+            self.server.shutdown()
+            self.server = None
@@ -0,0 +1,121 @@
+import time
+
+from dom_snapshot_helper import SNAPSHOT_FUNCTION_JS
+
+# Page-side watcher: a MutationObserver plus history/popstate hooks compute a cheap phase signature
+# after every DOM change (URL, a few data-functional-selector lookups, attribute and textContent
+# reads, nothing that forces layout). Only when the signature changes is the full snapshot taken,
+# and a timestamped event is queued when its phase, title or choices changed.
+PHASE_OBSERVER_JS = SNAPSHOT_FUNCTION_JS + r"""
+if (!window.__kahootPhase) {
+    const state = {queue: [], waiters: [], last: null, signature: null, scheduled: false};
+    const key = snapshot => JSON.stringify([snapshot.phase, snapshot.title, snapshot.choices.map(c => c.text)]);
+    const find = selector => document.querySelector(selector);
+    const signature = () => {
+        const answer = find("[data-functional-selector^='answer-'], button[class*='answer'], .answer-button");
+        const timer = find("[data-functional-selector*='countdown'], [data-functional-selector*='timer']");
+        const title = find("[data-functional-selector='block-title'], [data-functional-selector='question-title']");
+        const heading = find('h1, h2');
+        return [location.href,
+                answer ? [answer.className, answer.getAttribute('style'), answer.hidden].join('|') : '',
+                timer ? [timer.className, timer.getAttribute('style'), timer.hidden].join('|') : '',
+                title ? title.textContent : '',
+                heading ? heading.textContent : '',
+                document.querySelectorAll("[data-functional-selector^='answer-']").length].join('\n');
+    };
+    const check = () => {
+        state.scheduled = false;
+        const current = signature();
+        if (current === state.signature) return;
+        state.signature = current;
+        const snapshot = window.__kahootSnapshot(null, true);
+        if (state.last && key(state.last) === key(snapshot)) return;
+        state.last = snapshot;
+        state.queue.push(snapshot);
+        if (state.queue.length > 50) state.queue.shift();
+        state.waiters.splice(0).forEach(wake => wake());
+    };
+    const schedule = () => {
+        // Coalesce bursts of mutations into one check per frame
+        if (!state.scheduled) { state.scheduled = true; setTimeout(check, 16); }
+    };
+    for (const name of ['pushState', 'replaceState']) {
+        const original = history[name];
+        history[name] = function () { const result = original.apply(this, arguments); schedule(); return result; };
+    }
+    window.addEventListener('popstate', schedule);
+    new MutationObserver(schedule).observe(document.documentElement,
+        {childList: true, subtree: true, characterData: true, attributes: true,
+         attributeFilter: ['class', 'style', 'hidden', 'data-functional-selector']});
+    window.__kahootPhase = state;
+    check();
+}
+"""
+
+# Async script: resolves as soon as the newest queued event is one of the wanted phases,
+# or with whatever was queued when the timeout expires. Returns the drained events.
+WAIT_FOR_PHASE_JS = PHASE_OBSERVER_JS + r"""
+const wanted = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const state = window.__kahootPhase;
+let finished = false;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    done(state.queue.splice(0));
+};
+const ready = () => state.queue.length > 0 && wanted.includes(state.queue[state.queue.length - 1].phase);
+if (ready()) { finish(); }
+else {
+    const wake = () => { if (ready()) finish(); else if (!finished) state.waiters.push(wake); };
+    state.waiters.push(wake);
+    setTimeout(finish, timeoutMs);
+}
+"""
+
+MAX_FAILURES = 3  # Consecutive script failures before the watcher reports itself unavailable
+
+
+class PhaseWatcher:
+    """Blocks on game-phase transitions pushed by an injected MutationObserver"""
+
+    def __init__(self, driver, slice_seconds: float = 10.0):
+        self.driver = driver
+        self.slice_seconds = slice_seconds
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.failures < MAX_FAILURES
+
+    def install(self) -> bool:
+        """Inject the observer now so transitions are queued before anyone waits"""
+        try:
+            self.driver.execute_script(PHASE_OBSERVER_JS)
+            self.failures = 0
+            return True
+        except Exception as e:
+            self.failures += 1
+            print(f"Error installing phase observer: {e}")
+            return False
+
+    def wait_for(self, phases, timeout: float):
+        """
+        Events queued since the last call, returned once the newest one is in `phases` or
+        after `timeout` seconds. None if the script failed, e.g. because the page navigated.
+        """
+        timeout = max(0.0, min(timeout, self.slice_seconds))
+        try:
+            self.driver.set_script_timeout(timeout + 5)
+            events = self.driver.execute_async_script(WAIT_FOR_PHASE_JS, list(phases), int(timeout * 1000))
+            self.failures = 0
+            return events or []
+        except Exception as e:
+            # A full page load drops the observer, the next call installs it again
+            self.failures += 1
+            print(f"Phase observer wait failed ({self.failures}/{MAX_FAILURES}): {e}")
+            return None
+
+    @staticmethod
+    def lag_ms(event) -> float:
+        """Milliseconds between the page-side transition and now"""
+        return max(0.0, time.time() * 1000 - event.get("t", time.time() * 1000))
@@ -0,0 +1,76 @@
+import threading
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding files are downloaded on first use, which fails offline
+        print(f"Could not load tiktoken encoding, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Count the tokens a prompt will use for the given model"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text))
+
+
+class PromptStats:
+    """Per-call prompt token counts and latencies, compared against the legacy templates"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, style: str, tokens: int, legacy_tokens: int, latency: float):
+        with self._lock:
+            self.records.append({
+                "style": style,
+                "tokens": tokens,
+                "legacy_tokens": legacy_tokens,
+                "latency": latency,
+            })
+
+    def report(self) -> str:
+        with self._lock:
+            records = list(self.records)
+
+        if not records:
+            return "No prompts recorded"
+
+        tokens = sum(r["tokens"] for r in records)
+        legacy_tokens = sum(r["legacy_tokens"] for r in records)
+        saved = legacy_tokens - tokens
+        lines = [
+            f"{len(records)} prompts, {tokens} input tokens "
+            f"(legacy templates: {legacy_tokens}, saved {saved} = {saved / legacy_tokens:.0%})"
+            if legacy_tokens else f"{len(records)} prompts, {tokens} input tokens"
+        ]
+
+        # Latency per style, only comparable when both styles were used in the session
+        latencies = {}
+        for r in records:
+            latencies.setdefault(r["style"], []).append(r["latency"])
+        for style, values in sorted(latencies.items()):
+            lines.append(f"  {style}: avg latency {sum(values) / len(values):.2f}s over {len(values)} calls")
+        if "compact" in latencies and "legacy" in latencies:
+            compact_avg = sum(latencies["compact"]) / len(latencies["compact"])
+            legacy_avg = sum(latencies["legacy"]) / len(latencies["legacy"])
+            lines.append(f"  latency saved per call: {legacy_avg - compact_avg:.2f}s")
+
+        return "\n".join(lines)
@@ -0,0 +1,140 @@
+import time
+from collections import defaultdict
+from typing import List, NamedTuple, Optional
+
+# Evaluates every selector (CSS, or XPath when it starts with "/") in one call and returns the
+# first match in the given order, plus which selectors matched at all.
+QUERY_SELECTORS_JS = r"""
+const selectors = arguments[0], minText = arguments[1], visibleOnly = arguments[2];
+const visible = el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+const nodesFor = selector => {
+    try {
+        if (!selector.startsWith('/')) return Array.from(document.querySelectorAll(selector));
+        const result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    } catch (e) { return []; }
+};
+let best = null;
+const matched = selectors.map((selector, index) => {
+    for (const el of nodesFor(selector)) {
+        if (visibleOnly && !visible(el)) continue;
+        const text = (el.innerText || el.textContent || '').trim();
+        if (text.length < minText) continue;
+        if (best === null) best = {index, element: el, text};
+        return true;
+    }
+    return false;
+});
+return best === null ? {matched} : {matched, index: best.index, element: best.element, text: best.text};
+"""
+
+FAST_TIMEOUT = 0.5  # How long the remembered selector gets before the fallbacks are queried
+POLL_INTERVAL = 0.1
+
+
+class Resolution(NamedTuple):
+    selector: Optional[str]
+    element: object
+    text: str
+
+
+NOT_FOUND = Resolution(None, None, "")
+
+
+class _SelectorStats:
+    __slots__ = ("attempts", "matches", "wins")
+
+    def __init__(self):
+        self.attempts = 0
+        self.matches = 0
+        self.wins = 0
+
+
+class SelectorResolver:
+    """
+    Finds page elements from lists of candidate selectors. Remembers the selector that worked
+    per role and page phase, tries it first with a short wait, then queries all candidates in
+    one script call. Candidates are reordered by how often they won this session.
+    """
+
+    def __init__(self, driver, fast_timeout: float = FAST_TIMEOUT):
+        self.driver = driver
+        self.fast_timeout = fast_timeout
+        self.winners = {}  # (role, phase) -> selector
+        self.stats = defaultdict(lambda: defaultdict(_SelectorStats))  # role -> selector -> stats
+
+    def ordered(self, role: str, selectors: List[str], phase: str = "any") -> List[str]:
+        """Candidates by wins this session, the original order breaking ties, remembered winner first"""
+        stats = self.stats[role]
+        order = sorted(range(len(selectors)), key=lambda i: (-stats[selectors[i]].wins if selectors[i] in stats else 0, i))
+        ordered = [selectors[i] for i in order]
+        winner = self.winners.get((role, phase))
+        if winner in ordered:
+            ordered.remove(winner)
+            ordered.insert(0, winner)
+        return ordered
+
+    def _query(self, selectors, min_text, visible_only):
+        try:
+            return self.driver.execute_script(QUERY_SELECTORS_JS, selectors, min_text, visible_only) or {}
+        except Exception as e:
+            print(f"Error querying selectors: {e}")
+            return {}
+
+    def _poll(self, selectors, min_text, visible_only, deadline):
+        while True:
+            result = self._query(selectors, min_text, visible_only)
+            if result.get("index") is not None or time.time() >= deadline:
+                return result
+            time.sleep(POLL_INTERVAL)
+
+    def resolve(self, role: str, selectors: List[str], phase: str = "any", timeout: float = 2.0,
+                min_text: int = 0, visible_only: bool = False) -> Resolution:
+        """First candidate with at least `min_text` characters of text, waiting up to `timeout` seconds"""
+        start = time.time()
+        ordered = self.ordered(role, selectors, phase)
+        winner = self.winners.get((role, phase))
+
+        result = {}
+        if winner is not None:
+            result = self._poll([winner], min_text, visible_only, start + min(self.fast_timeout, timeout))
+            if result.get("index") is not None:
+                self._record(role, [winner], result)
+                self.winners[(role, phase)] = winner
+                return Resolution(winner, result.get("element"), result.get("text", ""))
+
+        result = self._poll(ordered, min_text, visible_only, start + timeout)
+        self._record(role, ordered, result)
+        if result.get("index") is None:
+            return NOT_FOUND
+        selector = ordered[result["index"]]
+        self.winners[(role, phase)] = selector
+        return Resolution(selector, result.get("element"), result.get("text", ""))
+
+    def _record(self, role, selectors, result):
+        stats = self.stats[role]
+        matched = result.get("matched") or []
+        for i, selector in enumerate(selectors):
+            stats[selector].attempts += 1
+            stats[selector].matches += int(i < len(matched) and bool(matched[i]))
+        if result.get("index") is not None:
+            stats[selectors[result["index"]]].wins += 1
+
+    def hit_rates(self) -> dict:
+        """Per role and selector: share of queries where it matched, and how often it was used"""
+        return {
+            role: {selector: {"hit_rate": s.matches / s.attempts if s.attempts else 0.0, "wins": s.wins,
+                              "attempts": s.attempts}
+                   for selector, s in selectors.items()}
+            for role, selectors in self.stats.items()
+        }
+
+    def summary(self) -> str:
+        lines = []
+        for role, selectors in sorted(self.hit_rates().items()):
+            ranked = sorted(selectors.items(), key=lambda item: -item[1]["wins"])[:3]
+            parts = [f"{selector} {s['wins']} wins, {s['hit_rate']:.0%} hit" for selector, s in ranked]
+            lines.append(f"  {role}: " + "; ".join(parts))
+        return "\n".join(lines) if lines else "No selectors resolved"
@@ -5,44 +5,187 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import SessionNotCreatedException
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from output_format.question import Question
 from output_format.answer import AnswerData
-from math_helper import eval_expr
+from math_helper import eval_expr, format_number
+from word_math_helper import parse_math_text
+from match_helper import ChoiceMatcher
+from image_helper import prepare_image, to_data_url, PIL_AVAILABLE
+from image_cache_helper import ImageAnswerCache, image_hashes
+from metrics_helper import LLMMetrics, tracked
+from phase_watcher_helper import PhaseWatcher
+from dom_snapshot_helper import RoundTripCounter, take_snapshot
+from selector_helper import SelectorResolver
+from game_phase_helper import GamePhase, GameStateMachine
+from early_answer_helper import EarlyAnswer
+from code_fetch_helper import CodeFetcher, find_urls
+from code_condense_helper import condense_code, strip_boilerplate
+from browser_profile_helper import USER_AGENT, build_chrome_options, apply_performance_profile, parse_patterns
+from driver_startup_helper import BrowserPool, DriverPathCache, StartupTimer, is_version_mismatch
+from llm_helper import chat_model, openai_client
+from code_runner_helper import extract_python_snippet, run_python_snippet, match_result_to_choices, sandbox_available
 from encoding_helper import handle_encoded_question
+from stream_helper import IncrementalAnswerParser, drain_in_background
+from speculative_helper import SpeculativeRunner, candidate_types
+from deadline_helper import QuestionBudget, parse_timer_text, fallback_answer
+from hedge_helper import HedgedCaller
+from prompt_helper import count_tokens, PromptStats
 import re
+import ast
+import base64
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import numpy as np
 import pickle
 import faiss
-import openai
 import argparse
-from openai import OpenAI
 
 INDEX_PATH = "faiss.index"
 CHUNKS_PATH = "chunks.pkl"
 TOP_K = 5
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+STREAM_ANSWERS = os.getenv("STREAM_ANSWERS", "true").lower() == "true"
+STREAM_DRAIN = os.getenv("STREAM_DRAIN", "false").lower() == "true"
+SPECULATIVE_ANSWERS = os.getenv("SPECULATIVE_ANSWERS", "true").lower() == "true"
+SPECULATIVE_MAX_STRATEGIES = int(os.getenv("SPECULATIVE_MAX_STRATEGIES", "3"))
+SPECULATIVE_TIMEOUT = float(os.getenv("SPECULATIVE_TIMEOUT", "10"))
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MAX_EXTRA_RATIO = float(os.getenv("HEDGE_MAX_EXTRA_RATIO", "0.1"))
+PROMPT_STYLE = os.getenv("PROMPT_STYLE", "compact").lower()  # "compact" or "legacy"
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "1024"))
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "jpeg").lower()  # "jpeg", "webp" or "png"
+VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "80"))
+VISION_DETAIL = os.getenv("VISION_DETAIL", "low").lower()  # "low", "high" or "auto"
+LLM_METRICS = os.getenv("LLM_METRICS", "true").lower() == "true"
+LLM_METRICS_FILE = os.getenv("LLM_METRICS_FILE") or None  # Prometheus textfile, e.g. /var/lib/node_exporter/kahoot.prom
+LLM_METRICS_PORT = int(os.getenv("LLM_METRICS_PORT") or 0) or None  # Serve /metrics on this local port
+IMAGE_CACHE = os.getenv("IMAGE_CACHE", "true").lower() == "true"
+IMAGE_CACHE_PATH = os.getenv("IMAGE_CACHE_PATH", "image_answer_cache.json")
+IMAGE_CACHE_THRESHOLD = int(os.getenv("IMAGE_CACHE_THRESHOLD", "24"))  # Summed Hamming distance of aHash/dHash/pHash
+PHASE_OBSERVER = os.getenv("PHASE_OBSERVER", "true").lower() == "true"  # Event-driven question detection
+EARLY_ANSWER_WAIT = float(os.getenv("EARLY_ANSWER_WAIT", "3"))  # Longest wait for an unfinished early answer
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "default").lower()  # "default" or "performance"
+BROWSER_HEADLESS = {"true": True, "false": False}.get(os.getenv("BROWSER_HEADLESS", "").lower())  # Unset: headless only for "performance"
+BLOCKED_URL_PATTERNS = parse_patterns(os.getenv("BLOCKED_URL_PATTERNS", ""))  # Comma separated, used by the performance profile
+BROWSER_USER_DATA_DIR = os.getenv("BROWSER_USER_DATA_DIR", "")  # Persistent Chrome profile, one per agent; empty for a fresh one per run
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "0"))  # Browsers launched and warmed ahead of setup_driver
+BROWSER_POOL_WAIT = float(os.getenv("BROWSER_POOL_WAIT", "30"))  # Longest wait for a warming browser before a cold start
+DRIVER_CACHE_PATH = os.getenv("DRIVER_CACHE_PATH", ".chromedriver.json")
+DRIVER_CACHE_MAX_AGE_DAYS = float(os.getenv("DRIVER_CACHE_MAX_AGE_DAYS", "7"))  # Re-resolve chromedriver online after this
+SELECTOR_TIMEOUT = float(os.getenv("SELECTOR_TIMEOUT", "3"))  # Seconds to wait for question text to render
+CODE_FETCH = os.getenv("CODE_FETCH", "true").lower() == "true"  # Download linked code over HTTP before opening tabs
+CODE_FETCH_CACHE_DIR = os.getenv("CODE_FETCH_CACHE_DIR", "code_cache")
+CODE_FETCH_TIMEOUT = float(os.getenv("CODE_FETCH_TIMEOUT", "5"))
+CODE_FETCH_BROWSER_FALLBACK = os.getenv("CODE_FETCH_BROWSER_FALLBACK", "true").lower() == "true"
+CODE_TOKEN_BUDGET = int(os.getenv("CODE_TOKEN_BUDGET", "1500"))  # Prompt tokens for linked code, shared by all links
+
+KAHOOT_URL = "https://kahoot.it/"
+PIN_INPUT_SELECTOR = "input[data-functional-selector='game-id-input']"
+
+# Elements holding the question image, most specific first
+QUESTION_MEDIA_SELECTORS = [
+    "[data-functional-selector='question-media'] img",
+    "[data-functional-selector='media-container__media-image']",
+    "[data-functional-selector='question-media']",
+    "main img",
+]
+MIN_MEDIA_SIDE = 64  # Smaller matches are icons, not the question image
+
+# Keywords of the rule-based classifier, checked in this order
+RULE_PATTERNS = {
+    "encoded": ['encoded', 'base64', 'decode', 'cipher', 'encrypt', 'rot13', 'ascii'],
+    "math": ['calculate', 'solve', '+', '-', '*', '/', '=', 'equation', 'sum', 'difference', 'product'],
+    "coding": ['code', 'function', 'variable', 'programming', 'algorithm', 'javascript', 'python', 'java'],
+    "recent_events": ['recent', 'news', '2023', '2024', '2025', 'current', 'latest', 'today'],
+    "image": ['image', 'picture', 'photo', 'visual', 'see', 'shown', 'displayed', 'screen'],
+    "prompt_injection": ['ignore', 'prompt', 'system', 'instruction', 'important', 'forget', 'context']
+}
+
+# Prompt templates wrapping the question prompt for specialized question types
+SPECIALIZED_PROMPTS = {
+    "logic": """
+    You are a reasoning assistant. Think step-by-step to solve the following problem carefully.
+    
+    {input}
+    """,
+    "coding": """
+    You are a programming expert. Analyze the following code question carefully.
+    Consider the code structure, syntax, logic, and expected output.
+    All answers should be in lowercase for case-insensitive matching.
+
+    {input}
+    """,
+    "math": """
+    You are a mathematics expert. Solve the following problem step-by-step.
+    Show your work and provide the exact numerical answer.
+    If the answer is a number, provide it directly without words.
+    All answers should be in lowercase for case-insensitive matching.
+
+    {input}
+    """,
+    "encoded": """
+    You are analyzing a question that was previously encoded (Base64, URL encoding, etc.).
+    The question has been decoded for you. Focus on the decoded content to provide the correct answer.
+    All answers should be in lowercase for case-insensitive matching.
+
+    {input}
+    """,
+    "recent_events": """
+    You are a current events expert. Answer the following question about recent happenings.
+    Be factual and precise. If you're uncertain, indicate the most likely answer based on recent events.
+    All answers should be in lowercase for case-insensitive matching.
+
+    {input}
+    """,
+}
 
 class SeleniumKahootAgent:
     def __init__(self):
         self.driver = None
         self.wait = None
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.0)
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
-        self.early_answer = None  # Add this to store early answer
+        self.startup = StartupTimer()  # Durations of driver resolution, launch, setup and joining
+        self.driver_paths = DriverPathCache(DRIVER_CACHE_PATH, DRIVER_CACHE_MAX_AGE_DAYS)
+        self.browser_pool = None
+        self.phase_watcher = None
+        self.selector_resolver = None
+        self.game_state = GameStateMachine()  # Phase and question identity, fed by page snapshots and events
+        self.round_trips = None  # Counts WebDriver commands per question
+        self.page_snapshot = None  # Last PageSnapshot, reused by the extraction helpers
+        self.round_trip_log = []
+        self.metrics = LLMMetrics(LLM_METRICS, textfile=LLM_METRICS_FILE, port=LLM_METRICS_PORT)
+        self.llm = chat_model()
+        self.client = openai_client()
+        self.early = None  # EarlyAnswer for the question announced on the get-ready screen
+        self.early_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="early")
+        self.classification_candidates = []  # Candidate question types from the last classification
+        self.speculative_runner = SpeculativeRunner()
+        self.hedged_caller = HedgedCaller(percentile=HEDGE_PERCENTILE, max_extra_ratio=HEDGE_MAX_EXTRA_RATIO)
+        self.question_budget = None  # Time budget of the question being answered
+        self.answer_cache = {}  # Answers already given this session, by question and choices
+        self.choice_matcher = None  # ChoiceMatcher for the current question's choices
+        self.image_cache = None
+        if IMAGE_CACHE and PIL_AVAILABLE:
+            self.image_cache = ImageAnswerCache(IMAGE_CACHE_PATH, IMAGE_CACHE_THRESHOLD)
+        elif IMAGE_CACHE:
+            print("Image answer cache disabled, install Pillow to enable it")
+        self.deadline_log = []  # Per-question timing and fallback outcomes
+        self.prompt_stats = PromptStats()
+        self.code_fetcher = CodeFetcher(CODE_FETCH_CACHE_DIR, CODE_FETCH_TIMEOUT) if CODE_FETCH else None
         self.index = faiss.read_index(INDEX_PATH)
         with open(CHUNKS_PATH, 'rb') as f:
             self.chunks = pickle.load(f)
 
     def get_embedding(self, text):
-        resp = openai.embeddings.create(
-            model="text-embedding-3-large",
-            input=[text]
-        )
+        with self.metrics.track("embedding", "text-embedding-3-large") as call:
+            resp = self.client.embeddings.create(
+                model="text-embedding-3-large",
+                input=[text]
+            )
+            call.record_response(resp)
         return np.array(resp.data[0].embedding, dtype='float32')
 
     def retrieve(self, query, k=TOP_K):
@@ -60,44 +203,100 @@ class SeleniumKahootAgent:
             "You are an expert assistant. Use the provided context to answer the question.\n\n"
             f"Context:\n{context}\n\nQuestion: {query}"
         )
-        resp = self.client.chat.completions.create(
-            model='gpt-4o-mini',
-            messages=[
-                {"role": "system", "content": "You are an expert assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
-        )
+        with self.metrics.track("rag_chat") as call:
+            resp = self.client.chat.completions.create(
+                model='gpt-4o-mini',
+                messages=[
+                    {"role": "system", "content": "You are an expert assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,
+                **self._timeout_kwargs()
+            )
+            call.record_response(resp)
         print(resp.choices[0].message)
         return resp.choices[0].message
         
+    def warm_up(self):
+        """Start launching browsers in the background, setup_driver then takes one that is ready"""
+        if BROWSER_POOL_SIZE > 0 and self.browser_pool is None:
+            print(f"🔥 Warming {BROWSER_POOL_SIZE} browser(s) in the background")
+            self.browser_pool = BrowserPool(self._launch_warm_browser, BROWSER_POOL_SIZE)
+
     def setup_driver(self):
-        """Initialize Chrome driver with appropriate options"""
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Additional anti-detection measures
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        """Initialize Chrome driver, taking a warm one from the browser pool if there is one"""
+        driver = None
+        if self.browser_pool:
+            with self.startup.phase("pool wait"):
+                driver = self.browser_pool.acquire(BROWSER_POOL_WAIT)
+            if driver is None:
+                print("No warm browser came up, starting one now")
+        if driver is None:
+            driver = self._launch_browser()
+        self.driver = driver
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # Execute script to hide webdriver property
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        with self.startup.phase("agent setup"):
+            self.round_trips = RoundTripCounter(self.driver)
+            self.wait = WebDriverWait(self.driver, 10)
+            self.phase_watcher = PhaseWatcher(self.driver)
+            self.selector_resolver = SelectorResolver(self.driver)
+        print(f"🚀 Browser ready: {self.startup.report()}")
+
+    def _launch_browser(self, user_data_dir=BROWSER_USER_DATA_DIR, timer=None):
+        """Start Chrome with the configured profile and stealth settings, using the cached chromedriver"""
+        timer = timer or self.startup
+        with timer.phase("driver path"):
+            driver_path, source = self.driver_paths.resolve()
+        print(f"Using chromedriver from {source}: {driver_path or 'resolved by Selenium'}")
+        chrome_options = build_chrome_options(BROWSER_PROFILE, BROWSER_HEADLESS,
+                                              os.path.abspath(user_data_dir) if user_data_dir else None)
         
-        # Add additional stealth measures
-        self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-            "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        with timer.phase("chrome launch"):
+            try:
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            except SessionNotCreatedException as e:
+                # Other causes, such as a profile directory locked by another Chrome, are not fixed by a new driver
+                if source not in ("cache", "offline cache") or not is_version_mismatch(e.msg):
+                    raise
+                # Chrome updated itself since the driver was cached
+                print(f"Cached chromedriver does not match Chrome, resolving it again: {e.msg}")
+                driver_path, source = self.driver_paths.resolve(refresh=True)
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
         
-        self.wait = WebDriverWait(self.driver, 10)
+        with timer.phase("browser setup"):
+            if BROWSER_PROFILE == "performance":
+                apply_performance_profile(driver, BLOCKED_URL_PATTERNS)
+            
+            # Execute script to hide webdriver property
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            
+            # Add additional stealth measures
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": USER_AGENT})
+        return driver
+
+    def _launch_warm_browser(self, slot):
+        """Pool factory: a browser with the join page loaded, each in its own profile directory"""
+        timer = StartupTimer()
+        user_data_dir = f"{BROWSER_USER_DATA_DIR}-{slot + 1}" if BROWSER_USER_DATA_DIR else None
+        driver = self._launch_browser(user_data_dir, timer)
+        try:
+            with timer.phase("join page"):
+                driver.get(KAHOOT_URL)
+                WebDriverWait(driver, 30, poll_frequency=0.1).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, PIN_INPUT_SELECTOR)))
+        except Exception:
+            driver.quit()
+            raise
+        print(f"🔥 Browser {slot} warmed: {timer.report()}")
+        return driver
+
+    def _on_join_page(self) -> bool:
+        """Whether the PIN form is already showing, as it is in a warmed browser"""
+        try:
+            return "kahoot.it" in self.driver.current_url and \
+                bool(self.driver.find_elements(By.CSS_SELECTOR, PIN_INPUT_SELECTOR))
+        except Exception:
+            return False
         
     def check_for_gameblock(self):
         """Check if we're on the gameblock page - this is actually the main game page"""
@@ -117,15 +316,19 @@ class SeleniumKahootAgent:
         """Login to Kahoot game"""
         max_retries = 5
         retry_count = 0
+        join_start = time.perf_counter()
         
         while retry_count < max_retries:
             try:
-                # Navigate to Kahoot
-                self.driver.get("https://kahoot.it/")
-                time.sleep(3)  # Wait for page to load
-                
-                # Add human-like delay
-                time.sleep(2)
+                if retry_count == 0 and self._on_join_page():
+                    print("Join page already loaded")
+                else:
+                    # Navigate to Kahoot
+                    self.driver.get(KAHOOT_URL)
+                    time.sleep(3)  # Wait for page to load
+                    
+                    # Add human-like delay
+                    time.sleep(2)
                 
                 # Try multiple selectors for PIN input
                 pin_input = None
@@ -137,12 +340,7 @@ class SeleniumKahootAgent:
                     "input[type='text']"
                 ]
                 
-                for selector in pin_selectors:
-                    try:
-                        pin_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                        break
-                    except:
-                        continue
+                pin_input = self.selector_resolver.resolve("pin_input", pin_selectors, "join", timeout=10).element
                 
                 if not pin_input:
                     raise Exception("Could not find PIN input field")
@@ -195,12 +393,7 @@ class SeleniumKahootAgent:
                     "input[type='text']"
                 ]
                 
-                for selector in nickname_selectors:
-                    try:
-                        nickname_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                        break
-                    except:
-                        continue
+                nickname_input = self.selector_resolver.resolve("nickname_input", nickname_selectors, "join", timeout=10).element
                 
                 if not nickname_input:
                     raise Exception("Could not find nickname input field")
@@ -243,6 +436,9 @@ class SeleniumKahootAgent:
                 else:
                     ok_button.click()
                 
+                self.startup.record("join", time.perf_counter() - join_start)
+                print(f"🚀 Joined: {self.startup.report()}")
+                
                 # Wait for game to start - be more flexible with URL checking
                 print("Waiting for game to start...")
                 start_time = time.time()
@@ -253,6 +449,7 @@ class SeleniumKahootAgent:
                     if any(keyword in current_url for keyword in ["getready", "game", "question", "lobby", "gameblock"]):
                         print("Successfully joined Kahoot game!")
                         print(f"Current URL: {current_url}")
+                        self._install_phase_observer()
                         return
                     time.sleep(2)  # Check every 2 seconds
                 
@@ -260,6 +457,7 @@ class SeleniumKahootAgent:
                 if "kahoot.it" in self.driver.current_url:
                     print("Still on join page, game might not have started yet")
                     print("Current URL:", self.driver.current_url)
+                    self._install_phase_observer()
                     return  # Consider this a success, wait for game to start
                 
             except Exception as e:
@@ -277,17 +475,28 @@ class SeleniumKahootAgent:
     def get_question_data(self) -> Question:
         """Extract question data from the current page"""
         try:
-            # Wait for question to load
-            time.sleep(2)
+            if self.round_trips:
+                self.round_trips.reset()
+            # Start the answer budget from the countdown as soon as the question is up
+            self.question_budget = QuestionBudget(self._read_question_timer())
+            print(f"⏱️ {self.question_budget}")
+            
+            # Read the whole page once as soon as it shows the question, the helpers below work from this snapshot
+            self._wait_for_question_ready()
             
             # Get question text
             question_text = self._extract_question_text()
             if not question_text:
                 raise Exception("Could not find question text")
 
-            question_text = self._extract_code_from_url(question_text)
+            question_text, runnable_text = self._extract_code_from_url(question_text)
+            
+            # Keep runnable code in its original case for local execution, always the full code,
+            # the condensed version with its "..." gaps is only for the prompt
+            code_snippet = extract_python_snippet(runnable_text)
             
-            # Convert question text to lowercase
+            # Convert question text to lowercase, encoded text keeps its case for decoding
+            original_text = question_text
             question_text = question_text.lower()
             
             # Get answer choices and selectors
@@ -298,13 +507,15 @@ class SeleniumKahootAgent:
             for i, choice in enumerate(choices):
                 formatted_choices.append(f"Option {i+1}: {choice}")
             
-            # Determine question type based on content
-            question_type = self._classify_question(question_text, choices)
+            # Determine question type based on content, reusing the get-ready classification
+            question_type = self._reuse_early_classification(question_text)
+            if question_type is None:
+                question_type = self._classify_question(question_text, choices)
 
             # Handle encoded questions
             decoded_text = None
             if question_type == "encoded":
-                decoded_text, encoding_type = handle_encoded_question(question_text)
+                decoded_text, encoding_type = handle_encoded_question(original_text)
                 if encoding_type != "none":
                     print(f"✅ Successfully decoded {encoding_type} question")
                 else:
@@ -328,12 +539,14 @@ class SeleniumKahootAgent:
                 answer=[],  # Will be filled later
                 is_multiple_choice=is_multiple_choice,
                 question_type=question_type,
-                decoded_text=decoded_text
+                decoded_text=decoded_text,
+                candidate_types=[question_type] + [t for t in self.classification_candidates if t != question_type],
+                code_snippet=code_snippet
             )
             
-            # Handle image questions - capture screenshot
+            # Handle image questions - capture the question image
             if question_type == "image":
-                question.image_data = self._capture_question_image()
+                question.image_data, question.image_mime = self._capture_question_image()
             
             print(f"Question extracted: {question_text[:50]}...")
             print(f"Choices: {choices}")
@@ -345,8 +558,41 @@ class SeleniumKahootAgent:
             print(f"Error extracting question: {e}")
             raise
             
+    def _page_snapshot(self, max_age=0.5):
+        """Snapshot of the page from one script call, reused until it is older than max_age seconds"""
+        if self.page_snapshot is None or self.page_snapshot.age > max_age:
+            self.page_snapshot = take_snapshot(self.driver, QUESTION_MEDIA_SELECTORS)
+        return self.page_snapshot
+
+    def _wait_for_question_ready(self):
+        """Snapshot the page until the question text and its choices are there, bounded by the answer budget"""
+        timeout = SELECTOR_TIMEOUT
+        if self.question_budget is not None:
+            timeout = min(timeout, self.question_budget.llm_timeout())
+        deadline = time.time() + timeout
+        while True:
+            snapshot = self._page_snapshot(max_age=0)
+            if snapshot and snapshot.title.strip() and (snapshot.choices or snapshot.phase == "question"):
+                return snapshot
+            if time.time() >= deadline:
+                print("⚠️ Question not fully rendered, reading the page as it is")
+                return snapshot
+            time.sleep(0.05)
+
+    def _log_round_trips(self):
+        """Print and keep the WebDriver round trips spent on the current question"""
+        if not self.round_trips:
+            return
+        counts = self.round_trips.reset()
+        self.round_trip_log.append(sum(counts.values()))
+        print(f"🔁 {self.round_trips.describe(counts)} for this question")
+
     def _extract_question_text(self):
         """Extract question text from the page"""
+        snapshot = self._page_snapshot()
+        if snapshot and snapshot.title:
+            return snapshot.title.strip()
+        
         # Try multiple selectors for question text
         question_selectors = [
             "[data-functional-selector='block-title']",
@@ -358,14 +604,11 @@ class SeleniumKahootAgent:
             "[class*='title']"
         ]
         
-        for selector in question_selectors:
-            try:
-                question_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                text = question_element.text.strip()
-                if text:
-                    return text
-            except:
-                continue
+        phase = snapshot.phase if snapshot else "any"
+        resolved = self.selector_resolver.resolve("question_text", question_selectors, phase,
+                                                  timeout=SELECTOR_TIMEOUT, min_text=1)
+        if resolved.text:
+            return resolved.text
         
         # Try XPath selectors as fallback
         xpath_selectors = [
@@ -375,19 +618,16 @@ class SeleniumKahootAgent:
             "//*[contains(text(), '?')]"
         ]
         
-        for xpath in xpath_selectors:
-            try:
-                question_element = self.driver.find_element(By.XPATH, xpath)
-                text = question_element.text.strip()
-                if text and len(text) > 5:  # Ensure it's substantial text
-                    return text
-            except:
-                continue
-                
-        return ""
+        # Ensure it's substantial text
+        return self.selector_resolver.resolve("question_text_xpath", xpath_selectors, phase, timeout=0, min_text=6).text
         
     def _extract_answer_choices(self):
         """Extract answer choices and their selectors"""
+        snapshot = self._page_snapshot()
+        if snapshot and snapshot.choices:
+            choices = [text.lower() or f"Option {i+1}" for i, text in enumerate(snapshot.choices)]
+            return choices[:4], snapshot.answer_selectors[:4]
+        
         choices = []
         answer_selectors = []
         
@@ -487,9 +727,14 @@ class SeleniumKahootAgent:
         
     def _classify_question(self, question_text: str, choices: list) -> str:
         """Classify question type using AI"""
+        question_type, self.classification_candidates = self._classify_with_candidates(question_text, choices)
+        return question_type
+
+    def _classify_with_candidates(self, question_text: str, choices: list, check_images=True):
+        """Question type and the candidate types worth racing, without touching shared state"""
         # First check for images on the page (this can't be done by AI)
         try:
-            images = self.driver.find_elements(By.TAG_NAME, "img")
+            images = self.driver.find_elements(By.TAG_NAME, "img") if check_images else []
             # Look for substantial images (not just icons)
             for img in images:
                 if img.is_displayed():
@@ -497,10 +742,15 @@ class SeleniumKahootAgent:
                     height = img.size.get('height', 0)
                     if width > 100 and height > 100:  # Substantial image
                         print(f"🖼️ Found substantial image: {width}x{height}")
-                        return "image"
+                        return "image", ["image"]
         except:
             pass
         
+        # Plain arithmetic is recognised locally without a model call
+        if parse_math_text(question_text) is not None:
+            print("🧮 Question parses as arithmetic, classified as math")
+            return "math", ["math"]
+        
         # Use AI to classify the question
         try:
             prompt = f"""
@@ -522,7 +772,9 @@ class SeleniumKahootAgent:
             Return ONLY the category name without any explanation.
             """
             
-            response = self.llm.invoke(prompt)
+            with self.metrics.track("classify") as call:
+                response = self.llm.invoke(prompt)
+                call.record_response(response)
             classification = response.content.strip().lower()
             
             # Ensure classification is one of the valid types
@@ -531,30 +783,23 @@ class SeleniumKahootAgent:
             
             if classification in valid_types:
                 print(f"🧠 AI classified question as: {classification}")
-                return classification
+                # Race the rule-based guess only when it disagrees on strong evidence
+                return classification, candidate_types(classification, self._rule_based_hits(question_text))
             else:
-                return self._rule_based_classification(question_text)
+                rule_classification = self._rule_based_classification(question_text)
+                return rule_classification, list(dict.fromkeys([rule_classification, "logic"]))
                 
         except Exception as e:
             print(f"Error in AI classification: {e}")
-            return self._rule_based_classification(question_text)
+            rule_classification = self._rule_based_classification(question_text)
+            return rule_classification, list(dict.fromkeys([rule_classification, "logic"]))
             
     def _rule_based_classification(self, question_text):
         """Fallback rule-based classification for when AI is not available"""
         question_lower = question_text.lower()
         
-        # Dictionary mapping patterns to question types
-        patterns = {
-            "encoded": ['encoded', 'base64', 'decode', 'cipher', 'encrypt', 'rot13', 'ascii'],
-            "math": ['calculate', 'solve', '+', '-', '*', '/', '=', 'equation', 'sum', 'difference', 'product'],
-            "coding": ['code', 'function', 'variable', 'programming', 'algorithm', 'javascript', 'python', 'java'],
-            "recent_events": ['recent', 'news', '2023', '2024', '2025', 'current', 'latest', 'today'],
-            "image": ['image', 'picture', 'photo', 'visual', 'see', 'shown', 'displayed', 'screen'],
-            "prompt_injection": ['ignore', 'prompt', 'system', 'instruction', 'important', 'forget', 'context']
-        }
-        
         # Check each pattern set
-        for qtype, keywords in patterns.items():
+        for qtype, keywords in RULE_PATTERNS.items():
             if any(keyword in question_lower for keyword in keywords):
                 print(f"Rule-based classification: {qtype}")
                 return qtype
@@ -562,6 +807,20 @@ class SeleniumKahootAgent:
         # Default to logic if no patterns match
         return "logic"
         
+    def _rule_based_hits(self, question_text):
+        """Distinct whole-word rule keywords per question type, operators count once together"""
+        question_lower = question_text.lower()
+        words = set(re.findall(r"[a-z0-9]+", question_lower))
+        hits = {}
+        for qtype, keywords in RULE_PATTERNS.items():
+            count = sum(1 for keyword in keywords if keyword.isalnum() and keyword in words)
+            if any(not keyword.isalnum() and keyword in question_lower for keyword in keywords):
+                count += 1
+            if count:
+                hits[qtype] = count
+        return hits
+        
+    @tracked("get_answer")
     def get_answer_from_ai(self, question: Question) -> AnswerData:
         """Get answer from AI model"""
         try:
@@ -569,40 +828,32 @@ class SeleniumKahootAgent:
             question.question_text = question.question_text.lower()
             question.choices = [choice.lower() for choice in question.choices]
             
-            parser = PydanticOutputParser(pydantic_object=AnswerData)
+            # Plain arithmetic does not need a model round trip
+            if question.question_type == "math":
+                local_answer = self._solve_math_locally(question)
+                if local_answer:
+                    return local_answer
             
-            format_prompt = f"""
-            Format your response as a JSON object that adheres to the following schema:
-            {parser.get_format_instructions()}
+            # Runnable Python is executed rather than read by the LLM
+            if question.question_type == "coding" and question.code_snippet:
+                local_answer = self._answer_code_locally(question)
+                if local_answer:
+                    return local_answer
             
-            IMPORTANT: All answers must be in lowercase for case-insensitive matching.
-            """
+            parser = PydanticOutputParser(pydantic_object=AnswerData)
             
-            question_prompt = question.get_question_prompt()
-            full_prompt = f"{question_prompt}\n{format_prompt}"
+            full_prompt = self._build_prompt(question, parser)
 
             print("AI Prompt:", full_prompt)
 
-            # Select appropriate LLM based on question type
-            llm = self._get_specialized_llm(question.question_type)
-            
-            # Handle image questions with vision model
+            call_start = time.time()
             try:
-                if question.question_type == "image" and question.image_data:
-                    response = self._get_vision_answer(question, full_prompt)
-                elif question.question_type == "internal_doc":
-                    results = self.retrieve(question.question_text)
-
-                    print("\n[RESULTS] Retrieved Chunks and Distances:")
-                    for i, (chunk, dist) in enumerate(results, 1):
-                        print(f"-- Chunk {i} (dist={dist:.4f}):\n{chunk}\n")
-
-                    response = self.chat_with_context(full_prompt, results)
+                if self.question_budget is None:
+                    output_data = self._call_answer_model(question, full_prompt, parser)
                 else:
-                    # Call the specialized LLM function directly
-                    response = llm(full_prompt)
-                
-                output_data = parser.parse(response.content)
+                    output_data = self._call_answer_model_with_deadline(question, full_prompt, parser)
+                    if output_data is None:
+                        return self._fallback_answer(question)
             except Exception as api_error:
                 print(f"Error calling AI or parsing response: {api_error}")
                 # Return a default answer to prevent crashes
@@ -611,34 +862,10 @@ class SeleniumKahootAgent:
                     explanation="Error occurred while getting answer from AI"
                 )
             
-            # Handle math questions
-            if question.question_type == "math":
-                try:
-                    print(f"Math equation: {output_data.correct_options}")
-                    output_data.correct_options[0] = str(eval_expr(output_data.correct_options[0]))
-                except Exception as ex:
-                    print(f"Math question invalid format: {ex}")
-            
-            # Post-process answers to handle "option X" format
-            processed_options = []
-            for option in output_data.correct_options:
-                option_str = str(option).lower()
-                
-                # Extract just the number if it says "option X"
-                if "option" in option_str:
-                    try:
-                        import re
-                        # Try to extract just the number
-                        number_match = re.search(r'\d+', option_str)
-                        if number_match:
-                            option_str = number_match.group(0)
-                    except Exception as regex_error:
-                        print(f"Error extracting option number: {regex_error}")
-                
-                processed_options.append(option_str)
-            
-            # Replace with processed options
-            output_data.correct_options = processed_options
+            self._record_prompt_tokens(question, parser, full_prompt, time.time() - call_start)
+            self.answer_cache[self._answer_cache_key(question)] = output_data.correct_options
+            if self.question_budget is not None:
+                self._log_question_deadline(question, "answered")
             
             print(f"AI Answer: {output_data.correct_options}")
             return output_data
@@ -651,99 +878,406 @@ class SeleniumKahootAgent:
                 explanation="Error occurred while getting answer"
             )
 
+    def _solve_math_locally(self, question: Question):
+        """Parse and evaluate arithmetic questions without the LLM, returning None if parsing fails"""
+        try:
+            start_time = time.perf_counter()
+            expression = parse_math_text(question.question_text)
+            if expression is None:
+                print("🧮 Could not parse math question locally, asking the LLM")
+                return None
+            
+            result = format_number(eval_expr(expression))
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"🧮 Solved locally: {ast.unparse(expression)} = {result} ({elapsed_ms:.2f}ms)")
+            
+            self.answer_cache[self._answer_cache_key(question)] = [result]
+            if self.question_budget is not None:
+                self._log_question_deadline(question, "solved locally")
+            return AnswerData(correct_options=[result])
+        except Exception as e:
+            print(f"Error solving math question locally: {e}")
+            return None
+
+    def _answer_code_locally(self, question: Question):
+        """Run the question's Python snippet in the sandbox and match its output to a choice"""
+        try:
+            if not sandbox_available():
+                print("🐍 No code sandbox on this machine (needs Linux namespaces), asking the LLM")
+                return None
+            result = run_python_snippet(question.code_snippet)
+            print(f"🐍 Ran snippet in {result.elapsed:.2f}s: "
+                  f"output={result.stdout.strip()[:80]!r}, exception={result.exception}, timed out={result.timed_out}")
+            
+            if not question.choices:
+                # Text answer: the printed output is the answer
+                if result.ok and result.stdout.strip():
+                    return AnswerData(correct_options=[result.stdout.strip().lower()])
+                return None
+            
+            position = match_result_to_choices(result, question.choices)
+            if position is None:
+                print("🐍 Snippet result does not match any choice, asking the LLM")
+                return None
+            
+            choice = question.choices[position]
+            answer = choice.split(":", 1)[1].strip() if choice.startswith("option") and ":" in choice else choice
+            print(f"🐍 Snippet result matches choice {position}: {answer}")
+            
+            self.answer_cache[self._answer_cache_key(question)] = [answer]
+            if self.question_budget is not None:
+                self._log_question_deadline(question, "code executed locally")
+            return AnswerData(correct_options=[answer])
+        except Exception as e:
+            print(f"Error running code locally: {e}")
+            return None
+
+    def _build_prompt(self, question: Question, parser, question_type=None, style=None):
+        """Build the answer prompt in the configured style"""
+        style = style or PROMPT_STYLE
+        if style == "compact":
+            return question.get_compact_prompt(question_type)
+        
+        format_prompt = f"""
+            Format your response as a JSON object that adheres to the following schema:
+            {parser.get_format_instructions()}
+            
+            IMPORTANT: All answers must be in lowercase for case-insensitive matching.
+            """
+        
+        question_prompt = question.get_question_prompt()
+        return f"{question_prompt}\n{format_prompt}"
+
+    def _record_prompt_tokens(self, question: Question, parser, full_prompt, latency):
+        """Count the tokens sent for this call and what the legacy templates would have sent"""
+        try:
+            specialized_prompt = self._get_specialized_prompt(question.question_type)
+            model_input = specialized_prompt.format(input=full_prompt) if specialized_prompt else full_prompt
+            tokens = count_tokens(model_input)
+            
+            legacy_prompt = self._build_prompt(question, parser, style="legacy")
+            legacy_template = self._get_specialized_prompt(question.question_type, style="legacy")
+            if legacy_template:
+                legacy_prompt = legacy_template.format(input=legacy_prompt)
+            legacy_tokens = count_tokens(legacy_prompt)
+            
+            self.prompt_stats.record(PROMPT_STYLE, tokens, legacy_tokens, latency)
+            print(f"🔢 Prompt tokens: {tokens} ({PROMPT_STYLE}), legacy templates: {legacy_tokens}, call took {latency:.2f}s")
+        except Exception as e:
+            print(f"Error counting prompt tokens: {e}")
+
+    def _call_answer_model(self, question: Question, full_prompt, parser, cancel_event=None) -> AnswerData:
+        """Run the model call for the question type and return the post-processed answer"""
+        # Handle image questions with vision model
+        if question.question_type == "image" and question.image_data:
+            hashes = self._hash_question_image(question)
+            cached_answer = self.image_cache.lookup(hashes, question.question_text) if hashes else None
+            if cached_answer:
+                output_data = AnswerData(correct_options=cached_answer)
+            else:
+                response = self._get_vision_answer(question, full_prompt)
+                output_data = parser.parse(response.content)
+                if hashes and output_data.correct_options:
+                    self.image_cache.store(hashes, question.question_text, output_data.correct_options)
+        elif question.question_type == "internal_doc":
+            results = self.retrieve(question.question_text)
+
+            print("\n[RESULTS] Retrieved Chunks and Distances:")
+            for i, (chunk, dist) in enumerate(results, 1):
+                print(f"-- Chunk {i} (dist={dist:.4f}):\n{chunk}\n")
+
+            response = self.chat_with_context(full_prompt, results)
+            output_data = parser.parse(response.content)
+        elif SPECULATIVE_ANSWERS and len(question.candidate_types) > 1:
+            # Classification is uncertain, race the candidate strategies
+            output_data = self._answer_speculatively(question, full_prompt, parser)
+            if output_data:
+                return output_data
+            output_data = self._stream_answer(question.question_type, full_prompt, parser, cancel_event)
+        elif STREAM_ANSWERS:
+            # Stop reading as soon as correct_options is closed
+            output_data = self._hedged(
+                lambda event: self._stream_answer(question.question_type, full_prompt, parser, event),
+                cancel_event
+            )
+        else:
+            # Select appropriate LLM based on question type and call it directly
+            llm = self._get_specialized_llm(question.question_type)
+            
+            def request(event):
+                with self.metrics.track("answer") as call:
+                    response = llm(full_prompt)
+                    call.record_response(response)
+                return parser.parse(response.content)
+            
+            output_data = self._hedged(request, cancel_event)
+        
+        if output_data is None:
+            # Cancelled because the question deadline passed
+            return None
+        
+        self._postprocess_answer(question.question_type, output_data)
+        return output_data
+
+    def _hedged(self, request, cancel_event=None):
+        """Run an answer request, sending a duplicate if it is slower than usual"""
+        if not HEDGE_REQUESTS:
+            return request(cancel_event)
+        hedges_before = self.hedged_caller.hedges
+        try:
+            return self.hedged_caller.call(request, cancel_event)
+        finally:
+            self.metrics.add_retries("answer", self.hedged_caller.hedges - hedges_before)
+
+    def _timeout_kwargs(self):
+        """Per-request timeout for model calls, so a call abandoned at the question deadline ends with it"""
+        if self.question_budget is None:
+            return {}
+        return {"timeout": max(1.0, self.question_budget.llm_timeout())}
+
+    def _call_answer_model_with_deadline(self, question: Question, full_prompt, parser):
+        """Run the model call within the question budget, returning None if it runs out"""
+        budget = self.question_budget
+        cancel_event = threading.Event()
+        future = Future()
+        
+        def run():
+            try:
+                future.set_result(self._call_answer_model(question, full_prompt, parser, cancel_event))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        # A thread of its own, so the next question never queues behind a call abandoned here
+        threading.Thread(target=run, daemon=True, name="answer-call").start()
+        try:
+            return future.result(timeout=budget.llm_timeout())
+        except FutureTimeoutError:
+            # Streamed completions stop on the event, blocking calls end at their request timeout
+            cancel_event.set()
+            print(f"⏱️ Answer deadline reached after {budget.elapsed():.1f}s ({budget})")
+            return None
+
+    def _fallback_answer(self, question: Question) -> AnswerData:
+        """Best available answer when the model could not answer in time"""
+        source, options = fallback_answer(self.answer_cache.get(self._answer_cache_key(question)),
+                                          lambda: self._reconcile_early_answer(question, timeout=0),
+                                          question.choices)
+        
+        print(f"🛟 Using {source} fallback answer: {options}")
+        self._log_question_deadline(question, f"timeout, {source} fallback")
+        return AnswerData(correct_options=options or ["default_answer"])
+
+    def _answer_cache_key(self, question: Question):
+        return question.question_text.strip().lower(), tuple(choice.lower() for choice in question.choices)
+
+    def _log_question_deadline(self, question: Question, outcome):
+        """Record how the question was answered against its time budget"""
+        budget = self.question_budget
+        entry = {
+            "question": question.question_text[:80],
+            "time_limit": budget.time_limit,
+            "from_timer": budget.from_timer,
+            "elapsed": round(budget.elapsed(), 2),
+            "remaining": round(budget.remaining(), 2),
+            "outcome": outcome,
+        }
+        self.deadline_log.append(entry)
+        print(f"⏱️ {outcome} after {entry['elapsed']}s of {budget.time_limit:.0f}s budget")
+
+    def _read_question_timer(self):
+        """Read the seconds left on the question countdown, if it is shown"""
+        snapshot = self._page_snapshot(max_age=0)
+        if snapshot is not None:
+            return parse_timer_text(snapshot.timer_text)
+        
+        timer_selectors = [
+            "[data-functional-selector*='countdown']",
+            "[data-functional-selector*='timer']",
+            "[class*='countdown']",
+            "[class*='timer']"
+        ]
+        
+        for selector in timer_selectors:
+            try:
+                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                for elem in elements:
+                    seconds = parse_timer_text(elem.text)
+                    if seconds is not None:
+                        return seconds
+            except:
+                continue
+        
+        return None
+
+    def _postprocess_answer(self, question_type, output_data: AnswerData):
+        """Evaluate math expressions and normalize 'option X' answers in place"""
+        # Handle math questions
+        if question_type == "math":
+            try:
+                print(f"Math equation: {output_data.correct_options}")
+                output_data.correct_options[0] = format_number(eval_expr(output_data.correct_options[0]))
+            except Exception as ex:
+                print(f"Math question invalid format: {ex}")
+        
+        # Post-process answers to handle "option X" format
+        processed_options = []
+        for option in output_data.correct_options:
+            option_str = str(option).lower()
+            
+            # Extract just the number if it says "option X"
+            if "option" in option_str:
+                try:
+                    # Try to extract just the number
+                    number_match = re.search(r'\d+', option_str)
+                    if number_match:
+                        option_str = number_match.group(0)
+                except Exception as regex_error:
+                    print(f"Error extracting option number: {regex_error}")
+            
+            processed_options.append(option_str)
+        
+        # Replace with processed options
+        output_data.correct_options = processed_options
+
+    def _answer_speculatively(self, question: Question, full_prompt, parser):
+        """Race the candidate answering strategies and keep the first answer that maps to a choice"""
+        strategies = {}
+        
+        def add_strategy(name, question_type):
+            if name in strategies or len(strategies) >= SPECULATIVE_MAX_STRATEGIES:
+                return
+            
+            strategy_prompt = self._build_prompt(question, parser, question_type)
+            
+            def run(cancel_event):
+                if question_type == "internal_doc":
+                    response = self.chat_with_context(strategy_prompt, self.retrieve(question.question_text))
+                    output_data = parser.parse(response.content)
+                else:
+                    output_data = self._stream_answer(question_type, strategy_prompt, parser, cancel_event)
+                if output_data:
+                    self._postprocess_answer(question_type, output_data)
+                return output_data
+            
+            strategies[name] = run
+        
+        for question_type in question.candidate_types:
+            if question_type == "image" or (question_type == "encoded" and not question.decoded_text):
+                continue
+            name = {"internal_doc": "rag", "logic": "logic_cot"}.get(question_type, question_type)
+            add_strategy(name, question_type)
+        add_strategy("logic_cot", "logic")
+        add_strategy("direct", "direct")
+        
+        print(f"🏎️ Uncertain classification {question.candidate_types}, racing strategies: {list(strategies)}")
+        
+        def is_valid(output_data):
+            return bool(output_data.correct_options) and all(
+                self._maps_to_choice(str(option), question.choices) for option in output_data.correct_options
+            )
+        
+        timeout = SPECULATIVE_TIMEOUT
+        if self.question_budget is not None:
+            timeout = min(timeout, self.question_budget.llm_timeout())
+        
+        name, output_data = self.speculative_runner.run(strategies, is_valid, timeout)
+        return output_data
+    
+    def _maps_to_choice(self, answer_text, choices):
+        """Check whether an answer can be matched to one of the visible choices"""
+        if not choices:
+            return bool(answer_text.strip())
+        if answer_text.isdigit() and 1 <= int(answer_text) <= len(choices):
+            return True
+        return self._find_answer_position(answer_text.lower(), choices) is not None
+
+    def _stream_answer(self, question_type, prompt, parser, cancel_event=None) -> AnswerData:
+        """Stream the completion and return as soon as correct_options is complete"""
+        start_time = time.time()
+        stream_parser = IncrementalAnswerParser()
+        stream = self._stream_specialized_llm(question_type, prompt)
+        
+        with self.metrics.track("answer_stream") as call:
+            try:
+                for chunk in stream:
+                    call.first_token()
+                    if stream_parser.feed(chunk.content) is not None:
+                        break
+                    if cancel_event is not None and cancel_event.is_set():
+                        # Another strategy already answered
+                        stream.close()
+                        return None
+            except Exception:
+                stream.close()
+                raise
+            finally:
+                # The stream is closed before the usage chunk arrives, so tokens are counted locally
+                call.add_usage(count_tokens(prompt), count_tokens(stream_parser.buffer))
+        
+        if not stream_parser.is_complete():
+            # Generation finished without a usable array, fall back to the full parser
+            return parser.parse(stream_parser.buffer)
+        
+        print(f"⚡ Answer available after {time.time() - start_time:.2f}s of streaming")
+        
+        if STREAM_DRAIN:
+            # Let the generation finish off the critical path so the connection can be reused
+            drain_in_background(stream)
+        else:
+            # Cancel the rest of the generation
+            stream.close()
+        
+        return AnswerData(correct_options=stream_parser.options)
+
+    def _get_specialized_prompt(self, question_type, style=None):
+        """Get the prompt template wrapping the question for a question type, if any"""
+        if (style or PROMPT_STYLE) == "compact":
+            # Compact prompts carry the type instructions in their static prefix
+            return None
+        template = SPECIALIZED_PROMPTS.get(question_type)
+        if not template:
+            return None
+        try:
+            return PromptTemplate.from_template(template)
+        except Exception as template_error:
+            print(f"Error creating {question_type} template: {template_error}")
+            return None
+
     def _get_specialized_llm(self, question_type, prompt=None):
         """Get appropriate LLM model based on question type"""
         try:
-            base_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.0)
+            base_llm = chat_model(**self._timeout_kwargs())
 
             if question_type == "logic":
                 print('Use logic')
-                # Improved logic question prompt with better answer format instructions
-                try:
-                    cot_prompt = PromptTemplate.from_template("""
-                    You are a reasoning assistant. Think step-by-step to solve the following problem carefully.
-                    
-                    {input}
-                    """)
-                    # Return a callable that will format the prompt then call the LLM
-                    return lambda p: base_llm.invoke(cot_prompt.format(input=p))
-                except Exception as template_error:
-                    print(f"Error creating logic template: {template_error}")
-                    return base_llm
-
-            elif question_type == "coding":
-                # Enhanced prompt for coding questions
-                try:
-                    coding_prompt = PromptTemplate.from_template("""
-                    You are a programming expert. Analyze the following code question carefully.
-                    Consider the code structure, syntax, logic, and expected output.
-                    All answers should be in lowercase for case-insensitive matching.
-
-                    {input}
-                    """)
-                    return lambda p: base_llm.invoke(coding_prompt.format(input=p))
-                except Exception as template_error:
-                    print(f"Error creating coding template: {template_error}")
-                    return base_llm
-
-            elif question_type == "math":
-                # Enhanced prompt for math questions
-                try:
-                    math_prompt = PromptTemplate.from_template("""
-                    You are a mathematics expert. Solve the following problem step-by-step.
-                    Show your work and provide the exact numerical answer.
-                    If the answer is a number, provide it directly without words.
-                    All answers should be in lowercase for case-insensitive matching.
-
-                    {input}
-                    """)
-                    return lambda p: base_llm.invoke(math_prompt.format(input=p))
-                except Exception as template_error:
-                    print(f"Error creating math template: {template_error}")
-                    return base_llm
-
-            elif question_type == "encoded":
-                # Enhanced prompt for encoded questions
-                try:
-                    encoded_prompt = PromptTemplate.from_template("""
-                    You are analyzing a question that was previously encoded (Base64, URL encoding, etc.).
-                    The question has been decoded for you. Focus on the decoded content to provide the correct answer.
-                    All answers should be in lowercase for case-insensitive matching.
-
-                    {input}
-                    """)
-                    return lambda p: base_llm.invoke(encoded_prompt.format(input=p))
-                except Exception as template_error:
-                    print(f"Error creating encoded template: {template_error}")
-                    return base_llm
-
-            elif question_type == "recent_events":
-                # Enhanced prompt for recent events questions
-                try:
-                    events_prompt = PromptTemplate.from_template("""
-                    You are a current events expert. Answer the following question about recent happenings.
-                    Be factual and precise. If you're uncertain, indicate the most likely answer based on recent events.
-                    All answers should be in lowercase for case-insensitive matching.
-
-                    {input}
-                    """)
-                    return lambda p: base_llm.invoke(events_prompt.format(input=p))
-                except Exception as template_error:
-                    print(f"Error creating recent events template: {template_error}")
-                    return base_llm
 
-            else:
-                # Default case - use base LLM directly
-                return base_llm
+            specialized_prompt = self._get_specialized_prompt(question_type)
+            if specialized_prompt:
+                # Return a callable that will format the prompt then call the LLM
+                return lambda p: base_llm.invoke(specialized_prompt.format(input=p))
+
+            # Default case - use base LLM directly
+            return lambda p: base_llm.invoke(p)
         except Exception as e:
             print(f"Error in _get_specialized_llm: {e}")
             # Create a default LLM as fallback
             try:
-                return ChatOpenAI(model="gpt-4o-mini", temperature=0.0)
+                fallback_llm = chat_model(**self._timeout_kwargs())
+                return lambda p: fallback_llm.invoke(p)
             except:
                 # Last resort - create a wrapper function that returns a default answer
                 return lambda p: type('obj', (object,), {'content': '{"correct_options": ["default_answer"], "explanation": "LLM error"}'})
 
+    def _stream_specialized_llm(self, question_type, prompt):
+        """Stream the completion of the specialized LLM for a question type"""
+        base_llm = chat_model(**self._timeout_kwargs())
+        
+        specialized_prompt = self._get_specialized_prompt(question_type)
+        if specialized_prompt:
+            prompt = specialized_prompt.format(input=prompt)
+        
+        return base_llm.stream(prompt)
+
     def enter_answer(self, question: Question):
         """Enter the answer by clicking the appropriate choice"""
         try:
@@ -768,33 +1302,25 @@ class SeleniumKahootAgent:
                 print(f"Error extracting answer selectors: {selector_error}")
                 answer_selectors = {}
             
-            # Find and click the correct answer
-            for answer in question.answer:
+            # STRATEGY 0: Match the answers to the choices and click the best one in a single attempt
+            clicked = False
+            try:
+                answer_position, confidence, matched_answer = self._match_answers_to_choices(question.answer, question.choices)
+                if answer_position is not None:
+                    print(f"Found answer '{matched_answer}' at position {answer_position} (confidence {confidence:.2f})")
+                    selector = f"[data-functional-selector='answer-{answer_position}']"
+                    self.driver.find_element(By.CSS_SELECTOR, selector).click()
+                    print(f"Clicked answer at position {answer_position} using selector: {selector}")
+                    clicked = True
+            except Exception as position_error:
+                print(f"Error clicking position-based selector: {position_error}")
+            
+            # Fall back to the selector cascade only when the matched click failed
+            for answer in ([] if clicked else question.answer):
                 clicked = False
                 try:
                     answer_lower = answer.lower()  # Convert to lowercase for comparison
                     
-                    # STRATEGY 0: Find position of answer in choices (most accurate approach)
-                    try:
-                        answer_position = self._find_answer_position(answer_lower, question.choices)
-                        if answer_position is not None:
-                            print(f"Found answer '{answer_lower}' at position {answer_position}")
-                            try:
-                                selector = f"[data-functional-selector='answer-{answer_position}']"
-                                answer_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                                if answer_button.is_displayed():
-                                    answer_button.click()
-                                    print(f"Clicked answer at position {answer_position} using selector: {selector}")
-                                    clicked = True
-                                    break
-                            except Exception as e:
-                                print(f"Error clicking position-based selector: {e}")
-                    except Exception as position_error:
-                        print(f"Error finding answer position: {position_error}")
-                    
-                    if clicked:
-                        break
-                    
                     # STRATEGY 1: Use Kahoot-specific selectors with answer index
                     if answer_lower.isdigit() and 0 <= int(answer_lower) < 4:
                         try:
@@ -903,6 +1429,9 @@ class SeleniumKahootAgent:
                     print(f"Error processing answer '{answer}': {answer_error}")
                     continue
             
+            self._log_round_trips()
+            self.game_state.mark_answered()
+            
             # Wait for the answer to register
             time.sleep(2)
             
@@ -911,38 +1440,62 @@ class SeleniumKahootAgent:
             print(f"Current URL: {self.driver.current_url}")
             # Continue despite error
             
+    def _get_choice_matcher(self, choices):
+        """Matcher for the current choices, normalized once per question"""
+        if self.choice_matcher is None or self.choice_matcher.choices != list(choices):
+            self.choice_matcher = ChoiceMatcher(choices)
+        return self.choice_matcher
+    
+    def _match_answers_to_choices(self, answers, choices):
+        """Best (position, confidence, answer) over all answers, position is None if nothing matches"""
+        best = (None, 0.0, None)
+        if not choices:
+            return best
+        matcher = self._get_choice_matcher(choices)
+        for answer in answers:
+            position, confidence = matcher.match(answer)
+            if position is not None and confidence > best[1]:
+                best = (position, confidence, answer)
+        return best
+    
     def _find_answer_position(self, answer_text, choices):
         """Find the position of an answer in the list of choices"""
         try:
-            # For numerical answers, try to find the exact match
-            for i, choice in enumerate(choices):
-                choice_lower = choice.lower()
-                
-                # Extract just the text part from "Option N: text"
-                if ":" in choice_lower:
-                    choice_text = choice_lower.split(":", 1)[1].strip()
-                else:
-                    choice_text = choice_lower
-                
-                # Check for exact match
-                if choice_text == answer_text:
-                    return i
-                
-                # Check if choice contains the answer (for numerical answers)
-                if answer_text.isdigit() and answer_text in choice_text.split():
-                    return i
-            
-            # If no match found
-            return None
-        except:
+            position, confidence = self._get_choice_matcher(choices).match(answer_text)
+            return position
+        except Exception as e:
+            print(f"Error matching answer to choices: {e}")
             return None
             
     def is_game_finished(self) -> bool:
         """Check if the game has finished"""
         try:
-            return "/ranking" in self.driver.current_url or "podium" in self.driver.current_url
+            current_url = self.driver.current_url
+            if "/ranking" in current_url or "podium" in current_url:
+                self.game_state.observe(GamePhase.PODIUM)
+            return self.game_state.finished
         except:
             return False
+
+    def _observe_page(self, snapshot=None):
+        """Feed a page snapshot into the game state machine and return the current phase"""
+        snapshot = snapshot or self._page_snapshot(max_age=0)
+        if snapshot is not None:
+            self.game_state.observe(GamePhase.from_signal(snapshot.phase), snapshot.title, snapshot.choices,
+                                    at=snapshot.taken_at)
+        return self.game_state.phase
+
+    def claim_question(self) -> bool:
+        """True once for each question on screen, so the game loop never processes a question twice"""
+        snapshot = self._page_snapshot(max_age=0)
+        if snapshot is None:
+            # Without a snapshot there is no way to tell questions apart
+            return True
+        self._observe_page(snapshot)
+        claimed = self.game_state.claim_question()
+        if claimed:
+            print(f"🆕 Question {self.game_state.question_hash}: {self.game_state.question_title[:50]}")
+        return claimed
             
     def _should_skip_question(self, question_text):
         """Check if the question should be skipped based on its starting text"""
@@ -956,12 +1509,23 @@ class SeleniumKahootAgent:
         
         return False
 
+    def _install_phase_observer(self):
+        """Start queueing phase transitions on the game page now, before the first wait for a question"""
+        if PHASE_OBSERVER and self.phase_watcher and self.phase_watcher.install():
+            print("👀 Phase observer installed")
+
     def wait_for_next_question(self):
         """Wait for the next question to appear and prepare answer if possible"""
         try:
             print("Waiting for next question...")
             start_time = time.time()
-            self.early_answer = None  # Store early answer here
+            self.question_budget = None
+            self._discard_early_answer()
+            
+            if PHASE_OBSERVER and self.phase_watcher and self.phase_watcher.available:
+                if self._wait_for_question_event(start_time + 120):
+                    return
+                print("Phase observer unavailable, falling back to polling")
             
             while time.time() - start_time < 120:  # Wait up to 2 minutes
                 try:
@@ -1086,6 +1650,49 @@ class SeleniumKahootAgent:
             # Return to continue the game loop despite errors
             return
     
+    def _wait_for_question_event(self, deadline):
+        """Block on page-side phase transitions until a new question or the end of the game, False if the observer fails"""
+        prepared_title = None
+        while time.time() < deadline:
+            if self.game_state.finished:
+                print("Game finished detected")
+                return True
+            if self.game_state.phase == GamePhase.QUESTION and not self.game_state.claimed:
+                title = self.game_state.question_title
+                if title and self._should_skip_question(title):
+                    print("Question should be skipped - waiting for next question...")
+                    self.game_state.mark_answered()
+                else:
+                    return True
+
+            events = self.phase_watcher.wait_for(("question", "get_ready", "finished"), deadline - time.time())
+            if events is None:
+                if not self.phase_watcher.available:
+                    return False
+                continue
+
+            for event in events:
+                changed = self.game_state.observe(GamePhase.from_signal(event.get("phase")), event.get("title") or "",
+                                                  [choice.get("text", "") for choice in event.get("choices") or []],
+                                                  at=event["t"] / 1000 if event.get("t") else None)
+                if changed and self.game_state.phase == GamePhase.QUESTION:
+                    print(f"⚡ Question detected {self.phase_watcher.lag_ms(event):.0f}ms after it rendered: "
+                          f"{self.game_state.question_title[:50]}")
+
+            # Prepare early only while the get-ready page is still what is on screen
+            title = (events[-1].get("title") or "") if events else ""
+            if self.game_state.phase == GamePhase.GET_READY and title and title != prepared_title \
+                    and not self._should_skip_question(title):
+                print(f"🔍 On 'get ready' page with potential question: {title}")
+                prepared_title = title
+                try:
+                    self._prepare_early_answer(title)
+                except Exception as early_answer_error:
+                    print(f"Error preparing early answer: {early_answer_error}")
+
+        print("Timeout waiting for next question")
+        return True
+    
     def _extract_potential_question_title(self):
         """Extract potential question title from current page"""
         try:
@@ -1094,70 +1701,125 @@ class SeleniumKahootAgent:
                 "[class*='question']", "[data-functional-selector*='title']"
             ]
             
-            for selector in title_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for elem in elements:
-                        if elem.is_displayed():
-                            text = elem.text.strip()
-                            if text and len(text) > 5:
-                                return text
-                except:
-                    continue
-            
-            return ""
+            return self.selector_resolver.resolve("potential_title", title_selectors, "get_ready",
+                                                  timeout=0, min_text=6, visible_only=True).text
         except:
             return ""
     
     def _prepare_early_answer(self, question_title):
-        """Prepare an answer in advance during the 'get ready' phase"""
-        try:
-            # Early classification and preparation
-            question = Question(
-                question_text=question_title.lower(),
-                choices=[],  # We don't have choices yet
-                answer=[],  # Will be filled later
-                is_multiple_choice=True,  # Assume multiple choice
-                question_type="logic"  # Default type
-            )
-            
-            # Try to classify the question early
-            question_type = self._classify_question(question_title.lower(), [])
-            question.question_type = question_type
-            
-            # Add answer selectors as metadata
-            button_selectors = [
-                "[data-functional-selector='answer-0']",
-                "[data-functional-selector='answer-1']",
-                "[data-functional-selector='answer-2']",
-                "[data-functional-selector='answer-3']"
-            ]
-            
-            # Create placeholder choices (will be replaced with real ones later)
-            formatted_choices = []
-            for i in range(4):
-                formatted_choices.append(f"Option {i+1}: [Unknown option {i+1}]")
-            question.choices = formatted_choices
-            
-            # Add selectors as metadata
-            metadata = "\n\nAnswer selectors:"
-            for i, selector in enumerate(button_selectors):
-                metadata += f"\n  {i}: {selector}"
-            
-            question.question_text += metadata
-            
-            # Get an early answer from AI
-            answer_data = self.get_answer_from_ai(question)
-            question.answer = answer_data.correct_options
-            # Store the early answer for later use
-            self.early_answer = question.answer
-            print(f"🧠 Early answer preparation: {question.answer}")
-        except Exception as e:
-            print(f"Error preparing early answer: {e}")
+        """Start answering the get-ready title in the background, so question detection is not delayed"""
+        if self.early is not None and self.early.title == question_title:
+            return
+        self._discard_early_answer()
+        early = EarlyAnswer(question_title)
+        urls = find_urls(question_title) if self.code_fetcher else []
+        if urls:
+            # Download linked code during the countdown instead of after the answer buttons appear
+            early.code_futures = self.code_fetcher.prefetch(urls)
+            print(f"📥 Prefetching code from {urls}")
+        early.future = self.early_executor.submit(self._compute_early_answer, early)
+        self.early = early
+        print(f"🧠 Preparing early answer in the background: {question_title[:50]}")
+
+    def _compute_early_answer(self, early):
+        """Classify and answer the title alone. Runs off the main thread, so it never uses the driver"""
+        question_text = early.title
+        codes = {url: result.text for url, result in early.prefetched_code(timeout=CODE_FETCH_TIMEOUT).items()
+                 if result.text}
+        for url, code in codes.items():
+            code = self._condense_code(early.title, url, code, CODE_TOKEN_BUDGET // len(codes))
+            question_text = f"{question_text}\n\nCode from {url}:\n{code}"
+        question_text = question_text.lower()
+        question_type, candidates = self._classify_with_candidates(question_text, [], check_images=False)
+        early.set_classification(question_type, candidates)
+        if early.cancel_event.is_set() or question_type in ("image", "encoded"):
+            # These need the question screen: the image, or the text in its original case
+            return None
+
+        question = Question(
+            question_text=question_text,
+            choices=[],  # The real choices are matched against the answer later
+            answer=[],
+            is_multiple_choice=True,
+            question_type=question_type,
+            candidate_types=candidates
+        )
+        parser = PydanticOutputParser(pydantic_object=AnswerData)
+        answer = self._call_answer_model(question, self._build_prompt(question, parser), parser, early.cancel_event)
+        if answer is not None:
+            print(f"🧠 Early answer ready after {time.time() - early.started_at:.1f}s: {answer.correct_options}")
+        return answer
+
+    def _discard_early_answer(self):
+        if self.early is not None:
+            self.early.cancel()
+            self.early = None
+
+    def _reuse_early_classification(self, question_text):
+        """Question type from the get-ready screen if it announced this question, else None"""
+        early = self.early
+        if early is None or not early.matches(question_text):
+            return None
+        classification = early.classification(timeout=EARLY_ANSWER_WAIT)
+        if classification is None:
+            return None
+        # The image check needs the question screen, the snapshot already measured the media
+        snapshot = self.page_snapshot
+        rect = snapshot.image_rect if snapshot else None
+        if rect and rect["width"] > 100 and rect["height"] > 100:
+            question_type, candidates = "image", ["image"]
+        else:
+            question_type, candidates = classification
+        self.classification_candidates = candidates
+        print(f"♻️ Reusing early classification: {question_type}")
+        return question_type
+
+    def _reconcile_early_answer(self, question: Question, timeout: float):
+        """The early answer as one of the real choices, None if it is missing, unfinished or matches none"""
+        early = self.early
+        if early is None or not question.choices or not early.matches(question.question_text):
+            return None
+        options = early.options(timeout)
+        if not options:
+            return None
+        position, confidence, answer = self._match_answers_to_choices(options, question.choices)
+        if position is None or position >= len(question.choices):
+            print(f"Early answer {options} matches none of the choices")
+            return None
+        choice = question.choices[position]
+        choice_text = choice.split(":", 1)[1].strip() if choice.lower().startswith("option") and ":" in choice else choice
+        print(f"Early answer '{answer}' matched choice {position} (confidence {confidence:.2f})")
+        return [choice_text.lower()]
+
+    def take_early_answer(self, question: Question):
+        """Early answer validated against the real choices, waiting briefly if it is still running"""
+        if self.early is None:
+            return None
+        if not self.early.matches(question.question_text):
+            print("Early answer was prepared for a different question, discarding it")
+            self._discard_early_answer()
+            return None
+        timeout = EARLY_ANSWER_WAIT
+        if self.question_budget is not None:
+            timeout = min(timeout, self.question_budget.llm_timeout())
+        answer = self._reconcile_early_answer(question, timeout)
+        if answer and self.question_budget is not None:
+            self._log_question_deadline(question, "early answer")
+        return answer
     
     def _check_for_active_question(self, current_url, lobby_indicators):
         """Check if an active question is currently displayed"""
         try:
+            snapshot = self._page_snapshot()
+            if snapshot is not None:
+                text = snapshot.title.lower()
+                if len(text) > 10 and not any(lobby in text for lobby in lobby_indicators) \
+                        and not any(word in text for word in ["correct", "incorrect", "score", "points", "leaderboard"]):
+                    print(f"Question detected: {snapshot.title[:50]}...")
+                    return True
+                return snapshot.buttons_visible and any(keyword in current_url for keyword in ["question", "quiz", "gameblock"]) \
+                    and "lobby" not in current_url and "result" not in current_url
+            
             # Check for question title indicators
             question_indicators = [
                 "[data-functional-selector='block-title']",
@@ -1199,6 +1861,9 @@ class SeleniumKahootAgent:
     def is_in_lobby(self) -> bool:
         """Check if we're in the lobby/waiting area"""
         try:
+            if self._page_snapshot(max_age=0) is not None:
+                return self._observe_page(self.page_snapshot) == GamePhase.LOBBY
+            
             lobby_indicators = [
                 "You're in! See your nickname on screen?",
                 "you're in",
@@ -1255,73 +1920,149 @@ class SeleniumKahootAgent:
             
     def close(self):
         """Close the browser"""
+        if self.speculative_runner.stats:
+            print("Speculative answering stats:")
+            print(self.speculative_runner.summary())
+        self.speculative_runner.shutdown()
+        self.early_executor.shutdown(wait=False, cancel_futures=True)
+        if self.prompt_stats.records:
+            print(f"Prompt tokens: {self.prompt_stats.report()}")
+        if self.hedged_caller.calls:
+            print(f"Hedged requests: {self.hedged_caller.summary()}")
+        self.hedged_caller.shutdown()
+        if self.metrics.sites:
+            print(f"LLM calls:\n{self.metrics.summary()}")
+        self.metrics.shutdown()
+        if self.image_cache and (self.image_cache.hits or self.image_cache.misses):
+            print(f"Image answer cache: {self.image_cache.summary()}")
+        if self.selector_resolver and self.selector_resolver.stats:
+            print(f"Selector hit rates:\n{self.selector_resolver.summary()}")
+        if self.game_state.transitions:
+            print(f"Game phases: {self.game_state.summary()}")
+        if self.code_fetcher:
+            if self.code_fetcher.stats:
+                print(f"Code fetches: {self.code_fetcher.summary()}")
+            self.code_fetcher.close()
+        if self.round_trip_log:
+            print(f"WebDriver round trips per question: {np.mean(self.round_trip_log):.1f} avg, {max(self.round_trip_log)} max")
+        if self.deadline_log:
+            timeouts = sum(1 for entry in self.deadline_log if entry["outcome"].startswith("timeout"))
+            print(f"Answered {len(self.deadline_log)} questions against the timer, {timeouts} fell back after a timeout")
+        if self.browser_pool:
+            self.browser_pool.close()
         if self.driver:
             self.driver.quit() 
 
-    def _extract_code_from_url(self, question_text: str) -> str:
-        """Extract code from a URL in a coding question"""
-        import re
-        
-        # Look for URLs in the question text
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        urls = re.findall(url_pattern, question_text)
+    def _extract_code_from_url(self, question_text: str):
+        """Extract code from the URLs in a coding question, over HTTP first and in a browser tab if needed.
+
+        Returns (question with the condensed code for the prompt, question with the full code to run)"""
+        urls = find_urls(question_text)
         
         if not urls:
             print("No URLs found in coding question")
-            return question_text
+            return question_text, question_text
         
         print(f"Found URLs in coding question: {urls}")
         
-        for url in urls:
-            try:
-                # Store current window handle
-                original_window = self.driver.current_window_handle
-                
-                # Open URL in new tab
-                self.driver.execute_script(f"window.open('{url}', '_blank');")
-                
-                # Switch to new tab
-                self.driver.switch_to.window(self.driver.window_handles[-1])
-                
-                # Wait for page to load
-                time.sleep(3)
-                
-                extracted_code = ""
-                
-                # Handle Google Drive documents
-                if "drive.google.com" in url or "docs.google.com" in url:
-                    extracted_code = self._extract_from_google_drive()
-                
-                # Handle GitHub or other code hosting sites
-                elif "github.com" in url or "gist.github.com" in url:
-                    extracted_code = self._extract_from_github()
-                
-                # Handle Pastebin
-                elif "pastebin.com" in url:
-                    extracted_code = self._extract_from_pastebin()
-                
-                # Generic code extraction for other sites
+        extracted = {}
+        if self.code_fetcher:
+            # Links already seen on the get-ready screen were fetched during the countdown
+            results = self._take_prefetched_code(question_text)
+            missing = [url for url in urls if url not in results]
+            results.update(zip(missing, self.code_fetcher.fetch_all(missing)))
+            for result in (results[url] for url in urls):
+                if result.text:
+                    print(f"📥 Fetched {result.fetch_url} ({result.source}, {result.elapsed:.2f}s)")
+                    extracted[result.url] = result.text
                 else:
-                    extracted_code = self._extract_code_generic()
-                
-                # Close the tab and switch back
-                self.driver.close()
+                    print(f"HTTP fetch of {result.fetch_url} failed: {result.error}")
+        
+        if not extracted and (CODE_FETCH_BROWSER_FALLBACK or not self.code_fetcher):
+            for url in urls:
+                code = self._extract_code_in_browser(url)
+                if code:
+                    extracted[url] = code
+                    break
+        
+        runnable_text = question_text
+        for url, code in extracted.items():
+            runnable_text = f"{runnable_text}\n\nCode from {url}:\n{strip_boilerplate(code)[0]}"
+            code = self._condense_code(question_text, url, code, CODE_TOKEN_BUDGET // len(extracted))
+            print(f"Extracted code from {url}:")
+            print(code[:200] + "..." if len(code) > 200 else code)
+            question_text = f"{question_text}\n\nCode from {url}:\n{code}"
+        return question_text, runnable_text
+    
+    def _condense_code(self, question_text: str, url: str, code: str, budget: int) -> str:
+        """Linked code cut down to the parts relevant to the question, within the token budget"""
+        try:
+            condensed = condense_code(code, question_text, budget)
+        except Exception as e:
+            print(f"Error condensing code from {url}: {e}")
+            return code
+        if condensed.tokens < condensed.original_tokens:
+            print(f"✂️ Condensed code from {url}: {condensed.describe()}")
+        return condensed.text
+    
+    def _take_prefetched_code(self, question_text: str) -> dict:
+        """FetchResults prefetched for this question on the get-ready screen, by URL"""
+        early = self.early
+        if early is None or not early.code_futures or not early.matches(question_text):
+            return {}
+        results = early.prefetched_code(timeout=CODE_FETCH_TIMEOUT)
+        if results:
+            print(f"♻️ Reusing code prefetched {time.time() - early.started_at:.1f}s ago for {len(results)} URLs")
+        return results
+    
+    def _extract_code_in_browser(self, url: str) -> str:
+        """Open the URL in a new tab and scrape its code, the slow path when HTTP fetching fails"""
+        original_window = None
+        try:
+            # Store current window handle
+            original_window = self.driver.current_window_handle
+            
+            # Open URL in new tab
+            self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+            
+            # Switch to new tab
+            self.driver.switch_to.window(self.driver.window_handles[-1])
+            
+            # Wait for page to load
+            time.sleep(3)
+            
+            extracted_code = ""
+            
+            # Handle Google Drive documents
+            if "drive.google.com" in url or "docs.google.com" in url:
+                extracted_code = self._extract_from_google_drive()
+            
+            # Handle GitHub or other code hosting sites
+            elif "github.com" in url or "gist.github.com" in url:
+                extracted_code = self._extract_from_github()
+            
+            # Handle Pastebin
+            elif "pastebin.com" in url:
+                extracted_code = self._extract_from_pastebin()
+            
+            # Generic code extraction for other sites
+            else:
+                extracted_code = self._extract_code_generic()
+            
+            # Close the tab and switch back
+            self.driver.close()
+            self.driver.switch_to.window(original_window)
+            return extracted_code
+            
+        except Exception as e:
+            print(f"Error extracting code from {url}: {e}")
+            # Make sure we switch back to original window
+            try:
                 self.driver.switch_to.window(original_window)
-                
-                if extracted_code:
-                    print(f"Extracted code from {url}:")
-                    print(extracted_code[:200] + "..." if len(extracted_code) > 200 else extracted_code)
-                    return f"{question_text}\n\nCode from {url}:\n{extracted_code}"
-                
-            except Exception as e:
-                print(f"Error extracting code from {url}: {e}")
-                # Make sure we switch back to original window
-                try:
-                    self.driver.switch_to.window(original_window)
-                except:
-                    pass
+            except:
+                pass
         
-        return question_text
+        return ""
     
     def _extract_from_google_drive(self) -> str:
         """Extract code from Google Drive document"""
@@ -1550,29 +2291,72 @@ class SeleniumKahootAgent:
         
         return ""
 
-    def _capture_question_image(self) -> bytes:
-        """Capture a screenshot of the current question"""
+    def _capture_question_image(self):
+        """Capture the question image element, compressed for the vision model. Returns (bytes, mime type)"""
         try:
-            # Take a screenshot of the current page
-            screenshot = self.driver.get_screenshot_as_png()
+            start_time = time.time()
+            screenshot = None
+            
+            # The snapshot already located the media, capture just that area in one call
+            snapshot = self._page_snapshot()
+            rect = snapshot.image_rect if snapshot else None
+            if rect and rect["width"] >= MIN_MEDIA_SIDE and rect["height"] >= MIN_MEDIA_SIDE:
+                try:
+                    shot = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                        "format": "png", "captureBeyondViewport": True, "clip": {**rect, "scale": 1}})
+                    screenshot = base64.b64decode(shot["data"])
+                    print(f"🖼️ Captured question media {int(rect['width'])}x{int(rect['height'])} with selector: {snapshot.image_selector}")
+                except Exception as capture_error:
+                    print(f"Error capturing media area: {capture_error}")
+            
+            # Crop to the question media instead of sending the whole window
+            for selector in ([] if screenshot else QUESTION_MEDIA_SELECTORS):
+                try:
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    if not elements:
+                        continue
+                    # The largest match is the question image rather than an icon
+                    rects = [(element, element.rect) for element in elements]
+                    element, rect = max(rects, key=lambda item: item[1]["width"] * item[1]["height"])
+                    if rect["width"] >= MIN_MEDIA_SIDE and rect["height"] >= MIN_MEDIA_SIDE:
+                        screenshot = element.screenshot_as_png
+                        print(f"🖼️ Captured question media {int(rect['width'])}x{int(rect['height'])} with selector: {selector}")
+                        break
+                except Exception:
+                    continue
             
-            return screenshot
+            if screenshot is None:
+                print("🖼️ Question media not found, capturing the whole window")
+                screenshot = self.driver.get_screenshot_as_png()
+            
+            print(f"🖼️ Capture took {(time.time() - start_time) * 1000:.0f}ms")
+            return prepare_image(screenshot, VISION_MAX_SIDE, VISION_IMAGE_FORMAT, VISION_IMAGE_QUALITY)
             
         except Exception as e:
             print(f"Error capturing question image: {e}")
+            return None, "image/png"
+
+    def _hash_question_image(self, question: Question):
+        """Perceptual hashes of the question image, or None when the image cache is off"""
+        if self.image_cache is None:
+            return None
+        try:
+            start_time = time.time()
+            hashes = image_hashes(question.image_data)
+            print(f"🗂️ Hashed question image in {(time.time() - start_time) * 1000:.1f}ms")
+            return hashes
+        except Exception as e:
+            print(f"Error hashing question image: {e}")
             return None
 
     def _get_vision_answer(self, question: Question, prompt: str):
         """Get answer for image questions using vision model"""
         try:
-            import base64
-            from langchain_openai import ChatOpenAI
-            
             # Use GPT-4 Vision model
-            vision_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.0)
+            vision_llm = chat_model(**self._timeout_kwargs())
             
-            # Convert image to base64
-            image_base64 = base64.b64encode(question.image_data).decode('utf-8')
+            # Encode the compressed image as a data URL
+            image_url = to_data_url(question.image_data, question.image_mime)
             
             # Create message with image
             messages = [
@@ -1586,26 +2370,35 @@ class SeleniumKahootAgent:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{image_base64}"
+                                "url": image_url,
+                                "detail": VISION_DETAIL
                             }
                         }
                     ]
                 }
             ]
             
-            print("🖼️ Sending image question to vision model...")
-            response = vision_llm.invoke(messages)
+            print(f"🖼️ Sending image question to vision model ({len(image_url) / 1024:.1f}KB, detail={VISION_DETAIL})...")
+            start_time = time.time()
+            with self.metrics.track("vision") as call:
+                response = vision_llm.invoke(messages)
+                call.record_response(response)
+            print(f"🖼️ Vision model answered in {time.time() - start_time:.2f}s")
             
             return response
             
         except Exception as e:
             print(f"Error with vision model: {e}")
             # Fallback to text-only model
-            return self.llm.invoke(prompt) 
+            return chat_model(**self._timeout_kwargs()).invoke(prompt)
 
     def _are_answer_buttons_visible(self):
         """Check if answer buttons are visible on the page"""
         try:
+            snapshot = self._page_snapshot()
+            if snapshot is not None:
+                return snapshot.buttons_visible
+            
             # Try to find answer buttons with Kahoot-specific selectors
             button_selectors = [
                 "[data-functional-selector='answer-0']",
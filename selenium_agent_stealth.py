@@ -8,8 +8,9 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from output_format.question import Question
 from output_format.answer import AnswerData
-from math_helper import eval_expr
+from math_helper import eval_expr, format_number
 from encoding_helper import handle_encoded_question
+from match_helper import ChoiceMatcher
 import re
 
 
@@ -211,6 +212,7 @@ class StealthKahootAgent:
                 raise Exception("Could not find question text")
             
             # Convert question text to lowercase
+            original_text = question_text
             question_text = question_text.lower()
             
             # Get choices
@@ -299,7 +301,7 @@ class StealthKahootAgent:
             # Handle encoded questions
             decoded_text = None
             if question_type == "encoded":
-                decoded_text, encoding_type = handle_encoded_question(question_text)
+                decoded_text, encoding_type = handle_encoded_question(original_text)
                 if encoding_type != "none":
                     print(f"✅ Successfully decoded {encoding_type} question")
                 else:
@@ -446,7 +448,7 @@ class StealthKahootAgent:
             
             if question.question_type == "math":
                 try:
-                    output_data.correct_options[0] = str(eval_expr(output_data.correct_options[0]))
+                    output_data.correct_options[0] = format_number(eval_expr(output_data.correct_options[0]))
                 except Exception as ex:
                     print(f"Math evaluation error: {ex}")
             
@@ -748,27 +750,10 @@ class StealthKahootAgent:
     def _find_answer_position(self, answer_text, choices):
         """Find the position of an answer in the list of choices"""
         try:
-            # For numerical answers, try to find the exact match
-            for i, choice in enumerate(choices):
-                choice_lower = choice.lower()
-                
-                # Extract just the text part from "Option N: text"
-                if ":" in choice_lower:
-                    choice_text = choice_lower.split(":", 1)[1].strip()
-                else:
-                    choice_text = choice_lower
-                
-                # Check for exact match
-                if choice_text == answer_text:
-                    return i
-                
-                # Check if choice contains the answer (for numerical answers)
-                if answer_text.isdigit() and answer_text in choice_text.split():
-                    return i
-            
-            # If no match found
-            return None
-        except:
+            position, confidence = ChoiceMatcher(choices).match(answer_text)
+            return position
+        except Exception as e:
+            print(f"Error matching answer to choices: {e}")
             return None
     
     def is_game_finished(self) -> bool:
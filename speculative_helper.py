@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Number of recent latencies kept per strategy
+LATENCY_WINDOW = 50
+
+# Distinct rule keywords needed before a rule-based type that disagrees with the AI is worth racing
+MIN_RULE_HITS = 2
+
+
+def candidate_types(ai_type: str, rule_hits: Dict[str, int], min_hits: int = MIN_RULE_HITS) -> List[str]:
+    """The AI type, plus the strongest rule-based type only when it disagrees with enough evidence"""
+    candidates = [ai_type]
+    if rule_hits:
+        rule_type, hits = max(rule_hits.items(), key=lambda item: item[1])
+        if rule_type != ai_type and hits >= min_hits and hits > rule_hits.get(ai_type, 0):
+            candidates.append(rule_type)
+    return candidates
+
+
+class StrategyStats:
+    """Launch, win and latency counters for one answering strategy"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.launches = 0
+        self.wins = 0
+        self.completions = 0
+        self.invalid = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def win_rate(self) -> float:
+        return self.wins / self.launches if self.launches else 0.0
+
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: won {self.wins}/{self.launches} ({self.win_rate():.0%}), "
+                f"avg {self.mean_latency():.2f}s over {len(self.latencies)} completions, "
+                f"{self.invalid} invalid, {self.failures} failed, {self.cancelled} cancelled")
+
+
+class SpeculativeRunner:
+    """
+    Run several answering strategies concurrently under a shared deadline
+    and keep the first result that passes validation.
+
+    Each strategy is called with a threading.Event that is set once a
+    winner is found or the deadline passes, so long-running strategies
+    (e.g. streamed completions) can stop early.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative")
+        self.stats: Dict[str, StrategyStats] = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, name: str) -> StrategyStats:
+        with self._lock:
+            if name not in self.stats:
+                self.stats[name] = StrategyStats(name)
+            return self.stats[name]
+
+    def _timed(self, name: str, strategy: Callable[[threading.Event], Any], cancel_event: threading.Event):
+        stats = self._get_stats(name)
+        start_time = time.time()
+        try:
+            result = strategy(cancel_event)
+        except Exception:
+            with self._lock:
+                stats.failures += 1
+            raise
+
+        elapsed = time.time() - start_time
+        with self._lock:
+            if cancel_event.is_set() and result is None:
+                stats.cancelled += 1
+            else:
+                stats.completions += 1
+                stats.latencies.append(elapsed)
+        return result, elapsed
+
+    def run(self, strategies: Dict[str, Callable[[threading.Event], Any]],
+            is_valid: Callable[[Any], bool], timeout: float) -> Tuple[Optional[str], Any]:
+        """
+        Launch all strategies and return (name, result) of the first valid result,
+        or (None, None) if none is valid before the timeout.
+        """
+        cancel_event = threading.Event()
+        futures = {}
+        for name, strategy in strategies.items():
+            self._get_stats(name).launches += 1
+            futures[self.executor.submit(self._timed, name, strategy, cancel_event)] = name
+
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                name = futures[future]
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    print(f"Strategy '{name}' failed: {e}")
+                    continue
+
+                if result is not None and is_valid(result):
+                    with self._lock:
+                        self.stats[name].wins += 1
+                    print(f"🏁 Strategy '{name}' won after {elapsed:.2f}s")
+                    return name, result
+
+                with self._lock:
+                    self.stats[name].invalid += 1
+                print(f"Strategy '{name}' returned an answer that does not match any choice")
+        except FutureTimeoutError:
+            print(f"⏱️ No strategy produced a valid answer within {timeout:.1f}s")
+        finally:
+            # Stop the losers; strategies that have not started yet are dropped entirely
+            cancel_event.set()
+            for future, name in futures.items():
+                if future.cancel():
+                    with self._lock:
+                        self.stats[name].cancelled += 1
+
+        return None, None
+
+    def summary(self) -> str:
+        with self._lock:
+            return "\n".join(stats.summary() for stats in self.stats.values())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,74 @@
+import json
+import re
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+
+class IncrementalAnswerParser:
+    """
+    Incrementally parse a streamed completion and emit the answer list
+    as soon as its JSON array is closed, without waiting for the rest
+    of the generation.
+    """
+
+    def __init__(self, field: str = "correct_options"):
+        self.field = field
+        self.buffer = ""
+        self.options: Optional[List[str]] = None
+        self._decoder = json.JSONDecoder()
+        self._field_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*\[')
+        self._array_start = None
+
+    def feed(self, chunk: str) -> Optional[List[str]]:
+        """Add a chunk of streamed text. Returns the options once they are complete."""
+        if not chunk:
+            return self.options
+
+        self.buffer += chunk
+        if self.options is not None:
+            return self.options
+
+        if self._array_start is None:
+            match = self._field_pattern.search(self.buffer)
+            if not match:
+                return None
+            self._array_start = match.end() - 1
+
+        # The array can only be complete once a closing bracket has arrived
+        if "]" not in self.buffer[self._array_start:]:
+            return None
+
+        try:
+            value, _ = self._decoder.raw_decode(self.buffer, self._array_start)
+        except ValueError:
+            return None
+
+        if isinstance(value, list):
+            self.options = [str(option) for option in value]
+        return self.options
+
+    def is_complete(self) -> bool:
+        return self.options is not None
+
+
+def parse_streamed_answer(chunks: Iterable[str], field: str = "correct_options") -> Optional[List[str]]:
+    """Consume chunks until the answer field closes and return it"""
+    parser = IncrementalAnswerParser(field)
+    for chunk in chunks:
+        if parser.feed(chunk) is not None:
+            return parser.options
+    return parser.options
+
+
+def drain_in_background(stream: Iterator) -> threading.Thread:
+    """Consume the rest of a stream on a daemon thread so the connection can be reused"""
+    def _drain():
+        try:
+            for _ in stream:
+                pass
+        except Exception as e:
+            print(f"Error draining stream: {e}")
+
+    thread = threading.Thread(target=_drain, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the browser profiles
+"""
+
+from browser_profile_helper import (DEFAULT_BLOCKED_URLS, apply_performance_profile, build_chrome_options,
+                                    parse_patterns)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+        return {}
+
+
+def test_default_profile_unchanged():
+    """The default profile stays headed with normal page loads"""
+    options = build_chrome_options("default")
+    print(f"Default arguments: {options.arguments}")
+    assert "--no-sandbox" in options.arguments
+    assert not any(arg.startswith("--headless") for arg in options.arguments)
+    assert options.page_load_strategy == "normal"
+
+
+def test_performance_profile():
+    """The performance profile is headless, eager and quiet, headless can be overridden"""
+    options = build_chrome_options("performance")
+    assert "--headless=new" in options.arguments
+    assert "--force-prefers-reduced-motion" in options.arguments
+    assert "--mute-audio" in options.arguments
+    assert options.page_load_strategy == "eager"
+
+    headed = build_chrome_options("performance", headless=False)
+    assert not any(arg.startswith("--headless") for arg in headed.arguments)
+    assert headed.page_load_strategy == "eager"
+
+    try:
+        build_chrome_options("turbo")
+        assert False, "Expected an unknown profile error"
+    except ValueError:
+        pass
+
+
+def test_cdp_setup():
+    """URL blocking, reduced-motion media and the CSS injection are sent over CDP"""
+    driver = FakeDriver()
+    apply_performance_profile(driver, ["*.woff2", "*hotjar.com*"])
+    commands = dict(driver.commands)
+    print(f"CDP commands: {[command for command, _ in driver.commands]}")
+    assert commands["Network.setBlockedURLs"] == {"urls": ["*.woff2", "*hotjar.com*"]}
+    assert commands["Emulation.setEmulatedMedia"]["features"][0] == {"name": "prefers-reduced-motion", "value": "reduce"}
+    assert "animation-duration: 0s" in commands["Page.addScriptToEvaluateOnNewDocument"]["source"]
+
+
+def test_parse_patterns():
+    assert parse_patterns("") == DEFAULT_BLOCKED_URLS
+    assert parse_patterns(" *.woff2 , *.mp3,,") == ["*.woff2", "*.mp3"]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing browser profiles")
+    test_default_profile_unchanged()
+    test_performance_profile()
+    test_cdp_setup()
+    test_parse_patterns()
+    print("✅ All browser profile tests passed")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the record/replay cassette, recorded against the fake OpenAI server
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import httpx
+from openai import NotFoundError, OpenAI
+
+from cassette_helper import CassetteTransport, request_key
+from fake_openai_server import FakeOpenAIServer
+from llm_helper import client_options
+
+PROMPT = "What is the capital of France?\nChoices:\n- Paris\n- Rome"
+
+
+def _client(base_url, transport):
+    return OpenAI(api_key="test", base_url=base_url, max_retries=0,
+                  http_client=httpx.Client(transport=transport))
+
+
+def _record(path, server):
+    """Record one plain, one streamed and one embedding call"""
+    recorder = CassetteTransport(path, mode="record")
+    client = _client(server.base_url, recorder)
+    answer = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": PROMPT}])
+    stream = client.chat.completions.create(model="gpt-4o-mini", stream=True,
+                                            messages=[{"role": "user", "content": PROMPT}])
+    streamed = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+    embedding = client.embeddings.create(model="text-embedding-3-large", input="Paris")
+    recorder.close()
+    return answer.choices[0].message.content, streamed, embedding.data[0].embedding
+
+
+def test_request_key():
+    """Key ignores host, headers and JSON key order, but not the content"""
+    a = httpx.Request("POST", "http://a/v1/chat/completions", json={"model": "m", "messages": [1]})
+    b = httpx.Request("POST", "http://b:9/v1/chat/completions", content=b'{"messages": [1], "model": "m"}',
+                      headers={"Authorization": "Bearer secret"})
+    c = httpx.Request("POST", "http://a/v1/chat/completions", json={"model": "m", "messages": [2]})
+    print(f"Keys: {request_key(a)} {request_key(b)} {request_key(c)}")
+    assert request_key(a) == request_key(b)
+    assert request_key(a) != request_key(c)
+
+
+def test_record_and_replay():
+    """Replay serves the recorded responses with the server stopped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.json.gz")
+        with FakeOpenAIServer(latency="fixed:0.05") as server:
+            recorded = _record(path, server)
+            base_url = server.base_url
+        assert os.path.exists(path)
+
+        # Server is gone, only the cassette can answer
+        client = _client(base_url, CassetteTransport(path, mode="replay", timing=False))
+        answer = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": PROMPT}])
+        stream = client.chat.completions.create(model="gpt-4o-mini", stream=True,
+                                                messages=[{"role": "user", "content": PROMPT}])
+        streamed = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+        embedding = client.embeddings.create(model="text-embedding-3-large", input="Paris")
+
+        print(f"Recorded: {recorded[0]} / {recorded[1]}")
+        print(f"Replayed: {answer.choices[0].message.content} / {streamed}")
+        assert answer.choices[0].message.content == recorded[0]
+        assert streamed == recorded[1]
+        assert embedding.data[0].embedding == recorded[2]
+
+
+def test_replay_timing_and_misses():
+    """Recorded timing is reproduced, zero-latency replay is fast, unknown requests fail fast"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.json.gz")
+        with FakeOpenAIServer(latency="fixed:0.2") as server:
+            _record(path, server)
+            base_url = server.base_url
+
+        messages = [{"role": "user", "content": PROMPT}]
+        for timing, check in ((True, lambda t: t >= 0.18), (False, lambda t: t < 0.1)):
+            client = _client(base_url, CassetteTransport(path, mode="replay", timing=timing))
+            start = time.perf_counter()
+            client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+            elapsed = time.perf_counter() - start
+            print(f"Replay with timing={timing}: {elapsed:.3f}s")
+            assert check(elapsed)
+
+        transport = CassetteTransport(path, mode="replay", timing=False)
+        try:
+            _client(base_url, transport).chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Something never recorded"}])
+            assert False, "Expected a cassette miss"
+        except NotFoundError:
+            pass
+        assert transport.misses == 1
+
+
+def test_compressed_responses_replay():
+    """A gzip-compressed upstream, like the OpenAI API, replays to the same decoded body"""
+    body = {"ok": 1, "answer": "Paris"}
+
+    def upstream(request):
+        return httpx.Response(200, content=gzip.compress(json.dumps(body).encode("utf-8")),
+                              headers={"content-type": "application/json", "content-encoding": "gzip",
+                                       "set-cookie": "session=secret"})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.json.gz")
+        recorder = CassetteTransport(path, mode="record", transport=httpx.MockTransport(upstream))
+        with httpx.Client(transport=recorder) as client:
+            assert client.post("http://api/v1/chat/completions", json={"q": 1}).json() == body
+
+        replayer = CassetteTransport(path, mode="replay", timing=False)
+        with httpx.Client(transport=replayer) as client:
+            response = client.post("http://api/v1/chat/completions", json={"q": 1})
+        print(f"Replayed compressed response: {response.json()}")
+        assert response.json() == body
+        assert "set-cookie" not in response.headers
+
+
+def test_cassette_http_client_is_shared():
+    """Every model client in cassette mode reuses one HTTP client instead of leaking a new one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = {key: os.environ.get(key) for key in ("LLM_CASSETTE_MODE", "LLM_CASSETTE_PATH")}
+        os.environ.update(LLM_CASSETTE_MODE="replay", LLM_CASSETTE_PATH=os.path.join(tmp, "cassette.json.gz"))
+        try:
+            first = client_options()["http_client"]
+            assert client_options()["http_client"] is first
+            # A closed shared client is replaced rather than handed out again
+            first.close()
+            assert client_options()["http_client"] is not first
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+if __name__ == "__main__":
+    print("🧪 Testing cassette helper")
+    test_request_key()
+    test_record_and_replay()
+    test_replay_timing_and_misses()
+    test_compressed_responses_replay()
+    test_cassette_http_client_is_shared()
+    print("✅ All cassette tests passed")
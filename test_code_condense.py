@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for condensing linked code to a token budget
+"""
+
+from code_condense_helper import OMITTED_MARKER, condense_code, split_blocks, strip_boilerplate, strip_line_numbers
+from code_runner_helper import run_python_snippet, sandbox_available
+from prompt_helper import count_tokens
+
+SCRAPED = """Raw
+Blame
+24 lines (18 loc) · 612 Bytes
+# Copyright (c) 2024 Example Corp
+# Licensed under the MIT License
+
+import math
+
+def render_banner(width):
+    border = "=" * width
+    header = "|" + " " * (width - 2) + "|"
+    return "\\n".join([border, header, header, border, header, header, border])
+
+def compute_area(radius):
+    return math.pi * radius ** 2
+
+class ReportWriter:
+    def __init__(self, path):
+        self.path = path
+        self.lines = ["header", "summary", "details", "footer", "appendix", "index"]
+
+    def write(self):
+        return len(self.lines)
+
+def scale(value):
+    if value > 2:
+        return value * 3
+    else:
+        return value
+
+print(round(compute_area(scale(2)), 2))
+"""
+
+
+def test_strip_boilerplate():
+    """UI text, the licence header and line-number gutters are removed, indentation is kept"""
+    cleaned, stripped = strip_boilerplate(SCRAPED)
+    print(f"Stripped {stripped} lines")
+    assert cleaned.startswith("import math")
+    assert "Blame" not in cleaned and "Copyright" not in cleaned
+    assert stripped == 5
+
+    numbered = ["1 def f(x):", "2     return x + 1", "3", "4 print(f(2))"]
+    assert strip_line_numbers(numbered) == ["def f(x):", "    return x + 1", "", "print(f(2))"]
+    # Numbers that do not count upwards are code, not a gutter
+    assert strip_line_numbers(["10 * 2", "3 + 4", "1 - 1"]) == ["10 * 2", "3 + 4", "1 - 1"]
+
+
+def test_split_blocks():
+    """Functions keep their bodies and decorators, else/except stay with their statement"""
+    blocks = split_blocks("@cache\ndef f():\n    return 1\nif x:\n    y()\nelse:\n    z()\nprint(f())")
+    assert blocks == ["@cache\ndef f():\n    return 1", "if x:\n    y()\nelse:\n    z()", "print(f())"]
+
+
+def test_condense_keeps_relevant_blocks():
+    """Over budget, the blocks the question and the final call depend on are kept"""
+    question = "What does this code print for the area of the scaled circle? compute_area"
+    result = condense_code(SCRAPED, question, budget=70)
+    print(result.text)
+    print(result.describe())
+    assert result.tokens <= 70
+    assert "def compute_area" in result.text and "def scale" in result.text
+    assert "print(round(compute_area(scale(2)), 2))" in result.text
+    assert "render_banner" not in result.text and "class ReportWriter" not in result.text
+    assert OMITTED_MARKER in result.text
+    assert any(line.startswith("class ReportWriter") for line in result.dropped)
+
+    # The condensed code still runs, the omission markers are valid Python
+    if sandbox_available():
+        run = run_python_snippet(result.text)
+        assert run.ok and run.stdout.strip() == "12.57", run
+
+
+def test_within_budget_and_tiny_budget():
+    """Code within budget only loses boilerplate, a budget smaller than any block truncates the best one"""
+    result = condense_code(SCRAPED, "area", budget=10000)
+    assert not result.dropped and result.text == strip_boilerplate(SCRAPED)[0]
+
+    tiny = condense_code(SCRAPED, "compute_area", budget=6)
+    print(f"Tiny budget: {tiny.describe()}")
+    assert tiny.kept_blocks == 1
+    assert count_tokens(tiny.text) <= 6
+    assert tiny.text.endswith(OMITTED_MARKER)
+
+
+def test_keeps_what_the_last_block_calls():
+    """Functions the final call uses are kept even when they share no words with the question"""
+    helpers = "\n\n".join(f"def helper_{i}(v):\n    return v - {i} + 7" for i in range(120))
+    code = f"{helpers}\n\ndef scale(v):\n    return helper_7(v) + 1\n\nprint(scale(3))"
+    result = condense_code(code, "What does this print?", budget=300)
+    print(result.describe())
+    assert result.tokens <= 300 and len(result.dropped) > 50
+    assert "def scale" in result.text and "def helper_7(" in result.text
+    assert result.text.rstrip().endswith("print(scale(3))")
+
+    if sandbox_available():
+        run = run_python_snippet(result.text)
+        assert run.ok and run.stdout.strip() == "4", run
+
+
+if __name__ == "__main__":
+    print("🧪 Testing code condensing")
+    test_strip_boilerplate()
+    test_split_blocks()
+    test_condense_keeps_relevant_blocks()
+    test_within_budget_and_tiny_budget()
+    test_keeps_what_the_last_block_calls()
+    print("✅ All code condense tests passed")
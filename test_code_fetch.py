@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for HTTP code fetching, against a local HTTP server
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from code_fetch_helper import CodeFetcher, extract_code_from_html, find_urls, rewrite_url
+
+CODE = "def add(a, b):\n    return a + b\n\nprint(add(2, 3))"
+PAGE = "<html><body><nav>Menu</nav><pre><code>x = [1, 2, 3]\nprint(len(x) &gt; 2)</code></pre></body></html>"
+
+
+class CodeHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        CodeHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path.startswith("/slow"):
+            time.sleep(0.3)
+        if self.path in ("/code.py", "/slow/a.py", "/slow/b.py"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+                return
+            self._send(CODE, "text/plain", etag='"v1"')
+        elif self.path == "/page":
+            self._send(PAGE, "text/html")
+        elif self.path == "/huge":
+            # No Content-Length, so only the bytes read tell that it is too large
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.end_headers()
+            try:
+                for _ in range(256):
+                    self.wfile.write(b"x = 1\n" * 10000)
+                    time.sleep(0.01)
+            except OSError:
+                pass
+        elif self.path == "/login":
+            self._send("<html><body>Sign in</body></html>", "text/html")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def _send(self, body, content_type, etag=None):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CodeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_rewrite_url():
+    """Known code hosts are rewritten to their raw or export endpoints"""
+    cases = {
+        "https://github.com/octo/repo/blob/main/src/app.py": "https://raw.githubusercontent.com/octo/repo/main/src/app.py",
+        "https://gist.github.com/octo/abc123#file-x-py": "https://gist.github.com/octo/abc123/raw",
+        "https://pastebin.com/XyZ12": "https://pastebin.com/raw/XyZ12",
+        "https://drive.google.com/file/d/1AbC_d-9/view?usp=sharing": "https://drive.google.com/uc?export=download&id=1AbC_d-9",
+        "https://drive.google.com/open?id=1AbC": "https://drive.google.com/uc?export=download&id=1AbC",
+        "https://docs.google.com/document/d/1Doc/edit": "https://docs.google.com/document/d/1Doc/export?format=txt",
+    }
+    for url, expected in cases.items():
+        assert rewrite_url(url) == (expected, True), (url, rewrite_url(url))
+    assert rewrite_url("https://example.com/snippet") == ("https://example.com/snippet", False)
+    assert find_urls("See https://pastebin.com/XyZ12. and (https://a.io/x), https://pastebin.com/XyZ12") == [
+        "https://pastebin.com/XyZ12", "https://a.io/x"]
+
+
+def test_extract_code_from_html():
+    assert extract_code_from_html(PAGE) == "x = [1, 2, 3]\nprint(len(x) > 2)"
+    assert extract_code_from_html("<p>no code here</p>") == ""
+
+
+def test_fetch_and_revalidate():
+    """Downloads are cached, revalidated with If-None-Match and served stale when the server is gone"""
+    server, base = _serve()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        fetcher = CodeFetcher(cache_dir, timeout=2, max_age=0)
+        first = fetcher.fetch(f"{base}/code.py")
+        assert (first.text, first.source) == (CODE, "network")
+
+        second = fetcher.fetch(f"{base}/code.py")
+        print(f"Second fetch: {second.source} in {second.elapsed:.3f}s")
+        assert (second.text, second.source) == (CODE, "revalidated")
+        assert CodeHandler.requests[-1] == ("/code.py", '"v1"')
+        fetcher.close()
+
+        # A new fetcher reads the index from disk, within max_age no request is made
+        cached = CodeFetcher(cache_dir, timeout=2, max_age=60)
+        count = len(CodeHandler.requests)
+        assert cached.fetch(f"{base}/code.py").source == "cache"
+        assert len(CodeHandler.requests) == count
+
+        server.shutdown()
+        server.server_close()
+        cached.max_age = 0
+        stale = cached.fetch(f"{base}/code.py")
+        assert (stale.text, stale.source) == (CODE, "stale")
+        cached.close()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_concurrent_and_failures():
+    """URLs are fetched concurrently, HTML pages give their code blocks and unusable pages fail"""
+    server, base = _serve()
+    try:
+        fetcher = CodeFetcher(cache_dir=None, timeout=2)
+        start = time.perf_counter()
+        results = fetcher.fetch_all([f"{base}/slow/a.py", f"{base}/slow/b.py", f"{base}/page",
+                                     f"{base}/login", f"{base}/missing"])
+        elapsed = time.perf_counter() - start
+        print(f"Fetched {len(results)} URLs in {elapsed:.2f}s: {fetcher.summary()}")
+        assert elapsed < 0.55  # Two 0.3 second downloads overlap
+        assert [r.source for r in results] == ["network", "network", "network", "failed", "failed"]
+        assert results[2].text.startswith("x = [1, 2, 3]")
+        assert "404" in results[4].error
+
+        # An oversized body is abandoned once MAX_BYTES arrived, not downloaded in full
+        start = time.perf_counter()
+        huge = fetcher.fetch(f"{base}/huge")
+        print(f"Oversized download stopped after {time.perf_counter() - start:.2f}s: {huge.error}")
+        assert huge.source == "failed" and "larger than" in huge.error
+        assert time.perf_counter() - start < 1.5
+
+        # Prefetching returns at once, the downloads run in the background
+        start = time.perf_counter()
+        futures = fetcher.prefetch([f"{base}/slow/a.py", f"{base}/page"])
+        assert time.perf_counter() - start < 0.1
+        assert futures[f"{base}/slow/a.py"].result(timeout=2).text == CODE
+        fetcher.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing code fetching")
+    test_rewrite_url()
+    test_extract_code_from_html()
+    test_fetch_and_revalidate()
+    test_concurrent_and_failures()
+    print("✅ All code fetch tests passed")
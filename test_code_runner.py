@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the sandboxed Python snippet runner
+"""
+
+import os
+
+from code_runner_helper import RunResult, extract_python_snippet, run_python_snippet, match_result_to_choices, \
+    sandbox_available
+
+# Probed once: snippets only run where unshare, chroot, setpriv and namespaces are available
+SANDBOX_AVAILABLE = sandbox_available()
+
+# (question text, choices, expected choice index) for questions answered by running the code
+SNIPPETS = [
+    (
+        "What is the output of this code?\n```python\nx = [1, 2, 3]\nprint(sum(x) * 2)\n```",
+        ["option 1: 6", "option 2: 12", "option 3: 123", "option 4: error"],
+        1,
+    ),
+    (
+        "What does this print?\n\nCode from https://pastebin.com/raw/abc:\nfor i in range(3):\n    print(i)",
+        ["option 1: 0 1 2", "option 2: 1 2 3", "option 3: 3"],
+        0,
+    ),
+    (
+        "What happens?\n```\nd = {'a': 1}\nprint(d['b'])\n```",
+        ["option 1: 1", "option 2: none", "option 3: keyerror"],
+        2,
+    ),
+    (
+        "What is printed?\n```python\n1 | def f(s):\n2 |     return s[::-1]\n3 | print(f('kahoot'))\n```",
+        ["option 1: kahoot", "option 2: toohak"],
+        1,
+    ),
+]
+
+
+def test_extract_snippet():
+    """Python code is found in fenced blocks and fetched code, other languages are skipped"""
+    print("🧪 Testing snippet extraction...")
+
+    assert extract_python_snippet(SNIPPETS[0][0]) == "x = [1, 2, 3]\nprint(sum(x) * 2)"
+    assert extract_python_snippet(SNIPPETS[1][0]).startswith("for i in range(3):")
+    assert extract_python_snippet("What is the capital of France?") is None
+    assert extract_python_snippet("```\n#include <stdio.h>\nint main() { printf(\"hi\"); }\n```") is None
+    assert extract_python_snippet("```js\nconst x = 1;\nconsole.log(x);\n```") is None
+
+    print("✅ Snippet extraction test completed\n")
+
+
+def test_answers_from_execution():
+    """Running the snippet picks the matching choice"""
+    print("🧪 Testing answers from execution...")
+    if not SANDBOX_AVAILABLE:
+        print("Snippet sandbox not available here, skipping")
+        return
+
+    for text, choices, expected in SNIPPETS:
+        result = run_python_snippet(extract_python_snippet(text))
+        position = match_result_to_choices(result, choices)
+        print(f"{result.stdout.strip()!r} / {result.exception} -> {position} ({result.elapsed:.2f}s)")
+        assert position == expected, (text, position)
+
+    print("✅ Execution test completed\n")
+
+
+def test_sandbox_limits():
+    """Infinite loops time out and network access fails inside the sandbox"""
+    print("🧪 Testing sandbox limits...")
+    if not SANDBOX_AVAILABLE:
+        print("Snippet sandbox not available here, skipping")
+        return
+
+    result = run_python_snippet("while True:\n    pass", timeout=1.0)
+    assert result.timed_out and not result.ok
+    assert result.elapsed < 3.5
+    assert match_result_to_choices(result, ["option 1: 0"]) is None
+
+    result = run_python_snippet("import socket\nsocket.create_connection(('93.184.215.14', 80))")
+    assert result.exception and "Error" in result.exception
+
+    # Blocked by the kernel, not by patched modules the snippet can work around
+    result = run_python_snippet("import _socket\ns = _socket.socket()\ns.connect(('93.184.215.14', 80))")
+    assert result.exception and "unreachable" in result.exception.lower()
+
+    result = run_python_snippet("import os\nos.system('echo hi')")
+    assert "hi" not in result.stdout
+
+    result = run_python_snippet("import os\nos.posix_spawn('/bin/echo', ['echo', 'hi'], {})")
+    assert result.exception and "hi" not in result.stdout
+
+    print("✅ Sandbox limits test completed\n")
+
+
+def test_sandbox_hides_secrets():
+    """The snippet sees neither the agent's files nor its environment"""
+    print("🧪 Testing sandbox isolation...")
+    if not SANDBOX_AVAILABLE:
+        print("Snippet sandbox not available here, skipping")
+        return
+
+    this_file = os.path.abspath(__file__)
+    result = run_python_snippet(f"print(open({this_file!r}).read())")
+    assert result.exception and "FileNotFoundError" in result.exception
+
+    os.environ["SNIPPET_TEST_SECRET"] = "sk-test"
+    try:
+        result = run_python_snippet("import os\nprint(sorted(os.environ))")
+    finally:
+        del os.environ["SNIPPET_TEST_SECRET"]
+    assert result.ok and "SNIPPET_TEST_SECRET" not in result.stdout and "OPENAI_API_KEY" not in result.stdout
+
+    # Files in the scratch directory still work
+    result = run_python_snippet("open('out.txt', 'w').write('ok')\nprint(open('out.txt').read())")
+    assert result.ok and result.stdout.strip() == "ok"
+
+    print("✅ Sandbox isolation test completed\n")
+
+
+def test_unmatched_error_is_left_to_the_llm():
+    """An error is only matched by its name, never to whichever choice mentions an error"""
+    result = RunResult("", "", "NameError: name 'scale' is not defined", False, 0.1)
+    assert match_result_to_choices(result, ["option 1: 4", "option 2: TypeError", "option 3: error"]) is None
+    assert match_result_to_choices(result, ["option 1: 4", "option 2: NameError"]) == 1
+
+
+if __name__ == "__main__":
+    print("🐍 Testing Code Runner\n")
+
+    test_extract_snippet()
+    test_answers_from_execution()
+    test_sandbox_limits()
+    test_sandbox_hides_secrets()
+    test_unmatched_error_is_left_to_the_llm()
+
+    print("🎉 All code runner tests completed!")
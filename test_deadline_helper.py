@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-question answer budget and its fallbacks
+"""
+
+import time
+
+from deadline_helper import DEFAULT_QUESTION_TIME, QuestionBudget, fallback_answer, heuristic_answer, parse_timer_text
+
+
+def test_parse_timer_text():
+    """Countdown formats are read as seconds, anything else is None"""
+    assert parse_timer_text("20") == 20
+    assert parse_timer_text(" 0:20 ") == 20
+    assert parse_timer_text("1:05") == 65
+    assert parse_timer_text("17s") == 17
+    assert parse_timer_text("7.5 sec") == 7.5
+    for text in ["", None, "abc", "0", "999", "20 points", "1:2:3"]:
+        assert parse_timer_text(text) is None, text
+
+
+def test_budget_expiry():
+    """The model gets the time left minus the click reserve, and the budget expires with it"""
+    budget = QuestionBudget(0.3, reserve=0.1)
+    assert budget.from_timer
+    assert 0.15 < budget.llm_timeout() <= 0.2
+    assert not budget.expired()
+    time.sleep(0.25)
+    assert budget.expired() and budget.llm_timeout() == 0
+    assert budget.remaining() < 0.1
+
+    default = QuestionBudget(None)
+    assert not default.from_timer and default.time_limit == DEFAULT_QUESTION_TIME
+    print(default)
+
+
+def test_fallback_order():
+    """Cached answers beat early answers, which beat the heuristic; the early answer is only read when needed"""
+    choices = ["Option 1: Paris", "Option 2: Rome", "Option 3: All of the above"]
+    early_calls = []
+
+    def early():
+        early_calls.append(1)
+        return ["rome"]
+
+    assert fallback_answer(["paris"], early, choices) == ("cached", ["paris"])
+    assert not early_calls
+    assert fallback_answer(None, early, choices) == ("early", ["rome"])
+    assert fallback_answer([], lambda: None, choices) == ("heuristic", ["all of the above"])
+    assert fallback_answer(None, lambda: None, []) == ("heuristic", [])
+
+
+def test_heuristic_answer():
+    assert heuristic_answer(["Option 1: cat", "Option 2: giraffe"]) == ["giraffe"]
+    assert heuristic_answer(["yes", "All of the above", "no, definitely not"]) == ["all of the above"]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing question deadlines")
+    test_parse_timer_text()
+    test_budget_expiry()
+    test_fallback_order()
+    test_heuristic_answer()
+    print("✅ All deadline tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the one-call page snapshot and the WebDriver round trip counter
+"""
+
+from dom_snapshot_helper import TAKE_SNAPSHOT_JS, PageSnapshot, RoundTripCounter, take_snapshot
+
+RAW_SNAPSHOT = {
+    "url": "https://kahoot.it/gameblock",
+    "phase": "question",
+    "title": "What is the capital of France?",
+    "buttons_visible": True,
+    "choices": [
+        {"text": "Paris", "selector": "[data-functional-selector='answer-0']", "visible": True},
+        {"text": "Rome", "selector": "[data-functional-selector='answer-1']", "visible": True},
+        {"text": "", "selector": None, "visible": False},
+    ],
+    "image": {"selector": "main img", "rect": {"x": 10, "y": 20, "width": 400, "height": 300}},
+    "timer_text": "17",
+    "t": 0,
+}
+
+
+class FakeDriver:
+    """Answers execute_script with a fixed result and counts low-level commands"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.scripts = []
+
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.execute("w3cExecuteScript", {"script": script, "args": list(args)})
+        self.scripts.append((script, args))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_snapshot_parsing():
+    """A raw snapshot becomes choices, selectors, image and timer fields"""
+    snapshot = PageSnapshot.from_dict(RAW_SNAPSHOT)
+    print(f"Snapshot: {snapshot}")
+    assert snapshot.phase == "question"
+    assert snapshot.title == "What is the capital of France?"
+    assert snapshot.choices == ["Paris", "Rome", ""]
+    assert snapshot.answer_selectors[1] == "[data-functional-selector='answer-1']"
+    assert snapshot.answer_selectors[2] is None
+    assert snapshot.choices_visible == [True, True, False]
+    assert snapshot.image_selector == "main img" and snapshot.image_rect["width"] == 400
+    assert snapshot.timer_text == "17"
+    assert snapshot.age < 1
+
+    empty = PageSnapshot.from_dict({"url": "https://kahoot.it/", "phase": "lobby"})
+    assert empty.choices == [] and empty.image_rect is None and not empty.buttons_visible
+
+
+def test_take_snapshot_is_one_call():
+    """The snapshot is one script call with the media selectors, failures give None"""
+    driver = FakeDriver(RAW_SNAPSHOT)
+    counter = RoundTripCounter(driver)
+    snapshot = take_snapshot(driver, ["main img"])
+    assert snapshot.choices[0] == "Paris"
+    assert driver.scripts == [(TAKE_SNAPSHOT_JS, (["main img"],))]
+    print(f"Snapshot cost: {counter.describe(counter.counts)}")
+    assert counter.total == 1
+
+    assert take_snapshot(FakeDriver(error=RuntimeError("no such window"))) is None
+
+
+def test_round_trip_counter():
+    """Every driver.execute is counted by command, reset returns and clears the counts"""
+    driver = FakeDriver()
+    counter = RoundTripCounter(driver)
+    for _ in range(3):
+        driver.execute("findElement", {"using": "css selector", "value": "h1"})
+    driver.execute("getElementText", {"id": "1"})
+    assert counter.total == 4
+
+    counts = counter.reset()
+    description = RoundTripCounter.describe(counts)
+    print(f"Counted: {description}")
+    assert counts["findElement"] == 3 and counts["getElementText"] == 1
+    assert description.startswith("4 round trips (findElement 3")
+    assert counter.total == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing DOM snapshot helper")
+    test_snapshot_parsing()
+    test_take_snapshot_is_one_call()
+    test_round_trip_counter()
+    print("✅ All DOM snapshot tests passed")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached driver path, startup timing and the warm browser pool
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from browser_profile_helper import build_chrome_options
+from driver_startup_helper import BrowserPool, DriverPathCache, StartupTimer, is_version_mismatch
+
+
+class FakeDriver:
+    def __init__(self, slot):
+        self.slot = slot
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _fake_driver_file(directory):
+    path = os.path.join(directory, "chromedriver")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def test_driver_path_cache():
+    """The resolved path is reused without the installer, and still used when the installer is offline"""
+    directory = tempfile.mkdtemp()
+    try:
+        driver_path = _fake_driver_file(directory)
+        cache_file = os.path.join(directory, "driver.json")
+        calls = []
+
+        def installer():
+            calls.append(1)
+            return driver_path
+
+        cache = DriverPathCache(cache_file, installer=installer)
+        assert cache.resolve() == (driver_path, "download")
+        assert cache.resolve() == (driver_path, "cache")
+        assert len(calls) == 1
+
+        def offline():
+            raise ConnectionError("no network")
+
+        # An expired entry is refreshed, and kept when that fails
+        with open(cache_file, "w") as f:
+            json.dump({"driver_path": driver_path, "resolved_at": 0}, f)
+        assert DriverPathCache(cache_file, installer=offline).resolve() == (driver_path, "offline cache")
+        assert DriverPathCache(cache_file, installer=installer).resolve() == (driver_path, "download")
+
+        # A deleted driver is not trusted
+        os.remove(driver_path)
+        path, source = DriverPathCache(cache_file, installer=offline).resolve()
+        print(f"Without a driver: {path} from {source}")
+        assert source in ("PATH", "selenium manager")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_version_mismatch():
+    """Only a driver/browser version mismatch is a reason to resolve the driver again"""
+    assert is_version_mismatch("session not created: This version of ChromeDriver only supports Chrome version 114\n"
+                               "Current browser version is 120.0.6099.109 with binary path /usr/bin/google-chrome")
+    assert not is_version_mismatch("session not created: probably user data directory is already in use, "
+                                   "please specify a unique value for --user-data-dir argument")
+    assert not is_version_mismatch("session not created: DevToolsActivePort file doesn't exist")
+    assert not is_version_mismatch(None)
+
+
+def test_startup_timer():
+    timer = StartupTimer()
+    with timer.phase("launch"):
+        time.sleep(0.05)
+    timer.record("join", 0.25)
+    report = timer.report()
+    print(f"Startup: {report}")
+    assert report.startswith("launch 0.05s, join 0.25s")
+    assert 0.3 <= timer.total() < 0.4
+
+
+def test_profile_directory_option():
+    options = build_chrome_options("default", user_data_dir="/tmp/kahoot-profile")
+    assert "--user-data-dir=/tmp/kahoot-profile" in options.arguments
+    assert not any(arg.startswith("--user-data-dir") for arg in build_chrome_options("default").arguments)
+
+
+def test_browser_pool():
+    """A warm browser is handed out at once, failures fall through and unused browsers are quit"""
+    launched = []
+
+    def factory(slot):
+        time.sleep(0.2)
+        driver = FakeDriver(slot)
+        launched.append(driver)
+        return driver
+
+    pool = BrowserPool(factory, size=2)
+    start = time.perf_counter()
+    first = pool.acquire(timeout=2)
+    print(f"First browser after {time.perf_counter() - start:.2f}s")
+    time.sleep(0.1)
+    start = time.perf_counter()
+    second = pool.acquire(timeout=2)
+    assert time.perf_counter() - start < 0.05  # Already warm
+    assert {first.slot, second.slot} == {0, 1}
+    assert pool.acquire(timeout=0.1) is None
+    pool.close()
+    assert not first.quit_called
+
+    # close() quits idle browsers and those still launching
+    pool = BrowserPool(factory, size=2)
+    time.sleep(0.3)
+    slow = BrowserPool(factory, size=1)
+    pool.close()
+    slow.close()
+    time.sleep(0.3)
+    assert all(driver.quit_called for driver in launched[2:])
+
+    def broken(slot):
+        raise RuntimeError("chrome failed to start")
+
+    start = time.perf_counter()
+    assert BrowserPool(broken, size=2).acquire(timeout=5) is None
+    assert time.perf_counter() - start < 1  # Gives up once every launch failed
+
+
+def test_browser_pool_refill():
+    slots = []
+    lock = threading.Lock()
+
+    def factory(slot):
+        with lock:
+            slots.append(slot)
+        return FakeDriver(slot)
+
+    pool = BrowserPool(factory, size=1, refill=True)
+    assert pool.acquire(timeout=1).slot == 0
+    assert pool.acquire(timeout=1).slot == 1
+    pool.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing driver startup")
+    test_driver_path_cache()
+    test_version_mismatch()
+    test_startup_timer()
+    test_profile_directory_option()
+    test_browser_pool()
+    test_browser_pool_refill()
+    print("✅ All driver startup tests passed")
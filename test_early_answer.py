@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for early answers prepared during the get-ready screen
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from early_answer_helper import EarlyAnswer
+from output_format.answer import AnswerData
+
+
+def _slow_answer(early, delay, options):
+    early.set_classification("logic", ["logic", "recent_events"])
+    time.sleep(delay)
+    return AnswerData(correct_options=options)
+
+
+def test_title_matching():
+    """The real question matches its get-ready title despite case, spacing and appended text"""
+    early = EarlyAnswer("What is the capital of France?")
+    assert early.matches("what is the capital of  france?")
+    assert early.matches("what is the capital of france?\n\ncode: print('paris')")
+    assert not early.matches("which planet is closest to the sun?")
+
+
+def test_background_answer():
+    """Classification is available before the answer, which is waited for up to a timeout"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        early = EarlyAnswer("What is the capital of France?")
+        early.future = executor.submit(_slow_answer, early, 0.3, ["paris"])
+
+        classification = early.classification(timeout=1)
+        print(f"Classification: {classification}")
+        assert classification == ("logic", ["logic", "recent_events"])
+        assert early.options(timeout=0) is None  # Still running
+
+        start = time.time()
+        options = early.options(timeout=2)
+        print(f"Options {options} after {time.time() - start:.2f}s")
+        assert options == ["paris"]
+
+
+def test_failures_and_cancel():
+    """A failed or cancelled early answer yields None instead of raising"""
+    def fail(early):
+        early.set_classification("logic", ["logic"])
+        raise RuntimeError("model unavailable")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        early = EarlyAnswer("Who wrote Hamlet?")
+        early.future = executor.submit(fail, early)
+        assert early.options(timeout=1) is None
+
+        blocker = executor.submit(time.sleep, 0.2)
+        queued = EarlyAnswer("Queued question")
+        queued.future = executor.submit(_slow_answer, queued, 0, ["x"])
+        queued.cancel()
+        blocker.result()
+        assert queued.cancel_event.is_set()
+        assert queued.options(timeout=0.5) is None
+        assert queued.classification(timeout=0) is None
+
+
+def test_prefetched_code():
+    """Finished code downloads are handed over, unfinished and failed ones are left out"""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        early = EarlyAnswer("What does https://pastebin.com/abc print?")
+        early.code_futures = {
+            "https://pastebin.com/abc": executor.submit(lambda: "print(1)"),
+            "https://slow.example/x": executor.submit(time.sleep, 0.5),
+            "https://broken.example/y": executor.submit(lambda: 1 / 0),
+        }
+        start = time.time()
+        results = early.prefetched_code(timeout=0.1)
+        print(f"Prefetched after {time.time() - start:.2f}s: {results}")
+        assert results == {"https://pastebin.com/abc": "print(1)"}
+        assert EarlyAnswer("No links").prefetched_code(timeout=1) == {}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing early answers")
+    test_title_matching()
+    test_background_answer()
+    test_failures_and_cancel()
+    test_prefetched_code()
+    print("✅ All early answer tests passed")
@@ -3,8 +3,39 @@
 Test script for encoding detection and decoding functionality
 """
 
-from encoding_helper import handle_encoded_question, detect_and_decode, extract_encoded_string
+from encoding_helper import handle_encoded_question, detect_and_decode, extract_encoded_string, search_decodings
 import base64
+import codecs
+import time
+
+PLAIN = "What is the capital of France?"
+
+
+def _b64(text):
+    return base64.b64encode(text.encode('utf-8')).decode('utf-8')
+
+
+def _caesar(text, shift):
+    return "".join(
+        chr((ord(ch) - base + shift) % 26 + base) if ch.isalpha() else ch
+        for ch in text for base in [ord('a') if ch.islower() else ord('A')]
+    )
+
+
+# (encoded text, expected chain of decodings)
+LAYERED = [
+    (codecs.encode(PLAIN, 'rot13'), "rot13"),
+    (_caesar(PLAIN, 3), "caesar"),
+    (PLAIN.translate(str.maketrans("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+                                   "zyxwvutsrqponmlkjihgfedcbaZYXWVUTSRQPONMLKJIHGFEDCBA")), "atbash"),
+    (PLAIN[::-1], "reverse"),
+    (base64.b32encode(PLAIN.encode()).decode(), "base32"),
+    (" ".join(f"{b:08b}" for b in PLAIN.encode()), "binary"),
+    (_b64(_b64(PLAIN)), "base64+base64"),
+    (_b64(codecs.encode(PLAIN, 'rot13')), "base64+rot13"),
+    (_b64(PLAIN).encode().hex(), "hex+base64"),
+    (_b64(PLAIN)[::-1], "reverse+base64"),
+]
 
 def test_base64_encoding():
     """Test Base64 encoding detection and decoding"""
@@ -70,11 +101,69 @@ def test_manual_base64():
     
     print("✅ Manual Base64 test completed\n")
 
+def test_layered_encodings():
+    """Test chained encodings and letter ciphers"""
+    print("🧪 Testing layered encodings...")
+
+    for encoded, expected_type in LAYERED:
+        decoded, enc_type = detect_and_decode(encoded)
+        assert decoded == PLAIN, (encoded, decoded)
+        assert enc_type == expected_type, (encoded, enc_type)
+
+    # Plain text and noise are left alone
+    assert detect_and_decode(PLAIN) == (PLAIN, "none")
+    assert detect_and_decode("xq7Zk9Lm2Pq") == ("xq7Zk9Lm2Pq", "none")
+    # Stacked letter ciphers used to turn noise into English-looking text
+    assert detect_and_decode("xqxwxbsa qvqdmlflh") == ("xqxwxbsa qvqdmlflh", "none")
+    # Base64 in a chain used to accept bytes that merely happen to be valid UTF-8, like "a:ނCtr"
+    assert detect_and_decode("poiuytrewq") == ("poiuytrewq", "none")
+    assert detect_and_decode(_b64("\u0782\u0783 ab\u0784")) == (_b64("\u0782\u0783 ab\u0784"), "none")
+    for encoded, _ in LAYERED:
+        _, chain, _ = search_decodings(encoded)
+        assert not any(a == b and a not in ("base64", "base32", "hex") for a, b in zip(chain, chain[1:])), chain
+
+    print("✅ Layered encodings test completed\n")
+
+
+def test_scans_every_candidate():
+    """Test that the encoded part is found wherever it is in the question"""
+    print("🧪 Testing candidate scan...")
+
+    question = f"This was encoded twice: {_b64(_b64(PLAIN))} - answer it"
+    assert handle_encoded_question(question) == (PLAIN, "base64+base64")
+
+    question = "Binary question " + " ".join(f"{b:08b}" for b in b"Who wrote Hamlet?") + " pick one"
+    assert handle_encoded_question(question) == ("Who wrote Hamlet?", "binary")
+
+    question = f'Decode this message: {codecs.encode(PLAIN, "rot13")}'
+    assert handle_encoded_question(question) == (PLAIN, "rot13")
+
+    print("✅ Candidate scan test completed\n")
+
+
+def test_decoding_speed():
+    """Test that the search stays within a few milliseconds"""
+    print("🧪 Benchmarking decoding search...")
+
+    start_time = time.perf_counter()
+    for encoded, _ in LAYERED:
+        search_decodings(encoded)
+    per_text_ms = (time.perf_counter() - start_time) * 1000 / len(LAYERED)
+
+    print(f"Average: {per_text_ms:.2f}ms per encoded text")
+    assert per_text_ms < 10
+
+    print("✅ Decoding speed test completed\n")
+
+
 if __name__ == "__main__":
     print("🔐 Testing Encoding/Decoding Functionality\n")
     
     test_base64_encoding()
     test_other_encodings()
     test_manual_base64()
+    test_layered_encodings()
+    test_scans_every_candidate()
+    test_decoding_speed()
     
     print("🎉 All encoding tests completed!") 
\ No newline at end of file
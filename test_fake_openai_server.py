@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the OpenAI-compatible stand-in server
+"""
+
+import json
+import os
+import random
+import time
+
+import numpy as np
+import openai
+
+from fake_openai_server import FakeOpenAIServer, parse_latency
+from llm_helper import chat_model, openai_client
+from stream_helper import parse_streamed_answer
+
+PROMPT = "You answer quiz questions.\nQuestion: What is the capital of France?\nChoices:\n- berlin\n- paris\n- rome"
+
+
+def test_latency_distributions():
+    """Latency specs sample from the named distribution"""
+    print("🧪 Testing latency distributions...")
+
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.5")(rng) == 0.5
+    samples = [parse_latency("uniform:0.2,0.4")(rng) for _ in range(200)]
+    assert 0.2 <= min(samples) and max(samples) <= 0.4
+    samples = [parse_latency("lognormal:-1,0.5")(rng) for _ in range(2000)]
+    assert abs(np.median(samples) - np.exp(-1)) < 0.05
+
+    print("✅ Latency distributions test completed\n")
+
+
+def test_chat_and_embeddings():
+    """The LangChain and OpenAI clients talk to the server through LLM_BASE_URL"""
+    print("🧪 Testing chat, streaming and embeddings...")
+
+    script = [{"match": "capital of france", "choice": 1}]
+    with FakeOpenAIServer(latency="fixed:0.05", script=script) as server:
+        os.environ["LLM_BASE_URL"] = server.base_url
+        try:
+            llm = chat_model()
+
+            start_time = time.time()
+            response = llm.invoke(PROMPT)
+            assert json.loads(response.content) == {"correct_options": ["paris"]}
+            assert response.usage_metadata["input_tokens"] > 0
+            assert time.time() - start_time >= 0.05
+
+            options = parse_streamed_answer(chunk.content for chunk in llm.stream(PROMPT))
+            assert options == ["paris"]
+
+            client = openai_client()
+            embedding = client.embeddings.create(model="text-embedding-3-large", input=["hello"])
+            vector = np.array(embedding.data[0].embedding)
+            assert vector.shape == (3072,) and abs(np.linalg.norm(vector) - 1) < 1e-5
+
+            # Same text, same vector
+            again = client.embeddings.create(model="text-embedding-3-large", input=["hello"])
+            assert again.data[0].embedding == embedding.data[0].embedding
+
+            print(f"Requests served: {server.stats}")
+            assert server.stats["chat"] == 1 and server.stats["stream"] == 1 and server.stats["embeddings"] == 2
+        finally:
+            del os.environ["LLM_BASE_URL"]
+
+    print("✅ Chat and embeddings test completed\n")
+
+
+def test_error_injection():
+    """Injected errors reach the client as API errors"""
+    print("🧪 Testing error injection...")
+
+    with FakeOpenAIServer(error_rate=1.0, error_status=503) as server:
+        os.environ["LLM_BASE_URL"] = server.base_url
+        try:
+            client = openai_client(max_retries=0)
+            try:
+                client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}])
+                assert False, "the request should fail"
+            except openai.APIStatusError as e:
+                assert e.status_code == 503
+        finally:
+            del os.environ["LLM_BASE_URL"]
+
+    print("✅ Error injection test completed\n")
+
+
+if __name__ == "__main__":
+    print("🤖 Testing Fake OpenAI Server\n")
+
+    test_latency_distributions()
+    test_chat_and_embeddings()
+    test_error_injection()
+
+    print("🎉 All fake server tests completed!")
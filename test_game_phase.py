@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the game phase state machine
+"""
+
+from game_phase_helper import GamePhase, GameStateMachine, question_hash
+
+
+def test_signal_mapping():
+    """Snapshot phases map onto game phases"""
+    assert GamePhase.from_signal("finished") == GamePhase.PODIUM
+    assert GamePhase.from_signal("get_ready") == GamePhase.GET_READY
+    assert GamePhase.from_signal("other") == GamePhase.UNKNOWN
+    assert GamePhase.from_signal("nonsense") == GamePhase.UNKNOWN
+
+
+def test_question_claimed_once():
+    """Repeated observations of the same question allow exactly one claim"""
+    state = GameStateMachine()
+    state.observe(GamePhase.LOBBY, at=0.0)
+    state.observe(GamePhase.GET_READY, "What is 2 + 2?", at=1.0)
+    assert state.observe(GamePhase.QUESTION, "What is 2 + 2?", at=6.0)
+    # Choices render after the title: same question, hash now covers them
+    assert not state.observe(GamePhase.QUESTION, "What is  2 + 2? ", ["3", "4"], at=6.2)
+    assert state.question_hash == question_hash("what is 2 + 2?", ["3", "4"])
+
+    assert state.claim_question()
+    assert not state.claim_question()
+    state.mark_answered(at=8.0)
+    assert state.phase == GamePhase.ANSWERED
+    assert not state.observe(GamePhase.QUESTION, "What is 2 + 2?", ["3", "4"], at=8.5)
+    assert not state.claim_question()
+
+    # Unknown pages do not move the machine
+    assert not state.observe(GamePhase.UNKNOWN, at=9.0)
+    assert state.phase == GamePhase.ANSWERED
+    print(f"Transitions: {[(t['from'], t['to']) for t in state.transitions]}")
+
+
+def test_repeated_question_after_result():
+    """The same question coming back after a result screen counts as a new question"""
+    state = GameStateMachine()
+    state.observe(GamePhase.QUESTION, "Pick the odd one", ["a", "b"], at=0.0)
+    assert state.claim_question()
+    state.mark_answered(at=1.0)
+    state.observe(GamePhase.RESULT, at=2.0)
+    assert state.observe(GamePhase.QUESTION, "Pick the odd one", ["a", "b"], at=5.0)
+    assert state.claim_question()
+
+    # A different title while answered is a new question too
+    state.mark_answered(at=6.0)
+    assert state.observe(GamePhase.QUESTION, "Pick the even one", at=7.0)
+    assert state.claim_question()
+
+
+def test_latencies_and_finish():
+    """Transitions are timestamped for get-ready and answer latencies"""
+    state = GameStateMachine()
+    for start in (0.0, 20.0):
+        state.observe(GamePhase.GET_READY, at=start)
+        state.observe(GamePhase.QUESTION, f"Question at {start}", at=start + 5.0)
+        state.claim_question()
+        state.mark_answered(at=start + 7.5)
+        state.observe(GamePhase.RESULT, at=start + 15.0)
+    state.observe(GamePhase.PODIUM, at=40.0)
+
+    latencies = state.latencies()
+    print(f"Latencies: {latencies}, summary: {state.summary()}")
+    assert latencies["ready_to_question"] == [5.0, 5.0]
+    assert latencies["question_to_answer"] == [2.5, 2.5]
+    assert state.finished
+    assert state.summary().startswith("2 questions")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing game phase state machine")
+    test_signal_mapping()
+    test_question_claimed_once()
+    test_repeated_question_after_result()
+    test_latencies_and_finish()
+    print("✅ All game phase tests passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged model requests
+"""
+
+import threading
+import time
+
+from hedge_helper import HedgedCaller
+
+
+def _caller(delay=0.1):
+    # A fixed trigger: too few samples for the percentile to take over
+    return HedgedCaller(default_delay=delay, min_samples=1000)
+
+
+def test_no_hedge_before_delay():
+    """A request answering within the delay is never duplicated"""
+    caller = _caller(0.2)
+    calls = []
+
+    def request(cancel_event):
+        calls.append(1)
+        time.sleep(0.05)
+        return "fast"
+
+    assert caller.call(request) == "fast"
+    assert len(calls) == 1 and caller.hedges == 0 and caller.primary_wins == 0
+    caller.shutdown()
+
+
+def test_hedge_fires_after_delay_and_first_result_wins():
+    """A slow primary gets a copy after the delay, the faster copy wins and the other is cancelled"""
+    caller = _caller(0.1)
+    started = []
+    cancels = {}
+
+    def request(cancel_event):
+        index = len(started)
+        started.append(time.time())
+        cancels[index] = cancel_event
+        if index == 0:
+            # The primary hangs until it is told to stop
+            end = time.time() + 2
+            while time.time() < end and not cancel_event.is_set():
+                time.sleep(0.01)
+            return "primary"
+        return "hedge"
+
+    start = time.time()
+    assert caller.call(request) == "hedge"
+    assert started[1] - start >= 0.1  # Not before the delay
+    assert time.time() - start < 0.5
+    assert caller.hedges == 1 and caller.hedge_wins == 1
+    assert cancels[0].is_set() and not cancels[1].is_set()
+    caller.shutdown()
+
+
+def test_hedge_cap():
+    """Hedges stay within 10% of calls plus one"""
+    caller = _caller(0.02)
+
+    def slow(cancel_event):
+        time.sleep(0.05)
+        return "ok"
+
+    for _ in range(5):
+        assert caller.call(slow) == "ok"
+    print(caller.summary())
+    assert caller.calls == 5
+    assert caller.hedges == 2  # 0 < 1.1, 1 < 1.2, then 2 >= 1.3
+    assert caller.capped == 3
+    caller.shutdown()
+
+
+def test_failed_copy_does_not_lose_result():
+    """An exception in one copy still returns the other copy's result, and both failing raises"""
+    caller = _caller(0.05)
+    lock = threading.Lock()
+    count = []
+
+    def primary_fails(cancel_event):
+        with lock:
+            index = len(count)
+            count.append(1)
+        time.sleep(0.1)
+        if index == 0:
+            raise RuntimeError("connection reset")
+        time.sleep(0.1)
+        return "hedge result"
+
+    assert caller.call(primary_fails) == "hedge result"
+
+    count.clear()
+    caller.hedges = 0  # Reset the cap so every call below is hedged
+
+    def hedge_fails(cancel_event):
+        with lock:
+            index = len(count)
+            count.append(1)
+        if index == 1:
+            raise RuntimeError("rate limited")
+        time.sleep(0.2)
+        return "primary result"
+
+    assert caller.call(hedge_fails) == "primary result"
+    assert caller.hedges == 1
+
+    def always_fails(cancel_event):
+        time.sleep(0.1)
+        raise ValueError("bad request")
+
+    caller.hedges = 0
+    try:
+        caller.call(always_fails)
+        assert False, "Expected the error of both copies"
+    except ValueError:
+        pass
+    caller.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing hedged requests")
+    test_no_hedge_before_delay()
+    test_hedge_fires_after_delay_and_first_result_wins()
+    test_hedge_cap()
+    test_failed_copy_does_not_lose_result()
+    print("✅ All hedge tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the perceptual-hash answer cache for image questions
+"""
+
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from image_helper import PIL_AVAILABLE
+from image_cache_helper import ImageAnswerCache, image_hashes, hash_distance
+
+
+def _encode(pixels, image_format="PNG", size=None):
+    from PIL import Image
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    if size:
+        image = image.resize(size)
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+    return output.getvalue()
+
+
+def _scene(seed):
+    """A random blocky picture, like a flag or logo"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, size=(6, 8, 3))
+    return np.kron(blocks, np.ones((80, 80, 1)))
+
+
+def test_hashes_survive_recompression():
+    """Resized, recompressed and brightened copies stay close, other images do not"""
+    print("🧪 Testing perceptual hashes...")
+    if not PIL_AVAILABLE:
+        print("Pillow not installed, skipping")
+        return
+
+    original = image_hashes(_encode(_scene(1)))
+    variants = {
+        "jpeg": _encode(_scene(1), "JPEG"),
+        "resized": _encode(_scene(1), size=(320, 240)),
+        "brighter": _encode(_scene(1) + 20),
+    }
+    for name, data in variants.items():
+        distance = hash_distance(original, image_hashes(data))
+        print(f"{name}: distance {distance}")
+        assert distance <= 24, name
+
+    distance = hash_distance(original, image_hashes(_encode(_scene(2))))
+    print(f"different image: distance {distance}")
+    assert distance > 24
+
+    print("✅ Perceptual hash test completed\n")
+
+
+def test_persistent_cache():
+    """Answers are found again by a new cache instance, keyed by image and question text"""
+    print("🧪 Testing persistent image cache...")
+    if not PIL_AVAILABLE:
+        print("Pillow not installed, skipping")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.json")
+        cache = ImageAnswerCache(path)
+        question = "Which country's flag is this?"
+        cache.store(image_hashes(_encode(_scene(1))), question, ["france"])
+
+        cache = ImageAnswerCache(path)
+        assert cache.lookup(image_hashes(_encode(_scene(1), "JPEG")), question.upper()) == ["france"]
+        assert cache.lookup(image_hashes(_encode(_scene(2))), question) is None
+        assert cache.lookup(image_hashes(_encode(_scene(1))), "What animal is this?") is None
+        print(cache.summary())
+        assert cache.hits == 1 and cache.misses == 2
+
+    print("✅ Persistent cache test completed\n")
+
+
+if __name__ == "__main__":
+    print("🗂️ Testing Image Answer Cache\n")
+
+    test_hashes_survive_recompression()
+    test_persistent_cache()
+
+    print("🎉 All image cache tests completed!")
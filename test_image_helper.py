@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for preparing question images for the vision model
+"""
+
+import base64
+import struct
+import zlib
+
+from image_helper import compress_image, to_data_url, PIL_AVAILABLE
+
+
+def _make_png(width, height):
+    """Build an RGB gradient PNG without Pillow"""
+    rows = b"".join(
+        b"\x00" + bytes(channel for x in range(width) for channel in (x % 256, y % 256, (x * y) % 256))
+        for y in range(height)
+    )
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def test_data_url():
+    """Images are embedded with their MIME type"""
+    print("🧪 Testing data URL...")
+
+    url = to_data_url(b"abc", "image/jpeg")
+    assert url == "data:image/jpeg;base64," + base64.b64encode(b"abc").decode()
+
+    print("✅ Data URL test completed\n")
+
+
+def test_compress_image():
+    """Large screenshots are downscaled and re-encoded, or passed through without Pillow"""
+    print("🧪 Testing image compression...")
+
+    png = _make_png(1600, 900)
+    compressed, mime_type = compress_image(png, max_side=512, image_format="jpeg", quality=70)
+    print(f"PNG {len(png)} bytes -> {len(compressed)} bytes ({mime_type})")
+
+    if PIL_AVAILABLE:
+        from PIL import Image
+        import io
+        image = Image.open(io.BytesIO(compressed))
+        assert mime_type == "image/jpeg"
+        assert max(image.size) == 512
+        assert len(compressed) < len(png)
+    else:
+        print("Pillow not installed, image is sent unchanged")
+        assert (compressed, mime_type) == (png, "image/png")
+
+    print("✅ Compression test completed\n")
+
+
+if __name__ == "__main__":
+    print("🖼️ Testing Image Helper\n")
+
+    test_data_url()
+    test_compress_image()
+
+    print("🎉 All image tests completed!")
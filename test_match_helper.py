@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for matching LLM answers to the visible choices
+"""
+
+import time
+
+from match_helper import ChoiceMatcher, normalize_answer
+
+# (choices, [(answer, expected position or None)])
+CASES = [
+    (["Option 1: Paris", "Option 2: London", "Option 3: Berlin", "Option 4: Madrid"],
+     [("paris", 0), ("Paris, France", 0), ("the city of Paris", 0), ("londn", 1), ("Rome", None)]),
+    (["Option 1: 12", "Option 2: 13", "Option 3: 21", "Option 4: 1,000"],
+     [("12", 0), ("twelve", 0), ("1000", 3), ("twenty-one", 2), ("21.0", 2), ("14", None)]),
+    (["Option 1: 10 km", "Option 2: 100 km", "Option 3: 1 km"],
+     [("10 kilometers", 0), ("100km", 1)]),
+    (["Option 1: George Washington", "Option 2: Abraham Lincoln", "Option 3: Thomas Jefferson"],
+     [("washington", 0), ("Lincoln, Abraham", 1), ("Thomas Jeferson", 2)]),
+    (["Option 1: True", "Option 2: False"],
+     [("TRUE", 0), ("false.", 1), ("yes", None)]),
+]
+
+
+def test_normalization():
+    """Punctuation, numbers, units and option labels are normalized"""
+    print("🧪 Testing normalization...")
+
+    cases = {
+        "Option 1: The Eiffel Tower!": "eiffel tower",
+        "10km": "10 kilometers",
+        "10 kilometres": "10 kilometers",
+        "1,000": "1000",
+        "3.50": "3.5",
+        "twenty-one": "21",
+        "50%": "50 percent",
+        "Café": "cafe",
+        "In 1990": "in 1990",
+    }
+    for text, expected in cases.items():
+        assert normalize_answer(text) == expected, (text, normalize_answer(text))
+
+    print("✅ Normalization test completed\n")
+
+
+def test_matching():
+    """Answers worded differently from the choices still find the right position"""
+    print("🧪 Testing answer matching...")
+
+    for choices, answers in CASES:
+        matcher = ChoiceMatcher(choices)
+        for answer, expected in answers:
+            position, confidence = matcher.match(answer)
+            print(f"{answer!r} -> {position} (confidence {confidence:.2f})")
+            assert position == expected, (answer, position)
+
+    print("✅ Matching test completed\n")
+
+
+def test_negation():
+    """A negated answer never matches the plain choice, and the other way round"""
+    assert ChoiceMatcher(["True", "False"]).match("not true")[0] == 1
+    assert ChoiceMatcher(["True", "False"]).match("Not false")[0] == 0
+    assert ChoiceMatcher(["Paris", "Not Paris"]).match("not paris")[0] == 1
+    assert ChoiceMatcher(["Paris", "Not Paris"]).match("paris")[0] == 0
+    assert ChoiceMatcher(["It is allowed", "It is never allowed"]).match("allowed")[0] == 0
+    assert ChoiceMatcher(["Yes", "It isn't"]).match("it is")[0] is None
+    # Only the negated choice, the plain answer does not fall back to it
+    assert ChoiceMatcher(["Not a mammal", "A fish"]).match("mammal")[0] is None
+
+
+def test_matching_speed():
+    """Matching is fast enough to run before every click"""
+    print("🧪 Benchmarking matcher...")
+
+    rounds = 100
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for choices, answers in CASES:
+            matcher = ChoiceMatcher(choices)
+            for answer, _ in answers:
+                matcher.match(answer)
+    per_round_ms = (time.perf_counter() - start_time) * 1000 / rounds
+
+    print(f"Average: {per_round_ms:.3f}ms for all cases")
+    assert per_round_ms < 5
+
+    print("✅ Benchmark completed\n")
+
+
+if __name__ == "__main__":
+    print("🎯 Testing Answer Matcher\n")
+
+    test_normalization()
+    test_matching()
+    test_negation()
+    test_matching_speed()
+
+    print("🎉 All matcher tests completed!")
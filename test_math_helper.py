@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded expression evaluator
+"""
+
+import time
+
+from math_helper import eval_expr, format_number, MathLimitError
+
+
+def test_exact_arithmetic():
+    """Decimal inputs give the answers written in the choices"""
+    print("🧪 Testing exact arithmetic...")
+
+    cases = {
+        "0.1 + 0.2": "0.3",
+        "10 / 4": "2.5",
+        "1 / 3": "0.3333333333",
+        "6 / 3": "2",
+        "2 ** -2": "0.25",
+        "7 // 2": "3",
+        "-5 % 3": "1",
+        "144 ** 0.5": "12",
+    }
+    for expr, expected in cases.items():
+        result = format_number(eval_expr(expr))
+        print(f"{expr} = {result}")
+        assert result == expected, (expr, result)
+
+    print("✅ Exact arithmetic test completed\n")
+
+
+def test_whitelisted_functions():
+    """Only the whitelisted functions can be called"""
+    print("🧪 Testing functions...")
+
+    cases = {
+        "sqrt(81)": "9",
+        "sqrt(2)": "1.4142135624",
+        "cbrt(-27)": "-3",
+        "factorial(5)": "120",
+        "gcd(12, 18)": "6",
+        "lcm(4, 6)": "12",
+        "abs(-3)": "3",
+        "round(2.567, 2)": "2.57",
+        "max(1, 5, 3)": "5",
+    }
+    for expr, expected in cases.items():
+        assert format_number(eval_expr(expr)) == expected, expr
+
+    for expr in ["__import__('os')", "open('x')", "(1).__class__", "'a' * 3"]:
+        try:
+            eval_expr(expr)
+            assert False, f"{expr} should be rejected"
+        except (TypeError, ValueError, SyntaxError):
+            pass
+
+    print("✅ Functions test completed\n")
+
+
+def test_resource_limits():
+    """Huge powers and factorials fail fast instead of blocking the game loop"""
+    print("🧪 Testing resource limits...")
+
+    for expr in ["9**9**9", "10**5000", "2**-100000", "factorial(100000)", "(10**1000) * (10**1000) * (10**1000)"]:
+        start_time = time.perf_counter()
+        try:
+            eval_expr(expr)
+            assert False, f"{expr} should exceed the limits"
+        except MathLimitError as e:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"{expr}: {e} ({elapsed_ms:.2f}ms)")
+            assert elapsed_ms < 100
+
+    # Results that fit the limit exactly are still computed
+    assert eval_expr("2**3000") == 2 ** 3000
+    assert eval_expr("2**4095") == 2 ** 4095
+    for expr in ["2**4096", "3**2585"]:
+        try:
+            eval_expr(expr)
+            assert False, f"{expr} should exceed the limits"
+        except MathLimitError:
+            pass
+
+    print("✅ Resource limits test completed\n")
+
+
+if __name__ == "__main__":
+    print("🧮 Testing Bounded Evaluator\n")
+
+    test_exact_arithmetic()
+    test_whitelisted_functions()
+    test_resource_limits()
+
+    print("🎉 All evaluator tests completed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM call metrics
+"""
+
+import os
+import tempfile
+import time
+import urllib.request
+from types import SimpleNamespace
+
+from metrics_helper import LLMMetrics, NOOP_CALL, estimate_cost
+
+
+def test_records_calls():
+    """Latency, time to first token, tokens, retries and cost are recorded per call site"""
+    print("🧪 Testing call recording...")
+
+    metrics = LLMMetrics()
+
+    # LangChain message
+    with metrics.track("classify") as call:
+        call.record_response(SimpleNamespace(usage_metadata={"input_tokens": 100, "output_tokens": 5}))
+
+    # OpenAI embeddings response
+    with metrics.track("embedding", "text-embedding-3-large") as call:
+        call.record_response(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=20)))
+
+    # Streamed call that fails after the first token
+    try:
+        with metrics.track("answer_stream") as call:
+            time.sleep(0.01)
+            call.first_token()
+            call.retry()
+            raise TimeoutError("stream stalled")
+    except TimeoutError:
+        pass
+
+    classify = metrics.sites[("classify", "gpt-4o-mini")]
+    assert classify.calls == 1 and classify.prompt_tokens == 100 and classify.completion_tokens == 5
+    assert abs(classify.cost - estimate_cost("gpt-4o-mini", 100, 5)) < 1e-12
+
+    assert metrics.sites[("embedding", "text-embedding-3-large")].prompt_tokens == 20
+
+    stream = metrics.sites[("answer_stream", "gpt-4o-mini")]
+    assert stream.errors == 1 and stream.retries == 1 and stream.ttft_count == 1
+    assert stream.recent_ttfts[0] >= 0.01
+
+    print(metrics.summary())
+    print("✅ Call recording test completed\n")
+
+
+def test_prometheus_output():
+    """Metrics are exported as Prometheus text, to a file and over HTTP"""
+    print("🧪 Testing Prometheus export...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "kahoot.prom")
+        metrics = LLMMetrics(textfile=path)
+        metrics.start_http_server(0)
+        try:
+            with metrics.track("vision") as call:
+                call.add_usage(1000, 10)
+            metrics.add_retries("answer", 2)
+
+            text = metrics.render_prometheus()
+            assert 'kahoot_llm_calls_total{site="vision",model="gpt-4o-mini"} 1' in text
+            assert 'kahoot_llm_tokens_total{site="vision",model="gpt-4o-mini",kind="prompt"} 1000' in text
+            assert 'kahoot_llm_latency_seconds_bucket{site="vision",model="gpt-4o-mini",le="+Inf"} 1' in text
+            assert 'kahoot_llm_retries_total{site="answer",model="gpt-4o-mini"} 2' in text
+
+            with open(path, "r", encoding="utf-8") as f:
+                assert "kahoot_llm_calls_total" in f.read()
+
+            port = metrics.server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                assert "kahoot_llm_cost_usd_total" in response.read().decode("utf-8")
+        finally:
+            metrics.shutdown()
+
+    print("✅ Prometheus export test completed\n")
+
+
+def test_disabled_overhead():
+    """A disabled metrics object records nothing and costs next to nothing"""
+    print("🧪 Testing disabled metrics...")
+
+    metrics = LLMMetrics(enabled=False)
+    assert metrics.track("classify") is NOOP_CALL
+
+    rounds = 100000
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        with metrics.track("classify") as call:
+            call.add_usage(1, 1)
+    per_call_us = (time.perf_counter() - start_time) * 1e6 / rounds
+
+    print(f"Disabled overhead: {per_call_us:.2f}µs per call")
+    assert not metrics.sites
+    assert per_call_us < 5
+
+    print("✅ Disabled metrics test completed\n")
+
+
+if __name__ == "__main__":
+    print("📊 Testing LLM Metrics\n")
+
+    test_records_calls()
+    test_prometheus_output()
+    test_disabled_overhead()
+
+    print("🎉 All metrics tests completed!")
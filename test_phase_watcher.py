@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the page-side phase watcher, using a stand-in driver
+"""
+
+import shutil
+import subprocess
+import time
+
+from phase_watcher_helper import MAX_FAILURES, PHASE_OBSERVER_JS, WAIT_FOR_PHASE_JS, PhaseWatcher
+
+
+class FakeDriver:
+    """Returns scripted results from execute_async_script, raising the exceptions in the list"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+        self.script_timeout = None
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def execute_script(self, script, *args):
+        self.calls.append(("sync", script, args))
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(("async", script, args))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_wait_returns_events():
+    """Events come back as-is, timeouts are passed in milliseconds and capped by the slice"""
+    now = time.time() * 1000
+    event = {"phase": "question", "title": "What is 2 + 2?", "t": now - 30}
+    driver = FakeDriver([[event], None])
+    watcher = PhaseWatcher(driver, slice_seconds=5)
+
+    events = watcher.wait_for(("question",), 60)
+    print(f"Events: {events}, lag {watcher.lag_ms(events[-1]):.0f}ms")
+    assert events == [event]
+    assert driver.calls[0][1] == WAIT_FOR_PHASE_JS
+    assert driver.calls[0][2] == (["question"], 5000)
+    assert driver.script_timeout > 5
+    assert 30 <= watcher.lag_ms(events[-1]) < 1000
+
+    # A timeout with nothing queued is an empty list, not a failure
+    assert watcher.wait_for(("question",), 1) == []
+    assert watcher.available
+
+
+def test_failures_disable_watcher():
+    """Consecutive script failures make the watcher unavailable, a success resets the count"""
+    driver = FakeDriver([RuntimeError("document unloaded"), [], *[RuntimeError("boom")] * MAX_FAILURES])
+    watcher = PhaseWatcher(driver)
+    assert watcher.wait_for(("question",), 1) is None
+    assert watcher.wait_for(("question",), 1) == []
+    for _ in range(MAX_FAILURES):
+        assert watcher.available
+        assert watcher.wait_for(("question",), 1) is None
+    print(f"Available after {MAX_FAILURES} failures: {watcher.available}")
+    assert not watcher.available
+
+
+def test_scripts_are_idempotent():
+    """Both scripts only install the observer when it is missing"""
+    assert "if (!window.__kahootPhase)" in PHASE_OBSERVER_JS
+    assert PHASE_OBSERVER_JS.strip().startswith("if (!window.__kahootSnapshot)")
+    assert WAIT_FOR_PHASE_JS.startswith(PHASE_OBSERVER_JS)
+    driver = FakeDriver([])
+    assert PhaseWatcher(driver).install()
+    assert driver.calls[0][1] == PHASE_OBSERVER_JS
+
+
+# Minimal page for node: one element that is present or not, and a counting __kahootSnapshot
+OBSERVER_HARNESS = r"""
+let observe = null, present = false, snapshots = 0;
+const el = {className: 'answer', hidden: false, getAttribute: () => null, textContent: 'Q1'};
+global.window = global;
+global.location = {href: 'https://kahoot.it/gameblock'};
+global.history = {pushState() {}, replaceState() {}};
+global.addEventListener = () => {};
+global.document = {documentElement: {}, querySelector: () => (present ? el : null),
+                   querySelectorAll: () => (present ? [el] : [])};
+global.MutationObserver = class { constructor(callback) { observe = callback; } observe() {} };
+window.__kahootSnapshot = () => {
+    snapshots++;
+    return {phase: present ? 'question' : 'other', title: el.textContent, choices: []};
+};
+"""
+
+OBSERVER_STEPS = r"""
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+const mutate = async times => { for (let i = 0; i < times; i++) { observe(); await sleep(20); } };
+(async () => {
+    const counts = [];
+    await mutate(10);
+    counts.push(snapshots);
+    present = true;
+    await mutate(10);
+    counts.push(snapshots);
+    el.textContent = 'Q2';
+    await mutate(1);
+    counts.push(snapshots, window.__kahootPhase.queue.length);
+    console.log(JSON.stringify(counts));
+})();
+"""
+
+
+def test_full_snapshot_only_on_signature_change():
+    """Mutations that leave the phase signature alone do not take a full snapshot"""
+    node = shutil.which("node")
+    if not node:
+        print("node not installed, skipping")
+        return
+    script = OBSERVER_HARNESS + PHASE_OBSERVER_JS + OBSERVER_STEPS
+    output = subprocess.run([node, "-e", script], capture_output=True, text=True, timeout=30)
+    print(f"Snapshots after noise, question, new title, queued events: {output.stdout.strip()}")
+    assert output.returncode == 0, output.stderr
+    # One snapshot at install, one when the answer buttons appear, one for the new title
+    assert output.stdout.strip() == "[1,2,3,3]"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing phase watcher")
+    test_wait_returns_events()
+    test_failures_disable_watcher()
+    test_scripts_are_idempotent()
+    test_full_snapshot_only_on_signature_change()
+    print("✅ All phase watcher tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact prompts and prompt token accounting
+"""
+
+from output_format.question import COMPACT_PREFIX, Question
+from prompt_helper import PromptStats, count_tokens
+
+
+def _question(**overrides):
+    fields = dict(question_text="Which Planet is closest to the Sun?",
+                  choices=["Option 1: Mercury", "Option 2: Venus", "Option 3: Mars"],
+                  answer=[], is_multiple_choice=False, question_type="logic")
+    fields.update(overrides)
+    return Question(**fields)
+
+
+def test_compact_prompt_keeps_question_choices_and_format():
+    """The static prefix comes first, the question and every choice text follow in lowercase"""
+    prompt = _question().get_compact_prompt()
+    print(prompt)
+    assert prompt.startswith(COMPACT_PREFIX)
+    assert '{"correct_options"' in prompt and "lowercase" in prompt
+    assert "Question: which planet is closest to the sun?" in prompt
+    for choice in ["- mercury", "- venus", "- mars"]:
+        assert choice in prompt
+    assert "option 1" not in prompt.lower().split("question:")[1]
+    assert "Select the one best choice." in prompt
+
+    multiple = _question(is_multiple_choice=True).get_compact_prompt()
+    assert "Select all correct choices." in multiple
+    assert "answer in a few words" in _question(choices=[]).get_compact_prompt()
+
+
+def test_compact_prompt_type_specifics():
+    """Encoded questions show the decoded text, math asks for an expression without choices"""
+    encoded = _question(question_type="encoded", question_text="V2hpY2g=", decoded_text="Which planet?")
+    prompt = encoded.get_compact_prompt()
+    # The original stays next to the decoding, in case the decoding is wrong
+    assert "Original question: v2hpy2g=" in prompt and "Decoded question: which planet?" in prompt
+
+    math = _question(question_type="math", question_text="What is 2 plus 3?", choices=["5", "6"])
+    prompt = math.get_compact_prompt()
+    assert "arithmetic expression" in prompt and "Choices:" not in prompt
+
+    # Every type keeps the JSON-only reply, nothing is written before correct_options
+    logic = _question().get_compact_prompt("logic")
+    assert "JSON only" in logic and "step by step" not in logic
+
+    # A strategy type overrides the question's own type
+    assert "Answer directly" in _question().get_compact_prompt("direct")
+
+
+def test_compact_prompt_is_shorter():
+    question = _question()
+    compact = count_tokens(question.get_compact_prompt())
+    legacy = count_tokens(question.get_question_prompt())
+    print(f"Compact {compact} tokens, legacy {legacy} tokens")
+    assert compact < legacy
+
+
+def test_prompt_stats():
+    """Totals, savings against the legacy templates and per-style latencies"""
+    stats = PromptStats()
+    assert stats.report() == "No prompts recorded"
+    stats.record("compact", 100, 300, 1.0)
+    stats.record("compact", 50, 100, 2.0)
+    stats.record("legacy", 200, 200, 4.0)
+    report = stats.report()
+    print(report)
+    lines = report.split("\n")
+    assert lines[0] == "3 prompts, 350 input tokens (legacy templates: 600, saved 250 = 42%)"
+    assert "compact: avg latency 1.50s over 2 calls" in report
+    assert "legacy: avg latency 4.00s over 1 calls" in report
+    assert "latency saved per call: 2.50s" in report
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") > 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing prompts")
+    test_compact_prompt_keeps_question_choices_and_format()
+    test_compact_prompt_type_specifics()
+    test_compact_prompt_is_shorter()
+    test_prompt_stats()
+    test_count_tokens()
+    print("✅ All prompt tests passed")
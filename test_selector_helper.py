@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive selector resolver, with a stand-in driver emulating the page query
+"""
+
+import time
+
+from selector_helper import NOT_FOUND, QUERY_SELECTORS_JS, SelectorResolver
+
+
+class FakePage:
+    """Answers QUERY_SELECTORS_JS from a selector -> text map, elements appear after `delay` seconds"""
+
+    def __init__(self, texts, delay=0.0):
+        self.texts = texts
+        self.created = time.time()
+        self.delay = delay
+        self.queries = []
+
+    def execute_script(self, script, selectors, min_text, visible_only):
+        assert script == QUERY_SELECTORS_JS
+        self.queries.append(list(selectors))
+        rendered = time.time() - self.created >= self.delay
+        matched = [rendered and selector in self.texts and len(self.texts[selector]) >= min_text
+                   for selector in selectors]
+        result = {"matched": matched}
+        if any(matched):
+            index = matched.index(True)
+            result.update(index=index, element=f"<{selectors[index]}>", text=self.texts[selectors[index]])
+        return result
+
+
+SELECTORS = ["[data-functional-selector='block-title']", "h1", "[class*='title']"]
+
+
+def test_first_match_in_order():
+    """One query finds the first candidate with text, in priority order"""
+    page = FakePage({"h1": "What is 2 + 2?", "[class*='title']": "Kahoot!"})
+    resolver = SelectorResolver(page)
+    resolved = resolver.resolve("question_text", SELECTORS, "question", timeout=0, min_text=1)
+    print(f"Resolved: {resolved}")
+    assert resolved.selector == "h1" and resolved.text == "What is 2 + 2?"
+    assert resolved.element == "<h1>"
+    assert len(page.queries) == 1
+
+    rates = resolver.hit_rates()["question_text"]
+    assert rates["h1"]["wins"] == 1 and rates["h1"]["hit_rate"] == 1.0
+    assert rates[SELECTORS[0]]["hit_rate"] == 0.0
+
+
+def test_remembered_selector_first():
+    """The winner per phase is queried alone first, later calls skip the full list"""
+    page = FakePage({"h1": "What is 2 + 2?", "[class*='title']": "Kahoot!"})
+    resolver = SelectorResolver(page)
+    resolver.resolve("question_text", SELECTORS, "question", timeout=0, min_text=1)
+    resolver.resolve("question_text", SELECTORS, "question", timeout=0, min_text=1)
+    print(f"Queries: {page.queries}")
+    assert page.queries[-1] == ["h1"]
+
+    # Another phase has no remembered winner yet, but wins reorder the candidates
+    assert resolver.ordered("question_text", SELECTORS, "get_ready")[0] == "h1"
+    assert resolver.ordered("question_text", SELECTORS, "get_ready")[1:] == [SELECTORS[0], SELECTORS[2]]
+
+
+def test_fallback_after_short_wait():
+    """A remembered selector that stops matching costs only the short wait"""
+    resolver = SelectorResolver(FakePage({"h1": "Old question text"}), fast_timeout=0.2)
+    resolver.resolve("question_text", SELECTORS, "question", timeout=0, min_text=1)
+
+    resolver.driver = FakePage({"[class*='title']": "New layout title"})
+    start = time.time()
+    resolved = resolver.resolve("question_text", SELECTORS, "question", timeout=2, min_text=1)
+    elapsed = time.time() - start
+    print(f"Fell back to {resolved.selector} in {elapsed:.2f}s")
+    assert resolved.selector == "[class*='title']"
+    assert elapsed < 0.5
+    assert resolver.winners[("question_text", "question")] == "[class*='title']"
+
+
+def test_waits_for_render_and_times_out():
+    """Polls until elements render, returns NOT_FOUND when nothing appears in time"""
+    page = FakePage({"h1": "Rendered late"}, delay=0.3)
+    resolved = SelectorResolver(page).resolve("question_text", SELECTORS, timeout=2, min_text=1)
+    assert resolved.text == "Rendered late"
+    assert len(page.queries) > 1
+
+    start = time.time()
+    missing = SelectorResolver(FakePage({})).resolve("question_text", SELECTORS, timeout=0.3, min_text=1)
+    print(f"Missing after {time.time() - start:.2f}s: {missing}")
+    assert missing == NOT_FOUND
+    assert time.time() - start < 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing selector resolver")
+    test_first_match_in_order()
+    test_remembered_selector_first()
+    test_fallback_after_short_wait()
+    test_waits_for_render_and_times_out()
+    print("✅ All selector resolver tests passed")
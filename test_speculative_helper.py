@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for racing answering strategies
+"""
+
+import threading
+import time
+
+from speculative_helper import SpeculativeRunner, candidate_types
+
+
+def _after(delay, value):
+    def strategy(cancel_event):
+        # Sleeps in small steps so a cancelled loser stops early, like a streamed completion
+        end = time.time() + delay
+        while time.time() < end:
+            if cancel_event.is_set():
+                return None
+            time.sleep(0.01)
+        return value
+    return strategy
+
+
+def test_first_valid_result_wins():
+    """The fastest acceptable answer wins, invalid and failing strategies fall through"""
+    runner = SpeculativeRunner(max_workers=4)
+
+    def failing(cancel_event):
+        raise RuntimeError("model unavailable")
+
+    start = time.time()
+    name, result = runner.run({
+        "failing": failing,
+        "invalid": _after(0.05, "nonsense"),
+        "slow": _after(1.0, "paris"),
+        "fast": _after(0.2, "paris"),
+    }, is_valid=lambda result: result == "paris", timeout=3)
+    elapsed = time.time() - start
+    print(f"Winner {name} after {elapsed:.2f}s")
+    assert (name, result) == ("fast", "paris")
+    assert elapsed < 0.6
+
+    time.sleep(0.1)  # The slow loser sees the cancel event and returns
+    stats = runner.stats
+    assert stats["fast"].wins == 1 and stats["failing"].failures == 1 and stats["invalid"].invalid == 1
+    assert stats["slow"].cancelled == 1 and stats["slow"].wins == 0
+    runner.shutdown()
+
+
+def test_losers_not_started_are_cancelled():
+    """Strategies still queued when a winner is found are dropped or stopped"""
+    runner = SpeculativeRunner(max_workers=1)
+    started = []
+
+    def tracked(name, delay):
+        def strategy(cancel_event):
+            started.append(name)
+            return _after(delay, name)(cancel_event)
+        return strategy
+
+    name, _ = runner.run({"first": tracked("first", 0.05), "queued": tracked("queued", 1.0)},
+                         is_valid=lambda result: True, timeout=2)
+    time.sleep(0.1)
+    # The queued strategy is either dropped before it starts or stops at once on the cancel event
+    assert name == "first" and started[0] == "first"
+    assert runner.stats["queued"].cancelled == 1 and runner.stats["queued"].completions == 0
+    runner.shutdown()
+
+
+def test_timeout_is_honoured():
+    """No valid answer before the deadline returns (None, None) on time and stops the strategies"""
+    runner = SpeculativeRunner(max_workers=2)
+    seen_cancel = threading.Event()
+
+    def stubborn(cancel_event):
+        cancel_event.wait(2)
+        seen_cancel.set()
+        return None
+
+    start = time.time()
+    assert runner.run({"slow": _after(2, "x"), "stubborn": stubborn},
+                      is_valid=lambda result: True, timeout=0.3) == (None, None)
+    assert time.time() - start < 0.5
+    assert seen_cancel.wait(0.5)
+    runner.shutdown()
+
+
+def test_candidate_types_gating():
+    """A disagreeing rule-based type is only raced on strong evidence"""
+    assert candidate_types("logic", {}) == ["logic"]
+    # One broad keyword such as "see" or an operator is not enough
+    assert candidate_types("logic", {"image": 1}) == ["logic"]
+    assert candidate_types("logic", {"math": 1, "image": 1}) == ["logic"]
+    assert candidate_types("logic", {"coding": 2}) == ["logic", "coding"]
+    # Agreement, or the AI type having as much rule support, means no race
+    assert candidate_types("coding", {"coding": 3}) == ["coding"]
+    assert candidate_types("math", {"math": 2, "coding": 2}) == ["math"]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing speculative answering")
+    test_first_valid_result_wins()
+    test_losers_not_started_are_cancelled()
+    test_timeout_is_honoured()
+    test_candidate_types_gating()
+    print("✅ All speculative answering tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental parsing of streamed answers
+"""
+
+from stream_helper import IncrementalAnswerParser, parse_streamed_answer
+
+
+def split_chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_options_emitted_when_array_closes():
+    """The answer is available before the rest of the completion arrives"""
+    print("🧪 Testing early emission of correct_options...")
+
+    completion = '{"correct_options": ["paris", "lyon"], "explanation": "both are cities in france"}'
+    parser = IncrementalAnswerParser()
+
+    emitted_at = None
+    for i, chunk in enumerate(split_chunks(completion, 3)):
+        if parser.feed(chunk) is not None and emitted_at is None:
+            emitted_at = i
+
+    print(f"Emitted at chunk {emitted_at}: {parser.options}")
+    assert parser.options == ["paris", "lyon"]
+    assert emitted_at is not None
+    assert emitted_at * 3 < completion.index("explanation")
+
+    print("✅ Early emission test completed\n")
+
+
+def test_chain_of_thought_before_json():
+    """Reasoning text and brackets before the JSON do not confuse the parser"""
+    print("🧪 Testing chain-of-thought prefix...")
+
+    completion = (
+        "Step 1: the list [1, 2, 3] sums to 6.\n"
+        "Step 2: so the answer is 6.\n"
+        "```json\n"
+        '{\n  "correct_options": [\n    "6"\n  ]\n}\n'
+        "```"
+    )
+    options = parse_streamed_answer(split_chunks(completion, 5))
+
+    print(f"Parsed: {options}")
+    assert options == ["6"]
+
+    print("✅ Chain-of-thought test completed\n")
+
+
+def test_bracket_inside_string():
+    """A closing bracket inside an answer string is not the end of the array"""
+    print("🧪 Testing bracket inside answer string...")
+
+    completion = '{"correct_options": ["a[0]", "b"]}'
+    parser = IncrementalAnswerParser()
+    results = [parser.feed(chunk) for chunk in split_chunks(completion, 1)]
+
+    first = next(i for i, r in enumerate(results) if r is not None)
+    print(f"First emission at char {first}: {parser.options}")
+    assert parser.options == ["a[0]", "b"]
+    assert completion[first] == "]" and first == completion.rindex("]")
+
+    print("✅ Bracket test completed\n")
+
+
+def test_incomplete_stream():
+    """A stream that never closes the array yields nothing"""
+    print("🧪 Testing incomplete stream...")
+
+    options = parse_streamed_answer(['{"correct_options": ["par', 'is"'])
+    assert options is None
+
+    print("✅ Incomplete stream test completed\n")
+
+
+if __name__ == "__main__":
+    print("⚡ Testing Streamed Answer Parsing\n")
+
+    test_options_emitted_when_array_closes()
+    test_chain_of_thought_before_json()
+    test_bracket_inside_string()
+    test_incomplete_stream()
+
+    print("🎉 All streaming tests completed!")
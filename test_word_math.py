@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the local arithmetic word-problem parser
+"""
+
+import time
+
+from math_helper import eval_expr
+from word_math_helper import parse_math_text
+
+# (question, expected result) pairs in the phrasings seen in Kahoot math questions
+CORPUS = [
+    ("What is 12 * 7?", 84),
+    ("What is 12 x 7?", 84),
+    ("What's 8 × 9?", 72),
+    ("What is 144 ÷ 12?", 12),
+    ("What is 1,000 + 234?", 1234),
+    ("What is (2 + 3) * 4?", 20),
+    ("What is 2^10?", 1024),
+    ("What is 7 % 3?", 1),
+    ("What is twenty-three plus nineteen?", 42),
+    ("What is ninety nine divided by three?", 33),
+    ("How much is one hundred and five minus five?", 100),
+    ("What is a thousand minus one?", 999),
+    ("What is three times four plus two?", 14),
+    ("What is 3 million divided by 1000?", 3000),
+    ("What is negative five plus 2?", -3),
+    ("What is 6 multiplied by 7?", 42),
+    ("What is 2 to the power of 10?", 1024),
+    ("What is 3 raised to the power of 4?", 81),
+    ("What is 7 squared?", 49),
+    ("What is 4 cubed minus 1?", 63),
+    ("What is the square root of 144?", 12),
+    ("What is the square of 9?", 81),
+    ("What is 15% of 200?", 30),
+    ("What is 50 percent of 30?", 15),
+    ("What is the sum of 3 and 4?", 7),
+    ("What is the product of six and seven?", 42),
+    ("What is the difference between 100 and 37?", 63),
+    ("What is the quotient of 81 and 9?", 9),
+    ("Subtract 3 from 10", 7),
+    ("Add 5 to 12", 17),
+    ("Divide 100 by 4", 25),
+    ("What is 5 more than 3?", 8),
+    ("What is 3 less than 10?", 7),
+    ("What is half of 50?", 25),
+    ("What is twice 21?", 42),
+    ("Calculate 17 mod 5", 2),
+    ("Calculate the value of 10 - 2 * 3", 4),
+    ("What do you get when you multiply 6 by 8?", 48),
+    ("what is 2 + 2 = ?", 4),
+]
+
+# Questions that are not plain arithmetic and must go to the LLM
+NOT_ARITHMETIC = [
+    "How many apples are in a box?",
+    "What is the capital of France?",
+    "If a train leaves at 3pm going 60 km/h, when does it arrive?",
+    "What is x + 3 if x is 2?",
+    "1945",
+    "What is one?",
+    "What is negative five?",
+    "",
+]
+
+
+def test_corpus():
+    """Every corpus question parses and evaluates to the expected result"""
+    print("🧪 Testing arithmetic corpus...")
+
+    failures = []
+    for text, expected in CORPUS:
+        expression = parse_math_text(text)
+        if expression is None:
+            failures.append((text, "no parse"))
+            continue
+        result = eval_expr(expression)
+        if abs(float(result) - expected) > 1e-9:
+            failures.append((text, result))
+
+    for text, result in failures:
+        print(f"❌ {text} -> {result}")
+    assert not failures
+
+    print(f"✅ {len(CORPUS)} corpus questions solved\n")
+
+
+def test_rejects_non_arithmetic():
+    """Text that is not plain arithmetic is left for the LLM"""
+    print("🧪 Testing non-arithmetic questions...")
+
+    for text in NOT_ARITHMETIC:
+        assert parse_math_text(text) is None, text
+
+    print("✅ Non-arithmetic test completed\n")
+
+
+def test_benchmark():
+    """Parsing and evaluating stays well under a millisecond per question"""
+    print("🧪 Benchmarking local solver...")
+
+    rounds = 20
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for text, _ in CORPUS:
+            eval_expr(parse_math_text(text))
+    per_question_ms = (time.perf_counter() - start_time) * 1000 / (rounds * len(CORPUS))
+
+    print(f"Average: {per_question_ms:.3f}ms per question")
+    assert per_question_ms < 1.0
+
+    print("✅ Benchmark completed\n")
+
+
+if __name__ == "__main__":
+    print("🧮 Testing Local Math Solver\n")
+
+    test_corpus()
+    test_rejects_non_arithmetic()
+    test_benchmark()
+
+    print("🎉 All math solver tests completed!")
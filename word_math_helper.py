@@ -0,0 +1,321 @@
+import ast
+import re
+from typing import List, Optional
+
+# Number words and their values
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000, "billion": 1000000000}
+
+# Multi-word phrases rewritten to a single operator token, longest first
+PHRASES = [
+    (r"\braised to the power of\b", " ** "),
+    (r"\bto the power of\b", " ** "),
+    (r"\braised to\b", " ** "),
+    (r"\bmultiplied by\b", " * "),
+    (r"\bdivided by\b", " / "),
+    (r"\bsquare root of\b", " SQRT "),
+    (r"\bcube root of\b", " CBRT "),
+    (r"\bsquare of\b", " SQUARE_OF "),
+    (r"\bcube of\b", " CUBE_OF "),
+    (r"\bpercent of\b", " PERCENT_OF "),
+    (r"%\s*of\b", " PERCENT_OF "),
+    (r"\bmore than\b", " MORE_THAN "),
+    (r"\bgreater than\b", " MORE_THAN "),
+    (r"\bless than\b", " LESS_THAN "),
+    (r"\bfewer than\b", " LESS_THAN "),
+    (r"\bthe sum of\b", " SUM "),
+    (r"\bsum of\b", " SUM "),
+    (r"\bthe product of\b", " PRODUCT "),
+    (r"\bproduct of\b", " PRODUCT "),
+    (r"\bthe difference (?:between|of)\b", " DIFFERENCE "),
+    (r"\bdifference (?:between|of)\b", " DIFFERENCE "),
+    (r"\bthe quotient of\b", " QUOTIENT "),
+    (r"\bquotient of\b", " QUOTIENT "),
+    (r"\bhalf of\b", " HALF "),
+    (r"\bone half of\b", " HALF "),
+    (r"\ba third of\b", " THIRD "),
+    (r"\bone third of\b", " THIRD "),
+    (r"\ba quarter of\b", " QUARTER "),
+    (r"\bone quarter of\b", " QUARTER "),
+    (r"\btwice\b", " TWICE "),
+    (r"\bdouble\b", " TWICE "),
+    (r"\btriple\b", " TRIPLE "),
+    (r"\bsquared\b", " SQUARED "),
+    (r"\bcubed\b", " CUBED "),
+    (r"\bpercent\b", " PERCENT "),
+    (r"\bplus\b", " + "),
+    (r"\badded to\b", " + "),
+    (r"\bminus\b", " - "),
+    (r"\btimes\b", " * "),
+    (r"\bmultiply\b", " MULTIPLY "),
+    (r"\bdivide\b", " DIVIDE "),
+    (r"\bsubtract\b", " SUBTRACT "),
+    (r"\bsubtracted from\b", " SUBTRACTED_FROM "),
+    (r"\btake away\b", " - "),
+    (r"\bover\b", " / "),
+    (r"\bmodulo\b", " % "),
+    (r"\bmod\b", " % "),
+    (r"\bnegative\b", " - "),
+    (r"\badd\b", " ADD "),
+]
+PHRASE_PATTERNS = [(re.compile(pattern), replacement) for pattern, replacement in PHRASES]
+
+# Question wording around the arithmetic that carries no meaning
+LEADING_FILLER = re.compile(
+    r"^(?:(?:what|how much)\s+(?:is|are|does|do)\s+(?:you\s+get\s+(?:when|if)\s+(?:you\s+)?)?|what's\s+|"
+    r"(?:please\s+)?(?:calculate|compute|evaluate|solve|find|work out)\s*:?\s+)"
+    r"(?:the\s+(?:value|result|answer)\s+of\s+)?"
+)
+TRAILING_FILLER = re.compile(r"(?:\s*(?:equals?|is equal to|=|\?|\.|!))*\s*$")
+
+TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?|\*\*|[-+*/^%()]|[A-Za-z_']+")
+
+BINARY_OPERATORS = {
+    "+": ast.Add, "-": ast.Sub, "*": ast.Mult, "/": ast.Div, "%": ast.Mod,
+}
+
+
+class WordMathError(ValueError):
+    pass
+
+
+def normalize_math_text(text: str) -> str:
+    """Lowercase the question, strip filler and rewrite operator phrases to symbols"""
+    text = text.lower().strip()
+    text = text.replace("×", "*").replace("÷", "/").replace("−", "-").replace("–", "-")
+    text = re.sub(r"(?<=\d),(?=\d{3}\b)", "", text)  # 1,000 -> 1000
+    text = re.sub(r"(?<=\d)\s*x\s*(?=\d)", " * ", text)  # 3 x 4 -> 3 * 4
+    text = text.replace("^", " ** ")
+    text = LEADING_FILLER.sub("", text)
+    text = TRAILING_FILLER.sub("", text)
+    text = re.sub(r"(?<=[a-z])-(?=[a-z])", " ", text)  # twenty-three -> twenty three
+    for pattern, replacement in PHRASE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def tokenize(text: str) -> List[object]:
+    """Split normalized text into numbers and operator tokens, folding number words into values"""
+    raw_tokens = TOKEN_PATTERN.findall(text)
+    leftover = TOKEN_PATTERN.sub("", text).strip()
+    if leftover:
+        raise WordMathError(f"Unexpected characters: {leftover!r}")
+
+    tokens = []
+    i = 0
+    while i < len(raw_tokens):
+        token = raw_tokens[i]
+        if token in SCALES and tokens and isinstance(tokens[-1], (int, float)) and not _starts_number(raw_tokens, i):
+            # "3 million"
+            tokens[-1] *= SCALES[token]
+            i += 1
+            continue
+        if token in UNITS or token in TENS or token in SCALES:
+            value, i = _read_number_words(raw_tokens, i)
+            tokens.append(value)
+            continue
+        if token == "a" and i + 1 < len(raw_tokens) and raw_tokens[i + 1] in SCALES:
+            value, i = _read_number_words(raw_tokens, i + 1, start=1)
+            tokens.append(value)
+            continue
+        if re.fullmatch(r"\d+(?:\.\d+)?", token):
+            tokens.append(int(token) if token.isdigit() else float(token))
+        elif token == "the":
+            pass  # "the square of", "the sum of" etc. are already folded
+        else:
+            tokens.append(token)
+        i += 1
+    return tokens
+
+
+def _starts_number(tokens, i) -> bool:
+    """Whether a scale word at i starts a new number rather than scaling the digits before it"""
+    return i == 0 or not re.fullmatch(r"\d+(?:\.\d+)?", tokens[i - 1])
+
+
+def _read_number_words(tokens, i, start=0):
+    """Read a run of number words like 'one hundred and twenty three'"""
+    total = 0
+    current = start
+    seen_word = start != 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in UNITS:
+            current += UNITS[token]
+        elif token in TENS:
+            current += TENS[token]
+        elif token == "hundred":
+            current = (current or 1) * 100
+        elif token in SCALES:
+            total += (current or 1) * SCALES[token]
+            current = 0
+        elif token == "and" and seen_word and i + 1 < len(tokens) and (
+                tokens[i + 1] in UNITS or tokens[i + 1] in TENS) and tokens[i - 1] in SCALES:
+            # "one hundred and five" continues the number, "sum of one and two" does not
+            pass
+        else:
+            break
+        seen_word = True
+        i += 1
+    return total + current, i
+
+
+class _Parser:
+    """Recursive-descent parser from word tokens to a Python expression AST"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise WordMathError(f"Expected {expected!r}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> ast.Expression:
+        node = self.expr()
+        if self.peek() is not None:
+            raise WordMathError(f"Unexpected token {self.peek()!r}")
+        return ast.fix_missing_locations(ast.Expression(body=node))
+
+    def expr(self):
+        node = self.term()
+        while True:
+            token = self.peek()
+            if token in ("+", "-"):
+                self.take()
+                node = ast.BinOp(left=node, op=BINARY_OPERATORS[token](), right=self.term())
+            elif token == "MORE_THAN":
+                self.take()
+                node = ast.BinOp(left=self.term(), op=ast.Add(), right=node)
+            elif token in ("LESS_THAN", "SUBTRACTED_FROM"):
+                self.take()
+                node = ast.BinOp(left=self.term(), op=ast.Sub(), right=node)
+            else:
+                return node
+
+    def term(self):
+        node = self.power()
+        while self.peek() in ("*", "/", "%"):
+            token = self.take()
+            node = ast.BinOp(left=node, op=BINARY_OPERATORS[token](), right=self.power())
+        return node
+
+    def power(self):
+        node = self.unary()
+        while True:
+            token = self.peek()
+            if token == "**":
+                self.take()
+                # Right associative
+                return ast.BinOp(left=node, op=ast.Pow(), right=self.power())
+            elif token == "SQUARED":
+                self.take()
+                node = ast.BinOp(left=node, op=ast.Pow(), right=ast.Constant(2))
+            elif token == "CUBED":
+                self.take()
+                node = ast.BinOp(left=node, op=ast.Pow(), right=ast.Constant(3))
+            else:
+                return node
+
+    def unary(self):
+        token = self.peek()
+        if token == "-":
+            self.take()
+            return ast.UnaryOp(op=ast.USub(), operand=self.unary())
+        if token == "+":
+            self.take()
+            return self.unary()
+
+        two_operand = {"SUM": ("and", ast.Add, False), "PRODUCT": ("and", ast.Mult, False),
+                       "DIFFERENCE": ("and", ast.Sub, False), "QUOTIENT": ("and", ast.Div, False),
+                       "ADD": ("to", ast.Add, False), "MULTIPLY": ("by", ast.Mult, False),
+                       "DIVIDE": ("by", ast.Div, False), "SUBTRACT": ("from", ast.Sub, True)}
+        if token in two_operand:
+            separator, op, swap = two_operand[token]
+            self.take()
+            left = self.expr()
+            self.take(separator)
+            right = self.expr()
+            if swap:
+                left, right = right, left
+            return ast.BinOp(left=left, op=op(), right=right)
+
+        scaled = {"HALF": (ast.Div, 2), "THIRD": (ast.Div, 3), "QUARTER": (ast.Div, 4),
+                  "TWICE": (ast.Mult, 2), "TRIPLE": (ast.Mult, 3)}
+        if token in scaled:
+            op, factor = scaled[token]
+            self.take()
+            return ast.BinOp(left=self.unary(), op=op(), right=ast.Constant(factor))
+
+        if token in ("SQUARE_OF", "CUBE_OF"):
+            self.take()
+            return ast.BinOp(left=self.unary(), op=ast.Pow(), right=ast.Constant(2 if token == "SQUARE_OF" else 3))
+
+        if token in ("SQRT", "CBRT"):
+            self.take()
+            function = ast.Name(id="sqrt" if token == "SQRT" else "cbrt", ctx=ast.Load())
+            return ast.Call(func=function, args=[self.unary()], keywords=[])
+
+        return self.percent()
+
+    def percent(self):
+        node = self.primary()
+        token = self.peek()
+        if token == "PERCENT_OF":
+            self.take()
+            ratio = ast.BinOp(left=node, op=ast.Div(), right=ast.Constant(100))
+            return ast.BinOp(left=ratio, op=ast.Mult(), right=self.unary())
+        if token == "PERCENT" or (token == "%" and self._percent_sign_is_postfix()):
+            self.take()
+            return ast.BinOp(left=node, op=ast.Div(), right=ast.Constant(100))
+        return node
+
+    def _percent_sign_is_postfix(self) -> bool:
+        # "50 %" at the end or before an operator is a percentage, "7 % 3" is modulo
+        following = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+        return following is None or isinstance(following, str) and following not in ("(", "-") and not following.isupper()
+
+    def primary(self):
+        token = self.peek()
+        if isinstance(token, (int, float)):
+            self.take()
+            return ast.Constant(token)
+        if token == "(":
+            self.take()
+            node = self.expr()
+            self.take(")")
+            return node
+        raise WordMathError(f"Expected a number, got {token!r}")
+
+
+def parse_math_text(text: str) -> Optional[ast.Expression]:
+    """
+    Parse an arithmetic question written in words or symbols into an AST
+    that eval_expr can evaluate. Returns None if the text is not plain arithmetic.
+    """
+    try:
+        tokens = tokenize(normalize_math_text(text))
+        if not tokens or not any(isinstance(token, (int, float)) for token in tokens):
+            return None
+        expression = _Parser(tokens).parse()
+    except (WordMathError, RecursionError):
+        return None
+    # A bare number such as a year is not a calculation
+    if not any(isinstance(node, (ast.BinOp, ast.Call)) for node in ast.walk(expression)):
+        return None
+    return expression